@@ -2,6 +2,9 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from adapters.http_session import get_default_session
+from data.transformer import loads_json
+
 load_dotenv()
 
 HISTORICAL_API_URL = os.getenv("HISTORICAL_API_URL")
@@ -9,10 +12,41 @@ GEOCODING_API_URL = os.getenv("GEOCODING_API_URL")
 WEATHER_API_URL = os.getenv("WEATHER_API_URL")
 FORECAST_API_URL = os.getenv("FORECAST_API_URL", "https://api.open-meteo.com/v1/forecast")
 
-def get_geocoding_data(city):
+# Variables journalières demandées à l'API d'archive
+ARCHIVE_DAILY_VARIABLES = [
+    "weathercode",
+    "temperature_2m_mean",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "apparent_temperature_mean",
+    "wind_speed_10m_max",
+    "sunshine_duration",
+    "precipitation_sum",
+    "shortwave_radiation_sum",
+]
+
+# Variables journalières demandées à l'API de prévision
+FORECAST_DAILY_VARIABLES = [
+    "precipitation_sum",
+    "sunshine_duration",
+    "apparent_temperature_max",
+    "temperature_2m_min",
+    "temperature_2m_max",
+    "apparent_temperature_mean",
+    "temperature_2m_mean",
+    "relative_humidity_2m_mean",
+    "uv_index_max",
+    "rain_sum",
+    "precipitation_probability_mean",
+    "wind_gusts_10m_mean",
+    "wind_speed_10m_mean",
+]
+
+def get_geocoding_data(city, session=None):
+    session = session or get_default_session()
     try:
         query_params = {"name": city, "limit": 1, "language": "fr", "format": "json"}
-        response = requests.get(GEOCODING_API_URL, params=query_params)
+        response = session.get(GEOCODING_API_URL, params=query_params)
         response.raise_for_status()
         data = response.json()
         if data and "results" in data and len(data["results"]) > 0:
@@ -29,37 +63,40 @@ def get_geocoding_data(city):
         print(f"Erreur lors de la connexion à l'API : {e}")
         return None
 
-def get_forecast_today(geolocalisation):
+def get_forecast_today(geolocalisation, session=None):
     """
     Récupère les prévisions météorologiques pour la journée actuelle.
     
     Args:
         geolocalisation: Dictionnaire contenant latitude, longitude et timezone
+        session: Session HTTP à utiliser (session partagée du processus par défaut)
     
     Returns:
         Réponse JSON de l'API contenant les données daily pour aujourd'hui
     """
+    session = session or get_default_session()
     try:
         query_params = {
             "latitude": geolocalisation["latitude"], 
             "longitude": geolocalisation["longitude"], 
-            "daily": "precipitation_sum,sunshine_duration,apparent_temperature_max,temperature_2m_min,temperature_2m_max,apparent_temperature_mean,temperature_2m_mean,relative_humidity_2m_mean,uv_index_max,rain_sum,precipitation_probability_mean,wind_gusts_10m_mean,wind_speed_10m_mean",
+            "daily": ",".join(FORECAST_DAILY_VARIABLES),
             "forecast_days": 1
         }
-        response = requests.get(FORECAST_API_URL, params=query_params)
+        response = session.get(FORECAST_API_URL, params=query_params)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         print(f"Erreur lors de la connexion à l'API forecast : {e}")
         return None
 
-def get_historical_same_day_last_year(geolocalisation, date_last_year):
+def get_historical_same_day_last_year(geolocalisation, date_last_year, session=None):
     """
     Récupère les données météorologiques historiques pour une date spécifique (même jour l'année dernière).
     
     Args:
         geolocalisation: Dictionnaire contenant latitude, longitude et timezone
         date_last_year: Date au format 'YYYY-MM-DD' (même jour mais l'année dernière)
+        session: Session HTTP à utiliser (session partagée du processus par défaut)
     
     Returns:
         Réponse JSON de l'API contenant les données daily pour cette date
@@ -69,24 +106,15 @@ def get_historical_same_day_last_year(geolocalisation, date_last_year):
         "longitude": geolocalisation["longitude"],
         "start_date": date_last_year,        # 'YYYY-MM-DD'
         "end_date": date_last_year,          # cùng 1 ngày
-        "daily": ",".join([
-            "weathercode",
-            "temperature_2m_mean",
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "apparent_temperature_mean",
-            "wind_speed_10m_max",
-            "sunshine_duration",
-            "precipitation_sum",
-            "shortwave_radiation_sum",
-        ]),
+        "daily": ",".join(ARCHIVE_DAILY_VARIABLES),
         "timezone": geolocalisation["timezone"],
     }
-    r = requests.get(HISTORICAL_API_URL, params=params, timeout=20)
+    session = session or get_default_session()
+    r = session.get(HISTORICAL_API_URL, params=params)
     r.raise_for_status()
-    return r.json()
+    return loads_json(r.content)
 
-def get_daily_weather_data(geolocalisation, start_date, end_date):
+def get_daily_weather_data(geolocalisation, start_date, end_date, session=None):
     """
     Récupère les données météorologiques quotidiennes (daily) pour une période donnée.
     
@@ -94,6 +122,7 @@ def get_daily_weather_data(geolocalisation, start_date, end_date):
         geolocalisation: Dictionnaire contenant latitude, longitude et timezone
         start_date: Date de début au format 'YYYY-MM-DD'
         end_date: Date de fin au format 'YYYY-MM-DD'
+        session: Session HTTP à utiliser (session partagée du processus par défaut)
     
     Returns:
         Réponse JSON de l'API contenant les données daily
@@ -103,19 +132,40 @@ def get_daily_weather_data(geolocalisation, start_date, end_date):
         "longitude": geolocalisation["longitude"],
         "start_date": start_date,            # 'YYYY-MM-DD'
         "end_date": end_date,                # 'YYYY-MM-DD'
-        "daily": ",".join([
-            "weathercode",
-            "temperature_2m_mean",
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "apparent_temperature_mean",
-            "wind_speed_10m_max",
-            "sunshine_duration",
-            "precipitation_sum",
-            "shortwave_radiation_sum",
-        ]),
+        "daily": ",".join(ARCHIVE_DAILY_VARIABLES),
         "timezone": geolocalisation["timezone"],
     }
-    r = requests.get(HISTORICAL_API_URL, params=params, timeout=20)
+    session = session or get_default_session()
+    r = session.get(HISTORICAL_API_URL, params=params)
+    r.raise_for_status()
+    return loads_json(r.content)
+
+def get_daily_weather_data_many(geolocalisations, start_date, end_date, session=None):
+    """
+    Récupère les données daily de plusieurs localisations en une seule requête.
+    L'API accepte des listes de latitudes/longitudes séparées par des virgules.
+    
+    Args:
+        geolocalisations: Liste de dictionnaires latitude, longitude et timezone
+            (le fuseau de la première localisation s'applique à toutes)
+        start_date: Date de début au format 'YYYY-MM-DD'
+        end_date: Date de fin au format 'YYYY-MM-DD'
+        session: Session HTTP à utiliser (session partagée du processus par défaut)
+    
+    Returns:
+        Liste des réponses JSON, une par localisation, dans l'ordre d'entrée
+    """
+    params = {
+        "latitude": ",".join(str(g["latitude"]) for g in geolocalisations),
+        "longitude": ",".join(str(g["longitude"]) for g in geolocalisations),
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": ",".join(ARCHIVE_DAILY_VARIABLES),
+        "timezone": geolocalisations[0]["timezone"],
+    }
+    session = session or get_default_session()
+    r = session.get(HISTORICAL_API_URL, params=params)
     r.raise_for_status()
-    return r.json()
+    data = loads_json(r.content)
+    # Une seule localisation : l'API renvoie un objet et non une liste
+    return data if isinstance(data, list) else [data]
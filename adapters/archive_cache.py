@@ -0,0 +1,150 @@
+"""Cache disque persistant des données journalières d'archive Open-Meteo.
+
+Une entrée par (latitude, longitude, variable, jour). Les jours passés sont immuables et
+conservés indéfiniment ; seuls les ``revalidate_days`` derniers jours (encore susceptibles
+d'être corrigés par l'API) expirent après ``recent_ttl_s`` secondes. Le stockage SQLite en
+mode WAL permet à plusieurs processus (workers Streamlit) de partager le même fichier.
+"""
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_daily (
+    lat INTEGER NOT NULL,
+    lon INTEGER NOT NULL,
+    variable TEXT NOT NULL,
+    day TEXT NOT NULL,
+    value REAL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (lat, lon, variable, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS archive_daily_accessed ON archive_daily (accessed_at);
+"""
+
+
+class ArchiveCache:
+    """Cache (lat, lon, variable, jour) -> valeur, borné en nombre d'entrées (éviction LRU).
+
+    Le nombre de lignes est suivi par une estimation majorante (comptage exact à l'ouverture,
+    puis lignes écrites par ce processus) : ``COUNT(*)`` n'est relancé que lorsque l'estimation
+    dépasse ``max_entries``, et non à chaque écriture.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 5_000_000,
+        revalidate_days: int = 5,
+        recent_ttl_s: float = 3600.0,
+        coord_precision: int = 4,
+        today: Callable[[], date] = date.today,
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.revalidate_days = revalidate_days
+        self.recent_ttl_s = recent_ttl_s
+        self._scale = 10 ** coord_precision
+        self._today = today
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._count_lock = threading.Lock()
+        self._row_estimate = len(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par thread ; le verrouillage inter-processus est assuré par SQLite
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _key(self, latitude: float, longitude: float):
+        return int(round(latitude * self._scale)), int(round(longitude * self._scale))
+
+    def immutable_before(self) -> date:
+        """Premier jour encore soumis à revalidation."""
+        return self._today() - timedelta(days=self.revalidate_days)
+
+    def lookup(
+        self, latitude: float, longitude: float, variables: List[str], start: date, end: date
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """Retourne {jour ISO: {variable: valeur}} pour les jours complets et encore valides."""
+        lat, lon = self._key(latitude, longitude)
+        now = time.time()
+        cutoff = self.immutable_before().isoformat()
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT day, variable, value, fetched_at FROM archive_daily "
+            "WHERE lat = ? AND lon = ? AND day BETWEEN ? AND ?",
+            (lat, lon, start.isoformat(), end.isoformat()),
+        ).fetchall()
+        wanted = set(variables)
+        days: Dict[str, Dict[str, Optional[float]]] = {}
+        for day, variable, value, fetched_at in rows:
+            if variable not in wanted:
+                continue
+            if day >= cutoff and now - fetched_at > self.recent_ttl_s:
+                continue
+            days.setdefault(day, {})[variable] = value
+        complete = {day: values for day, values in days.items() if len(values) == len(wanted)}
+        if complete:
+            conn.execute(
+                "UPDATE archive_daily SET accessed_at = ? "
+                "WHERE lat = ? AND lon = ? AND day BETWEEN ? AND ?",
+                (now, lat, lon, start.isoformat(), end.isoformat()),
+            )
+        return complete
+
+    def store(self, latitude: float, longitude: float, daily: Dict[str, List[Any]]) -> None:
+        """Enregistre le bloc ``daily`` d'une réponse d'archive (colonnes time + variables)."""
+        times = daily.get("time") or []
+        if not times:
+            return
+        lat, lon = self._key(latitude, longitude)
+        now = time.time()
+        rows = [
+            (lat, lon, variable, day, value, now, now)
+            for variable, values in daily.items() if variable != "time"
+            for day, value in zip(times, values)
+        ]
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR REPLACE INTO archive_daily VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        with self._count_lock:
+            # Majorant : un remplacement compte comme une nouvelle ligne
+            self._row_estimate += len(rows)
+            if self._row_estimate > self.max_entries:
+                self._row_estimate = self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Évince les entrées les moins récemment lues si besoin ; retourne le nombre de lignes."""
+        count = conn.execute("SELECT COUNT(*) FROM archive_daily").fetchone()[0]
+        if count <= self.max_entries:
+            return count
+        # Libère 10 % de marge pour ne pas évincer à chaque écriture
+        excess = count - int(self.max_entries * 0.9)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM archive_daily WHERE (lat, lon, variable, day) IN ("
+                "SELECT lat, lon, variable, day FROM archive_daily ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+        return count - excess
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM archive_daily").fetchone()[0]
+
+
+def iter_days(start: date, end: date) -> Iterable[date]:
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
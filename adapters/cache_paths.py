@@ -0,0 +1,10 @@
+"""Emplacement des caches persistants sur disque."""
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """Répertoire des caches : variable d'environnement CACHE_DIR ou ~/.cache/projet_air."""
+    path = Path(os.getenv("CACHE_DIR", Path.home() / ".cache" / "projet_air"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
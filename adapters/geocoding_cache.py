@@ -0,0 +1,76 @@
+"""Index persistant des géocodages, indexé par nom de ville normalisé."""
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocoding (
+    name TEXT PRIMARY KEY,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    country_code TEXT,
+    timezone TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+_FIELDS = ("latitude", "longitude", "country_code", "timezone")
+
+
+def normalize_city_name(city: str) -> str:
+    """Normalise un nom de ville : accents supprimés, casse repliée, espaces compactés."""
+    decomposed = unicodedata.normalize("NFKD", city)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class GeocodingCache:
+    """Cache mémoire + SQLite des géolocalisations ; partageable entre processus."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, city: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([city]).get(normalize_city_name(city))
+
+    def get_many(self, cities: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Retourne {nom normalisé: géolocalisation} pour les villes présentes dans l'index."""
+        names = {normalize_city_name(c) for c in cities}
+        with self._lock:
+            found = {n: self._memory[n] for n in names if n in self._memory}
+        unknown = sorted(names - found.keys())
+        if unknown:
+            placeholders = ",".join("?" * len(unknown))
+            rows = self._connect().execute(
+                f"SELECT name, {', '.join(_FIELDS)} FROM geocoding WHERE name IN ({placeholders})", unknown
+            ).fetchall()
+            loaded = {row[0]: dict(zip(_FIELDS, row[1:])) for row in rows}
+            with self._lock:
+                self._memory.update(loaded)
+            found.update(loaded)
+        return found
+
+    def put(self, city: str, geoloc: Dict[str, Any]) -> None:
+        name = normalize_city_name(city)
+        entry = {field: geoloc.get(field) for field in _FIELDS}
+        self._connect().execute(
+            "INSERT OR REPLACE INTO geocoding VALUES (?, ?, ?, ?, ?, ?)",
+            (name, *(entry[f] for f in _FIELDS), time.time()),
+        )
+        with self._lock:
+            self._memory[name] = entry
@@ -0,0 +1,95 @@
+"""Couche de transport HTTP partagée : pool de connexions keep-alive pour les adapters."""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass(frozen=True)
+class HttpSessionConfig:
+    """Paramètres du pool de connexions et des timeouts HTTP."""
+    pool_connections: int = 4        # nombre de pools d'hôtes conservés
+    pool_maxsize: int = 16           # connexions keep-alive par hôte
+    pool_block: bool = False
+    connect_timeout: float = 5.0     # secondes
+    read_timeout: float = 20.0       # secondes
+    user_agent: str = "projet-air/1.0"
+    # Taille de pool spécifique à certains hôtes, ex. {"archive-api.open-meteo.com": 32}
+    host_pool_maxsize: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+class HostRateLimiter:
+    """Seau à jetons par hôte : au plus ``rate`` requêtes/s en régime, ``burst`` en rafale."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # hôte -> (jetons, horodatage)
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (float(self.burst), now))
+                tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+                if tokens >= 1.0:
+                    self._buckets[host] = (tokens - 1.0, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1.0 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class PooledSession(requests.Session):
+    """Session requests avec pool keep-alive par hôte, compression gzip et timeout par défaut."""
+
+    def __init__(self, config: Optional[HttpSessionConfig] = None, rate_limiter: Optional[HostRateLimiter] = None):
+        super().__init__()
+        self.config = config or HttpSessionConfig()
+        self.rate_limiter = rate_limiter
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        for host, maxsize in self.config.host_pool_maxsize.items():
+            host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxsize, pool_block=self.config.pool_block)
+            self.mount(f"https://{host}/", host_adapter)
+            self.mount(f"http://{host}/", host_adapter)
+        self.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": self.config.user_agent,
+        })
+
+    def request(self, method, url, **kwargs):
+        # Timeout systématique : un appel sans timeout peut bloquer une session Streamlit indéfiniment
+        kwargs.setdefault("timeout", self.config.timeout)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(urlsplit(url).hostname or "")
+        return super().request(method, url, **kwargs)
+
+
+_DEFAULT_SESSION: Optional[PooledSession] = None
+_DEFAULT_SESSION_LOCK = threading.Lock()
+
+
+def get_default_session() -> PooledSession:
+    """Retourne la session partagée du processus (créée à la première utilisation)."""
+    global _DEFAULT_SESSION
+    if _DEFAULT_SESSION is None:
+        with _DEFAULT_SESSION_LOCK:
+            if _DEFAULT_SESSION is None:
+                _DEFAULT_SESSION = PooledSession()
+    return _DEFAULT_SESSION
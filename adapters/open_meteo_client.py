@@ -1,25 +1,398 @@
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 
-from core.interfaces import GeocodingProvider, WeatherProvider
+import requests
+
+from core.interfaces import (
+    AsyncGeocodingProvider,
+    AsyncWeatherProvider,
+    GeocodingProvider,
+    WeatherProvider,
+)
+from adapters.archive_cache import ArchiveCache, iter_days
+from adapters.geocoding_cache import GeocodingCache, normalize_city_name
+from adapters.http_session import HostRateLimiter, HttpSessionConfig, PooledSession
+from adapters.resilience import ResilientSession, hedged_call
+from adapters.single_flight import AsyncSingleFlight, SingleFlight
 from adapters.api_client import (
+    ARCHIVE_DAILY_VARIABLES,
+    FORECAST_DAILY_VARIABLES,
     get_geocoding_data,
     get_daily_weather_data,
+    get_daily_weather_data_many,
     get_forecast_today,
     get_historical_same_day_last_year,
 )
 
+# progress(blocs terminés, blocs au total), appelé depuis le thread appelant
+ProgressCallback = Callable[[int, int], None]
+
+# Intervalle de relève de la progression d'un appel coalescé par les appelants suiveurs
+_PROGRESS_POLL_S = 0.1
+
+
+def split_range(start: date, end: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """Découpe [start, end] en blocs consécutifs d'au plus ``chunk_days`` jours."""
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=chunk_days - 1))
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _contiguous_runs(days: List[date]) -> List[Tuple[date, date]]:
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _request_key(endpoint: str, geoloc: Dict[str, Any], *args) -> Tuple:
+    """Clé de coalescence : endpoint, localisation, plage de dates et variables demandées."""
+    variables = FORECAST_DAILY_VARIABLES if endpoint == "forecast" else ARCHIVE_DAILY_VARIABLES
+    location = (geoloc.get("latitude"), geoloc.get("longitude"), geoloc.get("timezone"))
+    return (endpoint, location, args, tuple(variables))
+
+
+def _stitch(responses: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    parts = [r for r in responses if r and "daily" in r]
+    if not parts:
+        return responses[0] if responses else None
+    stitched = {k: v for k, v in parts[0].items() if k != "daily"}
+    daily: Dict[str, List[Any]] = {}
+    for part in parts:
+        for key, values in part["daily"].items():
+            daily.setdefault(key, []).extend(values)
+    stitched["daily"] = daily
+    return stitched
+
 
 class OpenMeteoClient(GeocodingProvider, WeatherProvider):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        config: Optional[HttpSessionConfig] = None,
+        archive_cache: Optional[ArchiveCache] = None,
+        geocoding_cache: Optional[GeocodingCache] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        chunk_days: int = 365,
+        chunk_workers: int = 4,
+        chunk_retries: Optional[int] = None,
+        chunk_backoff_s: float = 0.5,
+        hedge_after_s: Optional[float] = None,
+        coalesce: bool = True,
+    ):
+        # Le client possède sa session : toutes les requêtes réutilisent le même pool keep-alive
+        self._session = session if session is not None else PooledSession(config, rate_limiter=rate_limiter)
+        self._archive_cache = archive_cache
+        self._geocoding_cache = geocoding_cache
+        # Les longues plages d'archive sont téléchargées par blocs, en parallèle
+        self._chunk_days = chunk_days
+        self._chunk_workers = chunk_workers
+        # Nouvelles tentatives dans une seule couche : par défaut, aucune au niveau du bloc si la
+        # session réessaie déjà elle-même (ResilientSession), sinon deux
+        if chunk_retries is None:
+            chunk_retries = 0 if isinstance(self._session, ResilientSession) else 2
+        self._chunk_retries = chunk_retries
+        self._chunk_backoff_s = chunk_backoff_s
+        # Requête couverte pour daily_today : une copie part si la première tarde
+        self._hedge_after_s = hedge_after_s
+        self._hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge") if hedge_after_s else None
+        # Les appels identiques en vol partagent une seule requête et un seul résultat
+        self._single_flight = SingleFlight() if coalesce else None
+        # Dernière progression connue de chaque téléchargement d'archive coalescé en vol
+        self._progress: Dict[Tuple, Tuple[int, int]] = {}
+        self._progress_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    def close(self) -> None:
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self._session.close()
+
+    def _coalesce(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        if self._single_flight is None:
+            return fn()
+        return self._single_flight.do(key, fn)
+
     def geocode(self, city: str) -> Optional[Dict[str, Any]]:
-        return get_geocoding_data(city)
+        return self._coalesce(("geocode", normalize_city_name(city)), lambda: self._geocode(city))
+
+    def _geocode(self, city: str) -> Optional[Dict[str, Any]]:
+        if self._geocoding_cache is None:
+            return get_geocoding_data(city, session=self._session)
+        cached = self._geocoding_cache.get(city)
+        if cached is not None:
+            return dict(cached)
+        geoloc = get_geocoding_data(city, session=self._session)
+        if geoloc:
+            self._geocoding_cache.put(city, geoloc)
+        return geoloc
+
+    def geocode_many(self, cities: Iterable[str], max_workers: int = 8) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Géocode plusieurs villes ; seules les absentes de l'index sont résolues, en parallèle."""
+        cities = list(cities)
+        cached = self._geocoding_cache.get_many(cities) if self._geocoding_cache is not None else {}
+        misses = {}
+        for city in cities:
+            name = normalize_city_name(city)
+            if name not in cached:
+                misses.setdefault(name, city)
+        resolved: Dict[str, Optional[Dict[str, Any]]] = {n: dict(g) for n, g in cached.items()}
+        if misses:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for name, geoloc in zip(misses, executor.map(self.geocode, misses.values())):
+                    resolved[name] = geoloc
+        return {city: resolved.get(normalize_city_name(city)) for city in cities}
 
     def daily_today(self, geoloc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return get_forecast_today(geoloc)
+        return self._coalesce(_request_key("forecast", geoloc), lambda: self._daily_today(geoloc))
+
+    def _daily_today(self, geoloc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self._hedge_executor is None:
+            return get_forecast_today(geoloc, session=self._session)
+        return hedged_call(
+            lambda: get_forecast_today(geoloc, session=self._session), self._hedge_after_s, self._hedge_executor
+        )
+
+    def daily_range(
+        self, geoloc: Dict[str, Any], start: str, end: str, progress: Optional[ProgressCallback] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Données daily d'archive de [start, end], téléchargées par blocs.
+
+        Les appels identiques en vol sont coalescés, y compris avec un suivi de progression :
+        la progression du téléchargement partagé est diffusée à chaque appelant, toujours
+        dans son propre thread (relevée toutes les ``_PROGRESS_POLL_S`` secondes par les suiveurs).
+        """
+        if self._single_flight is None:
+            return self._daily_range(geoloc, start, end, progress)
+        key = _request_key("archive", geoloc, start, end)
+
+        def publish(done: int, total: int) -> None:
+            with self._progress_lock:
+                self._progress[key] = (done, total)
+            if progress is not None:
+                progress(done, total)
+
+        def lead():
+            try:
+                return self._daily_range(geoloc, start, end, publish)
+            finally:
+                with self._progress_lock:
+                    self._progress.pop(key, None)
+
+        def follow(future: Future):
+            seen = None
+            while True:
+                try:
+                    result = future.result(timeout=_PROGRESS_POLL_S)
+                    break
+                except FutureTimeoutError:
+                    pass
+                with self._progress_lock:
+                    state = self._progress.get(key)
+                if state is not None and state != seen:
+                    seen = state
+                    progress(*state)
+            if seen is not None and seen[0] != seen[1]:
+                progress(seen[1], seen[1])
+            return result
 
-    def daily_range(self, geoloc: Dict[str, Any], start: str, end: str) -> Optional[Dict[str, Any]]:
-        return get_daily_weather_data(geoloc, start, end)
+        return self._single_flight.do(key, lead, wait=follow if progress is not None else None)
+
+    def _daily_range(
+        self, geoloc: Dict[str, Any], start: str, end: str, progress: Optional[ProgressCallback] = None
+    ) -> Optional[Dict[str, Any]]:
+        if self._archive_cache is None:
+            span = (date.fromisoformat(start), date.fromisoformat(end))
+            return self._fetch_chunked(geoloc, [span], progress)
+        return self._cached_daily_range(geoloc, start, end, progress)
+
+    def _fetch_chunked(
+        self, geoloc: Dict[str, Any], spans: List[Tuple[date, date]], progress: Optional[ProgressCallback]
+    ) -> Optional[Dict[str, Any]]:
+        chunks = [chunk for start, end in spans for chunk in split_range(start, end, self._chunk_days)]
+        if not chunks:
+            return None
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        if len(chunks) == 1:
+            responses[0] = self._fetch_chunk(geoloc, *chunks[0])
+            if progress is not None:
+                progress(1, 1)
+            return responses[0]
+        with ThreadPoolExecutor(max_workers=min(self._chunk_workers, len(chunks))) as executor:
+            futures = {executor.submit(self._fetch_chunk, geoloc, *chunk): i for i, chunk in enumerate(chunks)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                responses[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(chunks))
+        return _stitch(responses)
+
+    def _fetch_chunk(self, geoloc: Dict[str, Any], start: date, end: date) -> Optional[Dict[str, Any]]:
+        # Chaque bloc est réessayé indépendamment ; un bloc réussi est mis en cache aussitôt
+        for attempt in range(self._chunk_retries + 1):
+            try:
+                response = get_daily_weather_data(geoloc, start.isoformat(), end.isoformat(), session=self._session)
+                break
+            except (requests.exceptions.RequestException, ValueError):
+                if attempt == self._chunk_retries:
+                    raise
+                time.sleep(self._chunk_backoff_s * 2 ** attempt)
+        if self._archive_cache is not None and response and "daily" in response:
+            self._archive_cache.store(geoloc["latitude"], geoloc["longitude"], response["daily"])
+        return response
 
     def daily_same_day_last_year(self, geoloc: Dict[str, Any], date_last_year: str) -> Optional[Dict[str, Any]]:
-        return get_historical_same_day_last_year(geoloc, date_last_year)
+        if self._archive_cache is None:
+            return self._coalesce(
+                _request_key("archive", geoloc, date_last_year, date_last_year),
+                lambda: get_historical_same_day_last_year(geoloc, date_last_year, session=self._session),
+            )
+        return self.daily_range(geoloc, date_last_year, date_last_year)
+
+    def daily_range_many(
+        self, geolocs: List[Dict[str, Any]], start: str, end: str, batch_size: int = 50, max_workers: int = 4
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Données daily de plusieurs localisations, regroupées en requêtes multi-coordonnées.
+
+        Les localisations entièrement présentes dans le cache d'archive ne sont pas redemandées.
+        Une requête groupée en échec est rejouée localisation par localisation : une ville en
+        erreur donne None sans interrompre le lot.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(geolocs)
+        pending = []
+        for i, geoloc in enumerate(geolocs):
+            cached = self._cached_complete_range(geoloc, start, end) if self._archive_cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        # Un seul fuseau horaire par requête groupée
+        by_timezone = sorted(pending, key=lambda i: str(geolocs[i].get("timezone")))
+        batches = []
+        for _, group in groupby(by_timezone, key=lambda i: str(geolocs[i].get("timezone"))):
+            group = list(group)
+            batches.extend(group[k:k + batch_size] for k in range(0, len(group), batch_size))
+
+        def run(batch):
+            try:
+                responses = get_daily_weather_data_many([geolocs[i] for i in batch], start, end, session=self._session)
+            except (requests.exceptions.RequestException, ValueError):
+                responses = None
+            if responses is None or len(responses) != len(batch):
+                return batch, [self._safe_daily_range(geolocs[i], start, end) for i in batch]
+            if self._archive_cache is not None:
+                for i, response in zip(batch, responses):
+                    if response and "daily" in response:
+                        self._archive_cache.store(geolocs[i]["latitude"], geolocs[i]["longitude"], response["daily"])
+            return batch, responses
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch, responses in executor.map(run, batches):
+                for i, response in zip(batch, responses):
+                    results[i] = response
+        return results
+
+    def _safe_daily_range(self, geoloc: Dict[str, Any], start: str, end: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.daily_range(geoloc, start, end)
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+
+    def _cached_complete_range(self, geoloc: Dict[str, Any], start: str, end: str) -> Optional[Dict[str, Any]]:
+        start_day, end_day = date.fromisoformat(start), date.fromisoformat(end)
+        days = self._archive_cache.lookup(
+            geoloc["latitude"], geoloc["longitude"], ARCHIVE_DAILY_VARIABLES, start_day, end_day
+        )
+        if len(days) < (end_day - start_day).days + 1:
+            return None
+        response = {"latitude": geoloc["latitude"], "longitude": geoloc["longitude"], "timezone": geoloc.get("timezone")}
+        return self._with_daily(response, days)
+
+    def _cached_daily_range(
+        self, geoloc: Dict[str, Any], start: str, end: str, progress: Optional[ProgressCallback] = None
+    ) -> Optional[Dict[str, Any]]:
+        cache = self._archive_cache
+        lat, lon = geoloc["latitude"], geoloc["longitude"]
+        start_day, end_day = date.fromisoformat(start), date.fromisoformat(end)
+        days = cache.lookup(lat, lon, ARCHIVE_DAILY_VARIABLES, start_day, end_day)
+        missing = [d for d in iter_days(start_day, end_day) if d.isoformat() not in days]
+
+        response: Dict[str, Any] = {"latitude": lat, "longitude": lon, "timezone": geoloc.get("timezone")}
+        if missing:
+            # Seules les plages de jours manquants sont téléchargées (les blocs sont mis en cache)
+            fetched = self._fetch_chunked(geoloc, _contiguous_runs(missing), progress)
+            if not fetched or "daily" not in fetched:
+                return fetched if not days else self._with_daily(response, days)
+            response.update({k: v for k, v in fetched.items() if k != "daily"})
+            daily = fetched["daily"]
+            for i, day in enumerate(daily.get("time", [])):
+                if start <= day <= end:
+                    days[day] = {v: daily[v][i] for v in ARCHIVE_DAILY_VARIABLES if v in daily}
+        return self._with_daily(response, days)
+
+    @staticmethod
+    def _with_daily(response: Dict[str, Any], days: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        ordered = sorted(days)
+        daily: Dict[str, Any] = {"time": ordered}
+        for variable in ARCHIVE_DAILY_VARIABLES:
+            if any(variable in days[d] for d in ordered):
+                daily[variable] = [days[d].get(variable) for d in ordered]
+        response["daily"] = daily
+        return response
+
+
+class AsyncOpenMeteoClient(AsyncGeocodingProvider, AsyncWeatherProvider):
+    """Client asynchrone : chaque appel s'exécute sur un pool de threads dédié partageant
+    la session poolée du client synchrone, ce qui permet d'attendre plusieurs appels en parallèle."""
+
+    def __init__(self, client: Optional[OpenMeteoClient] = None, max_workers: int = 8):
+        self._client = client if client is not None else OpenMeteoClient()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="open-meteo")
+        # Coalescence côté boucle : les tâches en attente n'occupent pas de thread
+        self._single_flight = AsyncSingleFlight()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _run_coalesced(self, key: Tuple, fn, *args):
+        return await self._single_flight.do(key, lambda: self._run(fn, *args))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._client.close()
+
+    async def geocode(self, city: str) -> Optional[Dict[str, Any]]:
+        return await self._run_coalesced(("geocode", normalize_city_name(city)), self._client.geocode, city)
+
+    async def geocode_many(self, cities: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._run(self._client.geocode_many, list(cities))
+
+    async def daily_today(self, geoloc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._run_coalesced(_request_key("forecast", geoloc), self._client.daily_today, geoloc)
+
+    async def daily_range(self, geoloc: Dict[str, Any], start: str, end: str) -> Optional[Dict[str, Any]]:
+        key = _request_key("archive", geoloc, start, end)
+        return await self._run_coalesced(key, self._client.daily_range, geoloc, start, end)
 
+    async def daily_range_many(self, geolocs: List[Dict[str, Any]], start: str, end: str) -> List[Optional[Dict[str, Any]]]:
+        return await self._run(self._client.daily_range_many, geolocs, start, end)
 
+    async def daily_same_day_last_year(self, geoloc: Dict[str, Any], date_last_year: str) -> Optional[Dict[str, Any]]:
+        key = _request_key("archive", geoloc, date_last_year, date_last_year)
+        return await self._run_coalesced(key, self._client.daily_same_day_last_year, geoloc, date_last_year)
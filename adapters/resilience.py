@@ -0,0 +1,172 @@
+"""Résilience des appels aux providers : nouvelles tentatives, disjoncteur par hôte, requêtes couvertes."""
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, FrozenSet, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+
+from adapters.http_session import HostRateLimiter, HttpSessionConfig, PooledSession
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Levée sans appel réseau tant que le disjoncteur d'un hôte est ouvert."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Backoff exponentiel avec gigue complète sur 429/5xx et erreurs de connexion."""
+    max_attempts: int = 4
+    base_delay_s: float = 0.5
+    max_delay_s: float = 30.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts doit être >= 1")
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        retry_after = _retry_after_s(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay_s)
+        return random.uniform(0.0, min(self.max_delay_s, self.base_delay_s * 2 ** attempt))
+
+
+def _retry_after_s(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Disjoncteur : ouvert après ``failure_threshold`` échecs consécutifs, un essai après ``reset_timeout_s``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout_s or self._trial_running:
+                raise CircuitOpenError("Disjoncteur ouvert : upstream indisponible")
+            self._trial_running = True  # semi-ouvert : un seul appel d'essai
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ResilientSession(PooledSession):
+    """Session poolée avec nouvelles tentatives (Retry-After respecté) et un disjoncteur par hôte."""
+
+    def __init__(
+        self,
+        config: Optional[HttpSessionConfig] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+    ):
+        super().__init__(config, rate_limiter=rate_limiter)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._breaker_factory = breaker_factory
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if host not in self._breakers:
+                self._breakers[host] = self._breaker_factory()
+            return self._breakers[host]
+
+    def request(self, method, url, **kwargs):
+        policy = self.retry_policy
+        breaker = self.breaker(urlsplit(url).hostname or "")
+        for attempt in range(policy.max_attempts):
+            breaker.before_call()
+            last_attempt = attempt == policy.max_attempts - 1
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                breaker.record_failure()
+                if last_attempt:
+                    raise
+                time.sleep(policy.delay(attempt))
+                continue
+            except BaseException:
+                # Erreur non réessayée (ChunkedEncodingError, TooManyRedirects…) : l'appel est
+                # quand même clos pour le disjoncteur, sinon un essai semi-ouvert resterait en cours
+                breaker.record_failure()
+                raise
+            if response.status_code not in policy.retry_statuses:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if last_attempt:
+                return response  # l'appelant décide via raise_for_status()
+            delay = policy.delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    hedge_after_s: float,
+    executor: Executor,
+    accept: Callable[[T], bool] = lambda result: result is not None,
+) -> T:
+    """Lance ``fn`` ; s'il n'a pas répondu après ``hedge_after_s``, lance une copie et garde
+    le premier résultat accepté. Réduit la latence de queue des appels critiques."""
+    futures = [executor.submit(fn)]
+    done, _ = wait(futures, timeout=hedge_after_s)
+    if not done:
+        futures.append(executor.submit(fn))
+    fallback, error = None, None
+    remaining = set(futures)
+    while remaining:
+        done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as exc:
+                error = error or exc
+                continue
+            if accept(result):
+                return result
+            if fallback is None:
+                fallback = (result,)
+    if fallback is not None:
+        return fallback[0]
+    raise error
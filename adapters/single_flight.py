@@ -0,0 +1,67 @@
+"""Coalescence des appels identiques en vol (« single-flight »).
+
+Tant qu'un appel pour une clé est en cours, les appels concurrents de même clé attendent son
+résultat au lieu de refaire la requête : N sessions qui ouvrent la même ville au même moment
+ne coûtent qu'un appel réseau. Le résultat est partagé et ne doit pas être modifié.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalescence entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T], wait: Optional[Callable[["Future[T]"], T]] = None) -> T:
+        """Résultat de ``fn`` pour ``key``, partagé avec les appels concurrents de même clé.
+
+        ``wait`` remplace l'attente bloquante des appelants suiveurs (``future.result()``) ;
+        il s'exécute dans le thread du suiveur et doit retourner le résultat de ``future``.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return wait(future) if wait is not None else future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalescence entre tâches asyncio d'une même boucle d'événements."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+
+    async def do(self, key: Hashable, coro_fn: Callable[[], Awaitable[T]]) -> T:
+        loop_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(loop_key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._calls[loop_key] = task
+            task.add_done_callback(lambda _: self._calls.pop(loop_key, None))
+        # shield : l'annulation d'un appelant n'annule pas l'appel partagé
+        return await asyncio.shield(task)
@@ -0,0 +1,56 @@
+"""Benchmark : alertes sur un horizon de prévision pour une flotte de villes.
+
+Compare l'évaluation ligne par ligne (``evaluate_alerts`` sur chaque jour de chaque ville)
+à ``evaluate_batch`` sur le frame long complet, avec et sans matérialisation des alertes.
+
+Usage : python -m benchmarks.bench_alerts [n_villes] [n_jours]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.analytics.weather_alerts import WeatherAlertService
+
+
+def make_horizon(n_cities: int, n_days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = n_cities * n_days
+    dates = pd.date_range("2024-07-01", periods=n_days, freq="D", name="date")
+    tmax = rng.normal(27, 7, n)
+    return pd.DataFrame({
+        "temperature_2m_max": tmax,
+        "temperature_2m_min": tmax - rng.uniform(6, 14, n),
+        "precipitation_sum": rng.gamma(0.5, 12.0, n),
+        "wind_speed_10m_mean": rng.gamma(2.0, 5.0, n),
+        "city": np.repeat([f"city_{i:04d}" for i in range(n_cities)], n_days),
+    }, index=np.tile(dates, n_cities))
+
+
+def main(n_cities: int = 500, n_days: int = 16):
+    svc = WeatherAlertService()
+    df = make_horizon(n_cities, n_days)
+    print(f"{n_cities} villes × {n_days} jours ({len(df):,} lignes)")
+
+    sample = df.iloc[:2000]
+    t0 = time.perf_counter()
+    n_scalar = sum(len(svc.evaluate_alerts(sample.iloc[[i]])) for i in range(len(sample)))
+    t_scalar = (time.perf_counter() - t0) / len(sample) * len(df)
+
+    t0 = time.perf_counter()
+    table = svc.evaluate_batch(df)
+    t_batch = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    svc.materialize(table)
+    t_objects = time.perf_counter() - t0
+
+    print(f"  ligne par ligne     : {t_scalar:8.3f} s (extrapolé depuis {len(sample)} lignes, "
+          f"{n_scalar} alertes)")
+    print(f"  evaluate_batch      : {t_batch:8.3f} s ({len(table):,} alertes, "
+          f"{table.memory_usage(deep=True).sum() / 2**10:.0f} Kio)")
+    print(f"  + materialize       : {t_objects:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
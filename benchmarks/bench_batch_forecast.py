@@ -0,0 +1,70 @@
+"""Benchmark : prévision Holt-Winters d'une flotte de villes (5 ans d'historique chacune).
+
+Compare le moteur vectorisé (toutes les séries à la fois) à l'ajustement statsmodels par
+ville, dont le temps est extrapolé depuis un échantillon, et mesure l'erreur de chacun sur
+une année retenue.
+
+Usage : python -m benchmarks.bench_batch_forecast [n_villes]
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from services.analytics.forecasting import forecast_temperature_many
+
+HISTORY_DAYS = 5 * 365
+HOLDOUT_DAYS = 365
+
+
+def make_fleet(n_cities: int, seed: int = 0) -> pd.DataFrame:
+    """Matrice jours × villes : saison annuelle, tendance lente, bruit autocorrélé."""
+    rng = np.random.default_rng(seed)
+    n = HISTORY_DAYS + HOLDOUT_DAYS
+    t = np.arange(n)[:, None]
+    mean = rng.uniform(5, 20, n_cities)
+    amplitude = rng.uniform(4, 12, n_cities)
+    phase = rng.uniform(-0.3, 0.3, n_cities)
+    trend = rng.normal(0.0005, 0.0005, n_cities)
+    noise = rng.normal(0, 1.5, (n, n_cities))
+    for i in range(1, n):
+        noise[i] += 0.6 * noise[i - 1]
+    values = mean + amplitude * np.sin(2 * np.pi * t / 365.0 - np.pi / 2 + phase) + trend * t + noise
+    index = pd.date_range("2019-01-01", periods=n, freq="D", name="date")
+    return pd.DataFrame(values, index=index, columns=[f"city_{i:04d}" for i in range(n_cities)])
+
+
+def mae(forecast: pd.DataFrame, truth: pd.DataFrame) -> float:
+    wide = forecast.pivot(index="date", columns="location", values="temperature_2m_mean_predite")
+    return float(np.abs(wide.to_numpy() - truth[wide.columns].to_numpy()).mean())
+
+
+def main(n_cities: int = 1000, sample: int = 4):
+    warnings.simplefilter("ignore")
+    fleet = make_fleet(n_cities)
+    history, truth = fleet.iloc[:HISTORY_DAYS], fleet.iloc[HISTORY_DAYS:]
+
+    t0 = time.perf_counter()
+    vectorized = forecast_temperature_many(history, periods=HOLDOUT_DAYS)
+    t_vec = time.perf_counter() - t0
+
+    subset = history.iloc[:, :sample]
+    t0 = time.perf_counter()
+    per_city = forecast_temperature_many(subset, periods=HOLDOUT_DAYS, engine="statsmodels", max_workers=1)
+    t_fit = (time.perf_counter() - t0) / sample
+    cores = os.cpu_count() or 1
+
+    print(f"{n_cities} villes × {HISTORY_DAYS} jours, {cores} cœur(s)")
+    print(f"  vectorisé           : {t_vec:8.2f} s  ({t_vec / n_cities * 1e3:.1f} ms/ville)")
+    print(f"  statsmodels/ville   : {t_fit:8.2f} s  -> {t_fit * n_cities:8.1f} s en série, "
+          f"~{t_fit * n_cities / cores:8.1f} s sur le pool de processus")
+    print(f"  MAE année retenue ({sample} villes) : vectorisé={mae(vectorized[vectorized['location'].isin(subset.columns)], truth):.3f}  "
+          f"statsmodels={mae(per_city, truth):.3f}")
+    print(f"  MAE année retenue ({n_cities} villes, vectorisé) : {mae(vectorized, truth):.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
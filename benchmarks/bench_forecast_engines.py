@@ -0,0 +1,52 @@
+"""Benchmark : précision et temps des moteurs de prévision sur des années retenues.
+
+Pour chaque année retenue, les moteurs sont ajustés sur les années précédentes puis comparés
+à l'année observée (MAE, RMSE, couverture de l'intervalle à 95 % du moteur harmonique).
+
+Usage : python -m benchmarks.bench_forecast_engines [n_villes]
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks.bench_batch_forecast import make_fleet
+from services.analytics.forecasting import forecast_temperature_many
+
+HOLDOUT_YEARS = (4, 5)  # années 5 et 6 de la flotte synthétique, prévues depuis les précédentes
+
+
+def evaluate(forecast, truth):
+    pred = forecast.pivot(index="date", columns="location", values="temperature_2m_mean_predite")
+    error = pred.to_numpy() - truth[pred.columns].to_numpy()
+    scores = {"mae": np.abs(error).mean(), "rmse": np.sqrt((error ** 2).mean())}
+    if "temperature_2m_mean_ic_bas" in forecast.columns:
+        low = forecast.pivot(index="date", columns="location", values="temperature_2m_mean_ic_bas")
+        high = forecast.pivot(index="date", columns="location", values="temperature_2m_mean_ic_haut")
+        actual = truth[pred.columns].to_numpy()
+        scores["couverture"] = ((actual >= low.to_numpy()) & (actual <= high.to_numpy())).mean()
+    return scores
+
+
+def main(n_cities: int = 8):
+    warnings.simplefilter("ignore")
+    fleet = make_fleet(n_cities, seed=1)
+    print(f"{n_cities} villes, années retenues : {len(HOLDOUT_YEARS)}")
+    for engine in ("statsmodels", "vectorized", "harmonic"):
+        totals, elapsed = [], 0.0
+        for year in HOLDOUT_YEARS:
+            history, truth = fleet.iloc[:year * 365], fleet.iloc[year * 365:(year + 1) * 365]
+            t0 = time.perf_counter()
+            forecast = forecast_temperature_many(history, periods=365, engine=engine, max_workers=1)
+            elapsed += time.perf_counter() - t0
+            totals.append(evaluate(forecast, truth))
+        means = {k: np.mean([s[k] for s in totals]) for k in totals[0]}
+        per_city = elapsed / (n_cities * len(HOLDOUT_YEARS)) * 1e3
+        extra = f"  couverture IC95={means['couverture']:.1%}" if "couverture" in means else ""
+        print(f"  {engine:<12} MAE={means['mae']:.3f}  RMSE={means['rmse']:.3f}  "
+              f"{per_city:9.2f} ms/ville{extra}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
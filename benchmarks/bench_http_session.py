@@ -0,0 +1,45 @@
+"""Benchmark : latence par requête, requests.get (nouvelle connexion) vs session poolée keep-alive.
+
+Usage : python -m benchmarks.bench_http_session [n_requests]
+"""
+import statistics
+import sys
+import time
+
+import requests
+
+from adapters.http_session import PooledSession
+from tests.stub_server import StubServer
+
+_PAYLOAD = {"daily": {"time": ["2024-10-01"], "temperature_2m_mean": [14.2]}}
+
+
+def _handler(path, query):
+    return 200, {}, _PAYLOAD
+
+
+def _measure(get, url, n):
+    timings = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        get(url, params={"latitude": 48.85, "longitude": 2.35}).raise_for_status()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def main(n: int = 500):
+    with StubServer(_handler) as server:
+        url = server.url + "/v1/archive"
+        _measure(requests.get, url, 20)  # échauffement
+        cold = _measure(lambda u, params: requests.get(u, params=params, timeout=20), url, n)
+        session = PooledSession()
+        pooled = _measure(session.get, url, n)
+        session.close()
+    for label, timings in (("requests.get", cold), ("PooledSession", pooled)):
+        print(f"{label:<15} mean={statistics.mean(timings)*1e3:.3f} ms  "
+              f"p50={statistics.median(timings)*1e3:.3f} ms  n={n}")
+    print(f"speedup (mean) : {statistics.mean(cold)/statistics.mean(pooled):.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,45 @@
+"""Benchmark : mémoire par ville en cache (5 ans), frames standard vs mode compact.
+
+Mesure le DataFrame brut (celui que conservent le planificateur et ``st.cache_data``) et
+l'ensemble de travail d'un rendu : brut + frame préparé pour l'affichage.
+
+Usage : python -m benchmarks.bench_memory
+"""
+import pickle
+
+from benchmarks.bench_transformer import make_payload
+from data.data_cleaning import create_daily_dataframe
+from data.transformer import DataTransformer, loads_json
+from services.analytics.statistics import StatisticsService
+from services.presentation.weather_presenter import WeatherPresenter
+
+
+def prepare(df, lazy):
+    # Même préparation que streamlit_app.prepare_dataframe
+    df = df.copy().reset_index().rename(columns={"date": "time"})
+    return WeatherPresenter.convert_sunshine_duration_to_hours(df, lazy=lazy)
+
+
+def footprint(df) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def main():
+    api_response = loads_json(make_payload(5 * 365))
+    variants = {
+        "standard": (create_daily_dataframe(api_response), False),
+        "compact": (DataTransformer(compact=True).create_daily_dataframe(api_response), True),
+    }
+    results = {}
+    for name, (raw, lazy) in variants.items():
+        prepared = prepare(raw, lazy)
+        results[name] = (footprint(raw), len(pickle.dumps(raw)), footprint(raw) + footprint(prepared))
+        avg_sun = StatisticsService.calculate_average_sunshine_hours(prepared)
+        print(f"{name:>9}  brut={results[name][0] / 1024:7.1f} Kio  pickle={results[name][1] / 1024:7.1f} Kio  "
+              f"brut+préparé={results[name][2] / 1024:7.1f} Kio  ensoleillement moyen={avg_sun:.3f} h")
+    ratios = [s / c for s, c in zip(results["standard"], results["compact"])]
+    print(f"    ratio  brut={ratios[0]:.2f}x  pickle={ratios[1]:.2f}x  brut+préparé={ratios[2]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark : allocations d'un rendu « Stat global », pipeline historique vs vue préparée unique.
+
+Chaque étape est exécutée sous tracemalloc ; on rapporte le pic alloué par étape et leur
+somme, exprimés aussi en équivalents du frame brut (≈ nombre de copies).
+
+Usage : python -m benchmarks.bench_render_copies
+"""
+import tracemalloc
+
+from benchmarks.bench_transformer import make_payload
+from data.transformer import DataTransformer
+from services.analytics.statistics import StatisticsService
+from services.presentation.weather_presenter import WeatherPresenter
+
+
+# --- Reproduction du chemin d'origine ---
+
+def legacy_prepare_dataframe(df):
+    df = df.copy()
+    if not df.empty and "date" in df.index.names:
+        df = df.reset_index().rename(columns={"date": "time"})
+    df = df.copy()
+    if "sunshine_duration" in df.columns and "sunshine_hours" not in df.columns:
+        df["sunshine_hours"] = df["sunshine_duration"] / 3600.0
+    return df
+
+
+def legacy_temperature(df):
+    return df.set_index("time")[["temperature_2m_mean", "temperature_2m_max", "temperature_2m_min"]]
+
+
+def legacy_precipitation(df):
+    return df.set_index("time")[["precipitation_sum"]]
+
+
+def legacy_comparison(df):
+    cmp_df = df.set_index("time")[["temperature_2m_mean", "apparent_temperature_mean"]].copy()
+    cmp_df["ecart_ressenti"] = cmp_df["apparent_temperature_mean"] - cmp_df["temperature_2m_mean"]
+    return cmp_df
+
+
+# --- Chemin actuel (identique à streamlit_app.prepare_dataframe) ---
+
+def prepare_dataframe(df):
+    if not df.empty and "date" in df.index.names:
+        df = df.rename_axis("time")
+    return WeatherPresenter.convert_sunshine_duration_to_hours(df)
+
+
+PIPELINES = {
+    "legacy": (legacy_prepare_dataframe, legacy_temperature, legacy_precipitation, legacy_comparison),
+    "vue": (prepare_dataframe, WeatherPresenter.prepare_temperature_chart_data,
+            WeatherPresenter.prepare_precipitation_chart_data, WeatherPresenter.prepare_temperature_comparison_data),
+}
+
+
+def render(raw, pipeline, report):
+    prepare, *charts = pipeline
+    keep = []
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    df = prepare(raw)
+    report.append(("prepare", tracemalloc.get_traced_memory()[1] - base))
+    for chart in charts:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        keep.append(chart(df))
+        report.append((chart.__name__, tracemalloc.get_traced_memory()[1] - base))
+    StatisticsService.safe_mean(df, "temperature_2m_mean")
+    StatisticsService.calculate_average_sunshine_hours(df)
+    return keep
+
+
+def main():
+    raw = DataTransformer().create_daily_dataframe_from_bytes(make_payload(5 * 365))
+    frame_bytes = raw.memory_usage(index=True).sum()
+    print(f"frame brut : {frame_bytes / 1024:.1f} Kio")
+    for name, pipeline in PIPELINES.items():
+        render(raw, pipeline, [])  # préchauffage (caches pandas internes)
+        report = []
+        tracemalloc.start()
+        render(raw, pipeline, report)
+        tracemalloc.stop()
+        total = sum(size for _, size in report)
+        print(f"\n{name}")
+        for step, size in report:
+            print(f"  {step:<38} {size / 1024:8.1f} Kio  ({size / frame_bytes:4.2f} frame)")
+        print(f"  {'total':<38} {total / 1024:8.1f} Kio  ({total / frame_bytes:4.2f} frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark : agrégats périodiques, moyennes glissantes, anomalies et degrés-jours sur une
+flotte synthétique (30 ans × 100 villes, format long ``city`` de ``get_weather_range_many``).
+
+Compare ``SeriesStatsEngine`` (clés de groupe calculées une fois, noyaux NumPy) à la
+séquence de groupbys pandas équivalente, une statistique à la fois.
+
+Usage : python -m benchmarks.bench_series_stats [n_villes] [n_années]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.analytics.series_stats import COOLING_BASE_C, HEATING_BASE_C, SeriesStatsEngine
+
+FREQS = ("week", "month", "season", "year")
+PANDAS_FREQS = {"month": "MS", "year": "YS"}
+
+
+def make_long_fleet(n_cities: int, n_years: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1995-01-01", periods=n_years * 365, freq="D", name="date")
+    n = len(dates)
+    t = np.arange(n)
+    frames = []
+    for i in range(n_cities):
+        season = np.sin(2 * np.pi * t / 365.25 - np.pi / 2 + rng.uniform(-0.3, 0.3))
+        mean = rng.uniform(5, 20) + rng.uniform(4, 12) * season + rng.normal(0, 2, n)
+        frames.append(pd.DataFrame({
+            "temperature_2m_mean": mean,
+            "temperature_2m_max": mean + rng.uniform(3, 8, n),
+            "temperature_2m_min": mean - rng.uniform(3, 8, n),
+            "precipitation_sum": np.clip(rng.gamma(0.6, 4.0, n) - 0.5, 0, None),
+            "sunshine_duration": np.clip(25000 + 15000 * season + rng.normal(0, 8000, n), 0, 86400),
+            "city": f"city_{i:03d}",
+        }, index=dates).astype({c: np.float32 for c in ("temperature_2m_mean", "temperature_2m_max",
+                                                       "temperature_2m_min", "precipitation_sum",
+                                                       "sunshine_duration")}))
+    return pd.concat(frames)
+
+
+def pandas_baseline(df: pd.DataFrame, window: int) -> None:
+    """Les mêmes statistiques en groupbys successifs, comme dans les vues actuelles."""
+    df = df.assign(sunshine_hours=df["sunshine_duration"] / 3600)
+    for freq in FREQS:
+        if freq == "week":
+            key = df.index - pd.to_timedelta(df.index.weekday, unit="D")
+        elif freq == "season":
+            key = df.index.to_period("Q-NOV").start_time
+        else:
+            key = df.index.to_period(PANDAS_FREQS[freq][0]).start_time
+        grouped = df.groupby([df["city"], key])
+        grouped["temperature_2m_mean"].mean()
+        grouped["temperature_2m_max"].agg(["mean", "max"])
+        grouped["temperature_2m_min"].agg(["mean", "min"])
+        grouped["precipitation_sum"].sum()
+        grouped["sunshine_hours"].sum()
+        temperature = df["temperature_2m_mean"]
+        (HEATING_BASE_C - temperature).clip(lower=0).groupby([df["city"], key]).sum()
+        (temperature - COOLING_BASE_C).clip(lower=0).groupby([df["city"], key]).sum()
+    by_city = df.groupby("city")
+    for col in ("temperature_2m_mean", "temperature_2m_max", "temperature_2m_min", "precipitation_sum",
+                "sunshine_hours"):
+        by_city[col].rolling(window).mean()
+        doy = df.index.dayofyear
+        normal = df.groupby([df["city"], doy])[col].transform("mean")
+        df[col] - normal
+
+
+def engine_run(df: pd.DataFrame, window: int) -> None:
+    engine = SeriesStatsEngine(df)
+    for freq in FREQS:
+        engine.resample(freq)
+        engine.degree_days(freq)
+    engine.rolling_mean(window)
+    engine.anomalies(smooth_days=0)
+
+
+def main(n_cities: int = 100, n_years: int = 30, window: int = 30):
+    df = make_long_fleet(n_cities, n_years)
+    print(f"{n_cities} villes × {n_years} ans : {len(df):,} lignes, "
+          f"{df.memory_usage(deep=True).sum() / 2**20:.0f} Mo")
+    for name, run in (("groupbys pandas", pandas_baseline), ("SeriesStatsEngine", engine_run)):
+        t0 = time.perf_counter()
+        run(df, window)
+        print(f"  {name:<18}: {time.perf_counter() - t0:6.2f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,50 @@
+"""Benchmark : construction du DataFrame journalier, chemin historique vs chemin colonnaire.
+
+Usage : python -m benchmarks.bench_transformer
+"""
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from data.transformer import DAILY_COLUMNS, DataTransformer
+
+
+def legacy_create_daily_dataframe(api_response):
+    # Reproduction du chemin d'origine : dict de listes, inférence des types, parsing des dates
+    daily = api_response["daily"]
+    possible_columns = ["time"] + DAILY_COLUMNS
+    df = pd.DataFrame({col: daily[col] for col in possible_columns if col in daily})
+    if "time" in df.columns:
+        df["time"] = pd.to_datetime(df["time"])
+        df.rename(columns={"time": "date"}, inplace=True)
+        df.set_index("date", inplace=True)
+    return df
+
+
+def make_payload(n_days: int) -> bytes:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("1995-01-01", periods=n_days, freq="D")
+    daily = {"time": dates.strftime("%Y-%m-%d").tolist()}
+    for column in DAILY_COLUMNS:
+        if column == "weathercode":
+            daily[column] = rng.integers(0, 99, n_days).tolist()
+        else:
+            daily[column] = np.round(rng.normal(10, 5, n_days), 1).tolist()
+    return json.dumps({"latitude": 48.85, "longitude": 2.35, "daily": daily}).encode()
+
+
+def main():
+    transformer = DataTransformer()
+    for n_days in (1, 365, 30 * 365):
+        payload = make_payload(n_days)
+        number = max(3, 3000 // max(1, n_days // 50))
+        legacy = timeit.timeit(lambda: legacy_create_daily_dataframe(json.loads(payload)), number=number) / number
+        fast = timeit.timeit(lambda: transformer.create_daily_dataframe_from_bytes(payload), number=number) / number
+        print(f"{n_days:>6} jours  legacy={legacy*1e3:8.3f} ms  columnar={fast*1e3:8.3f} ms  "
+              f"speedup={legacy/fast:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
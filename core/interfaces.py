@@ -1,4 +1,4 @@
-from typing import Protocol, Dict, Any, Optional
+from typing import Protocol, Dict, Any, Iterable, List, Optional
 
 
 class GeocodingProvider(Protocol):
@@ -17,3 +17,31 @@ class WeatherProvider(Protocol):
         ...
 
 
+
+
+class BatchGeocodingProvider(GeocodingProvider, Protocol):
+    def geocode_many(self, cities: Iterable[str], max_workers: int = 8) -> Dict[str, Optional[Dict[str, Any]]]:
+        ...
+
+
+class BatchWeatherProvider(WeatherProvider, Protocol):
+    def daily_range_many(
+        self, geolocs: List[Dict[str, Any]], start: str, end: str, max_workers: int = 4
+    ) -> List[Optional[Dict[str, Any]]]:
+        ...
+
+
+class AsyncGeocodingProvider(Protocol):
+    async def geocode(self, city: str) -> Optional[Dict[str, Any]]:
+        ...
+
+
+class AsyncWeatherProvider(Protocol):
+    async def daily_today(self, geoloc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def daily_range(self, geoloc: Dict[str, Any], start: str, end: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def daily_same_day_last_year(self, geoloc: Dict[str, Any], date_last_year: str) -> Optional[Dict[str, Any]]:
+        ...
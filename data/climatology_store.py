@@ -0,0 +1,137 @@
+"""Matrices climatologiques mappées en mémoire pour l'analyse multi-villes.
+
+Une matrice float32 ``localisations × jours`` par variable, stockée au format ``.npy`` et
+ouverte en ``np.memmap`` : les processus qui ouvrent le même répertoire partagent les pages
+du cache système au lieu de dupliquer les données. Un index des localisations et un
+calendrier (date de début + nombre de jours) donnent l'adresse de chaque valeur. Les jours
+absents valent NaN, y compris pour ``weathercode``, stocké lui aussi en float32.
+"""
+import json
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from data.transformer import DAILY_COLUMNS
+
+_META_FILE = "climatology.json"
+
+
+class ClimatologyStore:
+    """Vues NumPy sans copie et DataFrames légers sur des matrices (localisations × jours)."""
+
+    def __init__(self, root: Union[str, Path], mode: str = "r"):
+        if mode not in ("r", "r+"):
+            raise ValueError("mode doit valoir 'r' ou 'r+'")
+        self.root = Path(root)
+        self.mode = mode
+        meta = json.loads((self.root / _META_FILE).read_text())
+        self.start = date.fromisoformat(meta["start"])
+        self.n_days = int(meta["n_days"])
+        self.locations: List[str] = list(meta["locations"])
+        self.variables: List[str] = list(meta["variables"])
+        self._location_index = {key: i for i, key in enumerate(self.locations)}
+        self._arrays: Dict[str, np.memmap] = {
+            var: np.load(self.root / f"{var}.npy", mmap_mode=mode) for var in self.variables
+        }
+
+    @classmethod
+    def create(
+        cls,
+        root: Union[str, Path],
+        locations: Sequence[str],
+        start: date,
+        end: date,
+        variables: Iterable[str] = DAILY_COLUMNS,
+    ) -> "ClimatologyStore":
+        """Alloue des matrices remplies de NaN et retourne le store ouvert en écriture."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        variables = list(variables)
+        n_days = (end - start).days + 1
+        for var in variables:
+            array = np.lib.format.open_memmap(
+                root / f"{var}.npy", mode="w+", dtype=np.float32, shape=(len(locations), n_days)
+            )
+            array[:] = np.nan
+            array.flush()
+            del array
+        meta = {"start": start.isoformat(), "n_days": n_days, "locations": list(locations), "variables": variables}
+        (root / _META_FILE).write_text(json.dumps(meta))
+        return cls(root, mode="r+")
+
+    def __reduce__(self):
+        # Un worker rouvre le mapping par son chemin : rien n'est copié dans le pickle
+        return (ClimatologyStore, (str(self.root), self.mode))
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.n_days - 1)
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.date_range(self.start, periods=self.n_days, freq="D", name="date")
+
+    def location_index(self, location: str) -> int:
+        try:
+            return self._location_index[location]
+        except KeyError:
+            raise KeyError(f"Localisation inconnue : {location}") from None
+
+    def day_offset(self, day: Union[date, str]) -> int:
+        """Position d'un jour par rapport au début du calendrier (négative avant, >= n_days après)."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        return (day - self.start).days
+
+    def _day_slice(self, start, end) -> slice:
+        # Bornes calculées sur les positions non bornées : une plage entièrement hors du
+        # calendrier donne une tranche vide
+        lo = 0 if start is None else self.day_offset(start)
+        hi = self.n_days if end is None else self.day_offset(end) + 1
+        lo, hi = min(max(lo, 0), self.n_days), min(max(hi, 0), self.n_days)
+        return slice(lo, max(lo, hi))
+
+    def array(self, variable: str) -> np.memmap:
+        """Matrice complète d'une variable (localisations × jours)."""
+        return self._arrays[variable]
+
+    def view(self, variable: str, location: Optional[str] = None,
+             start: Optional[Union[date, str]] = None, end: Optional[Union[date, str]] = None) -> np.ndarray:
+        """Vue sans copie : une ligne si ``location`` est donnée, sinon toutes les localisations."""
+        days = self._day_slice(start, end)
+        array = self._arrays[variable]
+        if location is None:
+            return array[:, days]
+        return array[self.location_index(location), days]
+
+    def frame(self, location: str, start: Optional[Union[date, str]] = None,
+              end: Optional[Union[date, str]] = None, variables: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame indexé par date dont les colonnes sont des vues sur les matrices."""
+        days = self._day_slice(start, end)
+        row = self.location_index(location)
+        index = pd.date_range(self.start + timedelta(days=days.start), periods=days.stop - days.start,
+                              freq="D", name="date")
+        columns = {var: self._arrays[var][row, days] for var in (variables or self.variables)}
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def write(self, location: str, df: pd.DataFrame) -> None:
+        """Copie un DataFrame journalier (format DataTransformer) dans la ligne de ``location``.
+
+        Les jours hors calendrier et les colonnes inconnues sont ignorés.
+        """
+        if self.mode != "r+":
+            raise PermissionError("ClimatologyStore ouvert en lecture seule")
+        row = self.location_index(location)
+        offsets = ((df.index.values.astype("datetime64[D]") - np.datetime64(self.start, "D"))
+                   .astype(np.int64))
+        inside = (offsets >= 0) & (offsets < self.n_days)
+        for var in self.variables:
+            if var in df.columns:
+                self._arrays[var][row, offsets[inside]] = df[var].to_numpy(dtype=np.float32)[inside]
+
+    def flush(self) -> None:
+        for array in self._arrays.values():
+            array.flush()
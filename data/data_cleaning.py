@@ -1,16 +1,22 @@
 import pandas as pd
 
-def create_daily_dataframe(api_response):
+from data.transformer import DataTransformer
+
+def create_daily_dataframe(api_response, compact=False):
     """
     Crée un DataFrame pandas à partir de la réponse API contenant les données daily.
     Compatible avec les API forecast et historical.
     
     Args:
         api_response: Réponse JSON de l'API Open-Meteo
+        compact: types compacts (float32), voir ``data.transformer.COMPACT_DTYPES``
     
     Returns:
         DataFrame pandas avec les données daily indexé par date
     """
+    if compact:
+        return DataTransformer(compact=True).create_daily_dataframe(api_response)
+
     if not api_response or "daily" not in api_response:
         print("Erreur : Aucune donnée daily dans la réponse de l'API")
         return pd.DataFrame()
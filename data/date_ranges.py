@@ -0,0 +1,37 @@
+"""Intervalles de dates fermés : fusion et sous-plages manquantes.
+
+Module sans dépendance vers les services : utilisé à la fois par le stockage local
+(``data.timeseries_store``) et par le planificateur (``services.range_planner``).
+"""
+from datetime import date, timedelta
+from typing import List, Tuple
+
+DateRange = Tuple[date, date]
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """Fusionne des intervalles fermés qui se chevauchent ou se touchent."""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered: List[DateRange], start: date, end: date) -> List[DateRange]:
+    """Sous-plages de [start, end] non couvertes par ``covered``."""
+    gaps: List[DateRange] = []
+    cursor = start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - timedelta(days=1)))
+        cursor = max(cursor, c_end + timedelta(days=1))
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
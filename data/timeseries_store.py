@@ -0,0 +1,157 @@
+"""Stockage local colonnaire (Parquet) de l'historique journalier.
+
+Disposition : ``<root>/<localisation>/year=YYYY/part-<n>.parquet``. Chaque ajout écrit un
+nouveau fichier par année touchée ; la compaction fusionne les fichiers d'une année en un
+seul, dédupliqué par date. Les lectures ne parcourent que les années et colonnes demandées.
+Le même objet sert de backend persistant au RangePlanner (méthodes coverage/read/write).
+"""
+import json
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from data.date_ranges import DateRange, merge_ranges
+from data.transformer import DAILY_DTYPES
+
+_BATCH_COLUMN = "_batch"  # ordre d'écriture : en cas de doublon, la dernière écriture gagne
+_COVERAGE_FILE = "_coverage.json"
+
+# Schéma disque unique, quel que soit le mode du DataTransformer (complet ou compact) et la
+# présence de valeurs manquantes : les fichiers d'une même localisation se concatènent sans
+# conflit de types. Les colonnes hors DAILY_DTYPES sont stockées en float64.
+STORE_DTYPES = DAILY_DTYPES
+
+
+def _safe_location(location: str) -> str:
+    return location.replace(",", "_").replace("/", "_")
+
+
+class WeatherHistoryStore:
+    """Historique journalier par localisation, partitionné par année, compressé en Parquet."""
+
+    def __init__(self, root: Union[str, Path], compression: str = "zstd", max_parts_per_year: int = 8):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.max_parts_per_year = max_parts_per_year
+        self._lock = threading.Lock()
+
+    def _location_dir(self, location: str) -> Path:
+        return self.root / _safe_location(location)
+
+    def append(self, location: str, df: pd.DataFrame) -> None:
+        """Ajoute les lignes d'un DataFrame indexé par date (format DataTransformer)."""
+        if df is None or df.empty:
+            return
+        frame = df.reset_index()
+        frame = frame.astype({
+            column: STORE_DTYPES.get(column, np.float64)
+            for column in frame.columns
+            if column != "date" and pd.api.types.is_numeric_dtype(frame[column])
+        })
+        frame[_BATCH_COLUMN] = time.time_ns()
+        years = frame["date"].dt.year
+        with self._lock:
+            for year, part in frame.groupby(years):
+                year_dir = self._location_dir(location) / f"year={year}"
+                year_dir.mkdir(parents=True, exist_ok=True)
+                self._write_part(year_dir, part)
+                if len(list(year_dir.glob("part-*.parquet"))) > self.max_parts_per_year:
+                    self._compact_year(year_dir)
+
+    def _write_part(self, year_dir: Path, part: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        final = year_dir / f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+        tmp = final.with_suffix(".tmp")
+        pq.write_table(table, tmp, compression=self.compression)
+        os.replace(tmp, final)  # publication atomique pour les lecteurs concurrents
+
+    def _year_parts(self, location: str, start: Optional[date], end: Optional[date]) -> List[Path]:
+        """Fichiers des seules partitions d'année qui recoupent [start, end]."""
+        parts: List[Path] = []
+        for year_dir in sorted(self._location_dir(location).glob("year=*")):
+            year = int(year_dir.name.split("=", 1)[1])
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            parts.extend(sorted(year_dir.glob("part-*.parquet")))
+        return parts
+
+    def read(
+        self,
+        location: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Lit [start, end] en ne parcourant que les années, colonnes et groupes de lignes nécessaires."""
+        # Filtre poussé dans le lecteur Parquet : les groupes de lignes hors bornes (statistiques
+        # min/max de ``date``) ne sont pas décodés
+        filters = [("date", op, pd.Timestamp(bound)) for bound, op in ((start, ">="), (end, "<="))
+                   if bound is not None]
+        tables = []
+        for part in self._year_parts(location, start, end):
+            wanted = None
+            if columns is not None:
+                names = pq.read_schema(part).names
+                wanted = ["date", _BATCH_COLUMN] + [c for c in columns if c in names]
+            tables.append(pq.read_table(part, columns=wanted, filters=filters or None))
+        if not tables:
+            return None
+        # « permissive » : les fichiers écrits avant le schéma fixe (int8/float32) restent lisibles
+        table = pa.concat_tables(tables, promote_options="permissive")
+        if table.num_rows == 0:
+            return None
+        if pc.count_distinct(table.column("date")).as_py() == table.num_rows:
+            # Cas courant (partitions compactées) : pas de doublon à résoudre
+            df = table.sort_by("date").drop_columns([_BATCH_COLUMN]).to_pandas()
+        else:
+            df = table.to_pandas().sort_values(["date", _BATCH_COLUMN]).drop_duplicates("date", keep="last")
+            df = df.drop(columns=_BATCH_COLUMN)
+        df = df.set_index("date")
+        df.index = df.index.as_unit("ns")
+        return df
+
+    def compact(self, location: str) -> None:
+        """Fusionne les fichiers de chaque année d'une localisation en un seul fichier dédupliqué."""
+        with self._lock:
+            for year_dir in sorted(self._location_dir(location).glob("year=*")):
+                self._compact_year(year_dir)
+
+    def _compact_year(self, year_dir: Path) -> None:
+        parts = sorted(year_dir.glob("part-*.parquet"))
+        if len(parts) <= 1:
+            return
+        frame = pa.concat_tables([pq.read_table(p) for p in parts], promote_options="permissive").to_pandas()
+        frame = frame.sort_values(["date", _BATCH_COLUMN]).drop_duplicates("date", keep="last")
+        self._write_part(year_dir, frame)
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+    def locations(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    # --- Backend du RangePlanner ---
+
+    def coverage(self, location: str) -> List[DateRange]:
+        path = self._location_dir(location) / _COVERAGE_FILE
+        if not path.exists():
+            return []
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in json.loads(path.read_text())]
+
+    def write(self, location: str, df: pd.DataFrame, covered: List[DateRange]) -> None:
+        self.append(location, df)
+        merged = merge_ranges(self.coverage(location) + covered)
+        path = self._location_dir(location) / _COVERAGE_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps([[s.isoformat(), e.isoformat()] for s, e in merged]))
+        os.replace(tmp, path)
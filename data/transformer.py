@@ -1,35 +1,107 @@
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # décodeur standard en repli
+    orjson = None
+
+DAILY_COLUMNS = [
+    "weathercode",
+    "temperature_2m_mean",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "apparent_temperature_mean",
+    "apparent_temperature_max",
+    "wind_speed_10m_max",
+    "sunshine_duration",
+    "precipitation_sum",
+    "shortwave_radiation_sum",
+]
+
+# Types explicites : pas d'inférence pandas, ni de colonnes object. Chaque colonne a un seul
+# type quelles que soient les valeurs reçues : weathercode (codes WMO 0..99, exacts en
+# float32) doit pouvoir porter NaN pour les jours manquants de l'archive.
+WEATHERCODE_DTYPE = np.float32
+DAILY_DTYPES = {column: np.float64 for column in DAILY_COLUMNS}
+DAILY_DTYPES["weathercode"] = WEATHERCODE_DTYPE
+
+# Mode compact (opt-in). Contrat de précision :
+# - mesures en float32 : ~7 chiffres significatifs, sans perte pour les valeurs Open-Meteo
+#   (résolution 0,1 °C / 0,1 mm / 0,01 MJ/m²) ;
+# - weathercode en float32, comme en mode complet ;
+# - sunshine_duration conservé en secondes float32 (exact à la seconde jusqu'à 86 400 s) ;
+#   les heures ne sont pas matérialisées, ``sunshine_hours`` les dérive à la demande.
+# Le mode ne concerne que la mémoire : le stockage disque garde le schéma complet
+# (``data.timeseries_store.STORE_DTYPES``) et ``DataTransformer.conform`` retype les frames relus.
+COMPACT_DTYPES = {column: np.float32 for column in DAILY_COLUMNS}
+COMPACT_DTYPES["weathercode"] = WEATHERCODE_DTYPE
+
+
+def loads_json(payload: Union[bytes, str]) -> Any:
+    """Décode une réponse JSON avec orjson quand il est disponible."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _column(name: str, values: List[Any], dtypes: Dict[str, Any] = DAILY_DTYPES) -> np.ndarray:
+    # Tous les types sont flottants : les valeurs nulles deviennent NaN sans changer de type
+    return np.asarray(values, dtype=dtypes[name])
+
+
+def sunshine_hours(df: pd.DataFrame) -> Optional[pd.Series]:
+    """Ensoleillement en heures, lu s'il est matérialisé, sinon dérivé de ``sunshine_duration``.
+
+    Le type de la colonne source est conservé (float32 en mode compact).
+    """
+    if "sunshine_hours" in df.columns:
+        return df["sunshine_hours"]
+    if "sunshine_duration" not in df.columns:
+        return None
+    return (df["sunshine_duration"] / 3600.0).rename("sunshine_hours")
+
+
+def _date_index(times: List[str]) -> pd.DatetimeIndex:
+    n = len(times)
+    if n == 0:
+        return pd.DatetimeIndex([], name="date")
+    try:
+        # Série journalière contiguë : index calculé depuis la date de début, sans parser chaque chaîne
+        days = np.datetime64(times[0], "D") + np.arange(n)
+        if days[-1] != np.datetime64(times[-1], "D"):
+            days = np.asarray(times, dtype="datetime64[D]")
+    except ValueError:
+        return pd.DatetimeIndex(pd.to_datetime(times), name="date")
+    return pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+
 
 class DataTransformer:
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        self._dtypes = COMPACT_DTYPES if compact else DAILY_DTYPES
+
     def create_daily_dataframe(self, api_response: Dict[str, Any]) -> pd.DataFrame:
         if not api_response or "daily" not in api_response:
             return pd.DataFrame()
 
         daily = api_response["daily"]
-        possible_columns = [
-            "time",
-            "weathercode",
-            "temperature_2m_mean",
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "apparent_temperature_mean",
-            "apparent_temperature_max",
-            "wind_speed_10m_max",
-            "sunshine_duration",
-            "precipitation_sum",
-            "shortwave_radiation_sum",
-        ]
-
-        df = pd.DataFrame({col: daily[col] for col in possible_columns if col in daily})
-
-        if "time" in df.columns:
-            df["time"] = pd.to_datetime(df["time"])
-            df.rename(columns={"time": "date"}, inplace=True)
-            df.set_index("date", inplace=True)
-
-        return df
+        columns = {col: _column(col, daily[col], self._dtypes) for col in DAILY_COLUMNS if col in daily}
+
+        if "time" not in daily:
+            return pd.DataFrame(columns)
+        return pd.DataFrame(columns, index=_date_index(daily["time"]), copy=False)
 
+    def conform(self, df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Ramène aux types du transformer un DataFrame relu d'un stockage (schéma disque unique)."""
+        if df is None:
+            return None
+        casts = {col: dtype for col, dtype in self._dtypes.items() if col in df.columns and df[col].dtype != dtype}
+        return df.astype(casts) if casts else df
 
+    def create_daily_dataframe_from_bytes(self, payload: Union[bytes, str]) -> pd.DataFrame:
+        """Construit le DataFrame directement depuis le corps brut de la réponse HTTP."""
+        return self.create_daily_dataframe(loads_json(payload))
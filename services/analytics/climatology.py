@@ -0,0 +1,303 @@
+"""Index climatologique par jour de l'année : normales, écarts-types et rangs centiles.
+
+Chaque observation journalière est ajoutée aux jours de l'année voisins (fenêtre de
+``±window_days`` jours, calendrier circulaire de 366 jours où le 29 février a sa propre case).
+Pour chaque variable et chaque jour de l'année, l'index conserve des statistiques
+suffisantes (effectif, somme, somme des carrés) et un histogramme à bornes fixes qui sert
+d'esquisse des centiles. Une requête ne dépend donc ni de la longueur de l'historique ni du
+réseau, et les nouveaux jours s'intègrent par simple addition.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data.transformer import sunshine_hours
+
+N_SLOTS = 366
+
+# Bornes des histogrammes (unités Open-Meteo) ; les valeurs hors bornes tombent dans la
+# première ou la dernière classe
+SKETCH_RANGES: Dict[str, Tuple[float, float]] = {
+    "temperature_2m_mean": (-50.0, 50.0),
+    "temperature_2m_max": (-50.0, 60.0),
+    "temperature_2m_min": (-60.0, 45.0),
+    "apparent_temperature_mean": (-60.0, 55.0),
+    "precipitation_sum": (0.0, 150.0),
+    "wind_speed_10m_max": (0.0, 200.0),
+    "sunshine_hours": (0.0, 24.0),
+    "shortwave_radiation_sum": (0.0, 40.0),
+}
+CLIMATOLOGY_VARIABLES = tuple(SKETCH_RANGES)
+
+
+def _column(df: pd.DataFrame, variable: str) -> Optional[pd.Series]:
+    if variable in df.columns:
+        return df[variable]
+    if variable == "sunshine_hours":
+        return sunshine_hours(df)
+    return None
+
+
+def _dates(df: pd.DataFrame) -> pd.DatetimeIndex:
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index
+    return pd.DatetimeIndex(pd.to_datetime(df['date']))
+
+
+def day_slot(dates) -> np.ndarray:
+    """Case du calendrier de 366 jours (0 = 1er janvier, 59 = 29 février, 365 = 31 décembre)."""
+    days = np.asarray(pd.DatetimeIndex(dates) if not isinstance(dates, np.ndarray) else dates,
+                      dtype="datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    doy = (days - years.astype("datetime64[D]")).astype(np.int64)
+    year = years.astype(np.int64) + 1970
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return doy + ((~leap) & (doy >= 59)).astype(np.int64)
+
+
+@dataclass(frozen=True)
+class ClimatologyIndex:
+    """Statistiques par (variable, jour de l'année). Immuable : ``update`` retourne un nouvel index.
+
+    ``count``, ``total`` et ``total_sq`` ont la forme (variables, 366) ; ``hist`` la forme
+    (variables, 366, classes). ``last_dates`` donne, pour chaque variable, le dernier jour
+    ingéré avec une valeur ; ``first_date`` est le premier jour ingéré, toutes variables confondues.
+    """
+    variables: Tuple[str, ...]
+    window_days: int
+    edges: np.ndarray
+    count: np.ndarray
+    total: np.ndarray
+    total_sq: np.ndarray
+    hist: np.ndarray
+    last_dates: Tuple[Optional[pd.Timestamp], ...] = ()
+    first_date: Optional[pd.Timestamp] = None
+
+    @classmethod
+    def empty(cls, variables=CLIMATOLOGY_VARIABLES, window_days: int = 7, n_bins: int = 128) -> "ClimatologyIndex":
+        variables = tuple(variables)
+        edges = np.array([np.linspace(*SKETCH_RANGES[var], n_bins + 1) for var in variables])
+        shape = (len(variables), N_SLOTS)
+        return cls(
+            variables=variables, window_days=window_days, edges=edges,
+            count=np.zeros(shape, dtype=np.int64), total=np.zeros(shape), total_sq=np.zeros(shape),
+            hist=np.zeros(shape + (n_bins,), dtype=np.uint32),
+        )
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, variables=CLIMATOLOGY_VARIABLES, window_days: int = 7,
+              n_bins: int = 128) -> "ClimatologyIndex":
+        """Index construit sur tout l'historique journalier ``df``."""
+        return cls.empty(variables, window_days, n_bins).update(df)
+
+    @property
+    def n_bins(self) -> int:
+        return self.hist.shape[2]
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        """Dernier jour ingéré avec au moins une valeur."""
+        known = [d for d in self.last_dates if d is not None]
+        return max(known) if known else None
+
+    def update(self, df: pd.DataFrame) -> "ClimatologyIndex":
+        """Intègre, pour chaque variable, les jours de ``df`` postérieurs à son dernier jour ingéré.
+
+        Un jour déjà ingéré n'est jamais révisé : une valeur corrigée ensuite par l'archive, ou
+        arrivée après une valeur plus récente de la même variable, n'est pas reprise. Si ``df``
+        contient des jours observés antérieurs à ``first_date`` (historique complété en amont),
+        l'index est reconstruit depuis ``df`` seul.
+        """
+        dates = _dates(df)
+        columns = [_column(df, var) for var in self.variables]
+        values = [None if c is None else c.to_numpy(dtype=np.float64, na_value=np.nan) for c in columns]
+        observed = np.zeros(len(dates), dtype=bool)
+        for v in values:
+            if v is not None:
+                observed |= ~np.isnan(v)
+        if not observed.any():
+            return self
+        first_observed = dates[observed].min()
+        if self.first_date is not None and first_observed < self.first_date:
+            rebuilt = ClimatologyIndex.empty(self.variables, self.window_days, self.n_bins)
+            return rebuilt.update(df)
+
+        spread = np.arange(-self.window_days, self.window_days + 1)
+        slots = day_slot(dates)
+        count, total, total_sq, hist = (a.copy() for a in (self.count, self.total, self.total_sq, self.hist))
+        last_dates = list(self.last_dates or (None,) * len(self.variables))
+        n_bins = self.n_bins
+        changed = False
+        for v, x_all in enumerate(values):
+            if x_all is None:
+                continue
+            ok = ~np.isnan(x_all)
+            if last_dates[v] is not None:
+                ok &= np.asarray(dates > last_dates[v])
+            if not ok.any():
+                continue
+            changed = True
+            last_dates[v] = dates[ok].max()
+            slot = ((slots[ok][:, None] + spread) % N_SLOTS).ravel()  # (jours × largeur de fenêtre)
+            x = np.repeat(x_all[ok], len(spread))
+            bins = np.clip(np.searchsorted(self.edges[v], x, side="right") - 1, 0, n_bins - 1)
+            count[v] += np.bincount(slot, minlength=N_SLOTS)
+            total[v] += np.bincount(slot, weights=x, minlength=N_SLOTS)
+            total_sq[v] += np.bincount(slot, weights=x * x, minlength=N_SLOTS)
+            cells = np.bincount(slot * n_bins + bins, minlength=N_SLOTS * n_bins)
+            hist[v] += cells.reshape(N_SLOTS, n_bins).astype(np.uint32)
+        if not changed:
+            return self
+        first_date = first_observed if self.first_date is None else min(first_observed, self.first_date)
+        return replace(self, count=count, total=total, total_sq=total_sq, hist=hist,
+                       last_dates=tuple(last_dates), first_date=first_date)
+
+    def _cell(self, day: Union[date, str, pd.Timestamp], variable: str) -> Tuple[int, int]:
+        try:
+            v = self.variables.index(variable)
+        except ValueError:
+            raise KeyError(f"Variable absente de l'index climatologique : {variable}") from None
+        day = pd.Timestamp(day)
+        return v, day.dayofyear - 1 + int(not day.is_leap_year and day.month > 2)
+
+    def normal(self, day: Union[date, str, pd.Timestamp], variable: str) -> Tuple[Optional[float], Optional[float]]:
+        """(moyenne, écart-type) de ``variable`` autour du jour de l'année de ``day``."""
+        v, s = self._cell(day, variable)
+        n = self.count[v, s]
+        if n == 0:
+            return None, None
+        mean = self.total[v, s] / n
+        if n < 2:
+            return float(mean), None
+        var = max(self.total_sq[v, s] / n - mean * mean, 0.0) * n / (n - 1)
+        return float(mean), float(np.sqrt(var))
+
+    def percentile_rank(self, day: Union[date, str, pd.Timestamp], variable: str, value: float) -> Optional[float]:
+        """Rang centile (0-100) de ``value`` parmi les observations du même jour de l'année."""
+        v, s = self._cell(day, variable)
+        hist = self.hist[v, s]
+        n = int(hist.sum())
+        if n == 0 or value is None or np.isnan(value):
+            return None
+        edges = self.edges[v]
+        b = int(np.clip(np.searchsorted(edges, value, side="right") - 1, 0, self.n_bins - 1))
+        frac = float(np.clip((value - edges[b]) / (edges[b + 1] - edges[b]), 0.0, 1.0))
+        return 100.0 * (float(hist[:b].sum()) + frac * float(hist[b])) / n
+
+    def quantile(self, day: Union[date, str, pd.Timestamp], variable: str, q: float) -> Optional[float]:
+        """Quantile ``q`` (0-1) estimé depuis l'histogramme, interpolé dans la classe."""
+        v, s = self._cell(day, variable)
+        cum = np.cumsum(self.hist[v, s], dtype=np.float64)
+        if cum[-1] == 0:
+            return None
+        target = q * cum[-1]
+        b = int(min(np.searchsorted(cum, target, side="left"), self.n_bins - 1))
+        below = cum[b - 1] if b else 0.0
+        inside = cum[b] - below
+        frac = (target - below) / inside if inside else 0.0
+        edges = self.edges[v]
+        return float(edges[b] + frac * (edges[b + 1] - edges[b]))
+
+    def compare(self, df_day: pd.DataFrame) -> pd.DataFrame:
+        """Compare la première ligne de ``df_day`` à la normale de son jour de l'année.
+
+        Une ligne par variable : valeur, normale, écart-type, anomalie, score z et rang centile.
+        """
+        day = _dates(df_day)[0]
+        rows = {}
+        for var in self.variables:
+            series = _column(df_day, var)
+            value = float(series.iloc[0]) if series is not None and len(series) else np.nan
+            mean, std = self.normal(day, var)
+            mean = np.nan if mean is None else mean
+            std = np.nan if std is None else std
+            rank = self.percentile_rank(day, var, value)
+            rows[var] = {
+                "valeur": value,
+                "normale": mean,
+                "ecart_type": std,
+                "anomalie": value - mean,
+                "score_z": (value - mean) / std if std and std > 0 else np.nan,
+                "rang_centile": np.nan if rank is None else rank,
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+class ClimatologyCache:
+    """Index climatologiques par localisation, en mémoire et optionnellement sur disque (.npz).
+
+    ``index_for`` construit l'index au premier appel puis n'intègre, variable par variable, que
+    les jours postérieurs au dernier jour ingéré (voir ``ClimatologyIndex.update``) ; l'index
+    n'est réécrit sur disque que s'il a changé.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, window_days: int = 7, n_bins: int = 128):
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.window_days = window_days
+        self.n_bins = n_bins
+        self._indexes: Dict[str, ClimatologyIndex] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha1(key.encode()).hexdigest()[:20]}.npz"
+
+    def get(self, key: str) -> Optional[ClimatologyIndex]:
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is not None or self.path is None or not self._file(key).exists():
+            return index
+        with np.load(self._file(key), allow_pickle=False) as data:
+            variables = tuple(str(v) for v in data["variables"])
+            if "last_dates" in data:
+                last_dates = tuple(pd.Timestamp(str(d)) if str(d) else None for d in data["last_dates"])
+                first_date = str(data["first_date"])
+            else:
+                # Ancien format : un seul dernier jour commun, pas de premier jour
+                last_date = str(data["last_date"])
+                last_dates = (pd.Timestamp(last_date) if last_date else None,) * len(variables)
+                first_date = ""
+            index = ClimatologyIndex(
+                variables=variables, window_days=int(data["window_days"]),
+                edges=data["edges"], count=data["count"], total=data["total"], total_sq=data["total_sq"],
+                hist=data["hist"], last_dates=last_dates,
+                first_date=pd.Timestamp(first_date) if first_date else None,
+            )
+        with self._lock:
+            self._indexes[key] = index
+        return index
+
+    def put(self, key: str, index: ClimatologyIndex) -> None:
+        with self._lock:
+            self._indexes[key] = index
+        if self.path is None:
+            return
+        tmp = self._file(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                variables=np.array(index.variables), window_days=np.array(index.window_days),
+                edges=index.edges, count=index.count, total=index.total, total_sq=index.total_sq,
+                hist=index.hist,
+                last_dates=np.array([d.isoformat() if d is not None else "" for d in index.last_dates], dtype=str),
+                first_date=np.array(index.first_date.isoformat() if index.first_date is not None else ""),
+            )
+        os.replace(tmp, self._file(key))
+
+    def index_for(self, key: str, df: pd.DataFrame) -> ClimatologyIndex:
+        """Index à jour pour l'historique ``df`` de la localisation ``key``."""
+        index = self.get(key)
+        if index is None:
+            index = ClimatologyIndex.empty(window_days=self.window_days, n_bins=self.n_bins)
+        updated = index.update(df)
+        if updated is not index or self.get(key) is None:
+            self.put(key, updated)
+        return updated
@@ -1,21 +1,383 @@
+import hashlib
+import itertools
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Union
+
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
+SEASONAL_PERIODS = 365
+FORECAST_ENGINES = ("statsmodels", "vectorized", "harmonic")
+
 
-def forecast_temperature_next_year(df_multi_year: pd.DataFrame, periods: int = 365) -> pd.DataFrame:
+def _daily_series(df_multi_year: pd.DataFrame) -> pd.Series:
     df = df_multi_year.copy()
     if 'date' in df.index.names:
         df = df.reset_index()
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values('date').reset_index(drop=True)
-    ts = df.set_index('date')['temperature_2m_mean']
-    model = ExponentialSmoothing(ts, trend='add', seasonal='add', seasonal_periods=365)
+    return df.set_index('date')['temperature_2m_mean']
+
+
+def _fingerprint(values: np.ndarray) -> str:
+    """Empreinte des ``SEASONAL_PERIODS`` dernières valeurs observées de ``values``.
+
+    Les NaN sont ignorés : une série à trous a la même empreinte, qu'elle soit lue sans ses
+    jours manquants (``_as_series``) ou réindexée au pas journalier (``_fit_matrix``).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    tail = values[~np.isnan(values)][-SEASONAL_PERIODS:]
+    return hashlib.sha1(np.ascontiguousarray(tail).tobytes()).hexdigest()
+
+
+@dataclass(frozen=True)
+class HoltWintersState:
+    """État final d'un Holt-Winters additif : paramètres de lissage et dernières composantes.
+
+    ``season`` contient les ``SEASONAL_PERIODS`` dernières composantes saisonnières (la plus
+    ancienne en tête) ; ``fingerprint`` est l'empreinte des dernières valeurs observées.
+    """
+    alpha: float
+    beta: float
+    gamma: float
+    level: float
+    trend: float
+    season: np.ndarray
+    last_date: pd.Timestamp
+    fingerprint: str
+    updates: int = 0  # jours intégrés depuis le dernier ajustement complet
+
+    def update(self, values: np.ndarray, tail: np.ndarray, last_date: pd.Timestamp) -> "HoltWintersState":
+        """Intègre de nouvelles observations avec les paramètres existants, sans réoptimisation."""
+        level, trend = self.level, self.trend
+        season = list(self.season)
+        for y in values:
+            s_past = season[-SEASONAL_PERIODS]
+            if np.isnan(y):
+                y = level + trend + s_past  # jour manquant : aucune correction, comme _fit_matrix
+            new_level = self.alpha * (y - s_past) + (1 - self.alpha) * (level + trend)
+            new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+            season.append(self.gamma * (y - level - trend) + (1 - self.gamma) * s_past)
+            level, trend = new_level, new_trend
+        return replace(
+            self, level=level, trend=trend, season=np.asarray(season[-SEASONAL_PERIODS:]),
+            last_date=last_date, fingerprint=_fingerprint(tail), updates=self.updates + len(values),
+        )
+
+    def forecast(self, periods: int) -> np.ndarray:
+        h = np.arange(1, periods + 1)
+        return self.level + h * self.trend + self.season[(h - 1) % SEASONAL_PERIODS]
+
+
+def fit_holt_winters(ts: pd.Series) -> HoltWintersState:
+    model = ExponentialSmoothing(ts, trend='add', seasonal='add', seasonal_periods=SEASONAL_PERIODS)
     model_fit = model.fit()
-    forecast_values = model_fit.forecast(periods)
-    forecast_dates = pd.date_range(start=ts.index[-1] + pd.Timedelta(days=1), periods=periods)
+    params = model_fit.params
+    return HoltWintersState(
+        alpha=float(params['smoothing_level']),
+        beta=float(params['smoothing_trend']),
+        gamma=float(params['smoothing_seasonal']),
+        level=float(model_fit.level.iloc[-1]),
+        trend=float(model_fit.trend.iloc[-1]),
+        season=np.asarray(model_fit.season.iloc[-SEASONAL_PERIODS:], dtype=np.float64),
+        last_date=ts.index[-1],
+        fingerprint=_fingerprint(ts.values),
+    )
+
+
+class HoltWintersCache:
+    """Modèles ajustés par localisation, en mémoire et optionnellement sur disque (un .npz par clé).
+
+    Si la série reçue prolonge celle du modèle en cache (mêmes valeurs sur la dernière saison
+    connue), les nouveaux jours sont intégrés par les récurrences de lissage au lieu d'un nouvel
+    ajustement. Au-delà de ``max_update_days`` nouveaux jours d'un coup, ou de ``refit_after_days``
+    jours cumulés depuis l'ajustement, les paramètres sont réoptimisés.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_update_days: int = 31,
+                 refit_after_days: int = 90):
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.max_update_days = max_update_days
+        self.refit_after_days = refit_after_days
+        self._states: Dict[str, HoltWintersState] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha1(key.encode()).hexdigest()[:20]}.npz"
+
+    def get(self, key: str) -> Optional[HoltWintersState]:
+        with self._lock:
+            state = self._states.get(key)
+        if state is not None or self.path is None or not self._file(key).exists():
+            return state
+        with np.load(self._file(key), allow_pickle=False) as data:
+            alpha, beta, gamma, level, trend, updates = data["scalars"]
+            state = HoltWintersState(
+                alpha=float(alpha), beta=float(beta), gamma=float(gamma), level=float(level),
+                trend=float(trend), season=data["season"], last_date=pd.Timestamp(str(data["last_date"])),
+                fingerprint=str(data["fingerprint"]), updates=int(updates),
+            )
+        with self._lock:
+            self._states[key] = state
+        return state
+
+    def put(self, key: str, state: HoltWintersState) -> None:
+        with self._lock:
+            self._states[key] = state
+        if self.path is None:
+            return
+        tmp = self._file(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                scalars=np.array([state.alpha, state.beta, state.gamma, state.level, state.trend, state.updates]),
+                season=state.season,
+                last_date=np.array(state.last_date.isoformat()),
+                fingerprint=np.array(state.fingerprint),
+            )
+        os.replace(tmp, self._file(key))
+
+    def lookup(self, key: str, ts: pd.Series) -> Optional[HoltWintersState]:
+        """État en cache pour ``ts``, mis à jour incrémentalement si possible ; None s'il faut réajuster."""
+        state = self.get(key)
+        if state is None or state.last_date not in ts.index:
+            return None
+        pos = ts.index.get_loc(state.last_date)
+        known = ts.values[:pos + 1]
+        new = ts.values[pos + 1:]
+        if (_fingerprint(known) != state.fingerprint or len(new) > self.max_update_days
+                or state.updates + len(new) > self.refit_after_days):
+            return None
+        if len(new) == 0:
+            return state
+        state = state.update(new, ts.values, ts.index[-1])
+        self.put(key, state)
+        return state
+
+    def state_for(self, key: str, ts: pd.Series) -> HoltWintersState:
+        """État à jour pour ``ts`` : lu tel quel, mis à jour incrémentalement, ou réajusté."""
+        state = self.lookup(key, ts)
+        if state is None:
+            state = fit_holt_winters(ts)
+            self.put(key, state)
+        return state
+
+
+# Grille des paramètres de lissage explorée par le moteur vectorisé
+_ALPHAS = (0.005, 0.02, 0.05, 0.1, 0.2, 0.4)
+_BETAS = (0.0, 0.001, 0.01)
+_GAMMAS = (0.0, 0.02, 0.05, 0.15)
+
+
+def _fit_matrix(values: np.ndarray, index: pd.DatetimeIndex) -> List[HoltWintersState]:
+    """Ajuste un Holt-Winters additif sur chaque colonne de ``values`` (jours × séries).
+
+    Les récurrences sont évaluées pour toutes les séries et toute la grille de paramètres à la
+    fois ; chaque série garde la combinaison de plus faible erreur quadratique à un pas. Les
+    valeurs manquantes sont remplacées par la prévision à un pas (aucune correction).
+    """
+    n, n_series = values.shape
+    m = SEASONAL_PERIODS
+    if n < 2 * m:
+        raise ValueError("Au moins deux saisons complètes sont nécessaires pour initialiser le modèle.")
+    grid = np.array(list(itertools.product(_ALPHAS, _BETAS, _GAMMAS)))
+    alpha, beta, gamma = (grid[:, i][None, :] for i in range(3))
+
+    # Initialisation : niveau et tendance depuis les moyennes des deux premières saisons
+    first, second = np.nanmean(values[:m], axis=0), np.nanmean(values[m:2 * m], axis=0)
+    trend0 = (second - first) / m
+    level0 = first - trend0 * (m + 1) / 2
+    season0 = values[:m] - (level0 + trend0 * np.arange(1, m + 1)[:, None])
+    season0 = np.nan_to_num(season0 - np.nanmean(season0, axis=0))
+
+    level = np.repeat(level0[:, None], len(grid), axis=1)
+    trend = np.repeat(trend0[:, None], len(grid), axis=1)
+    season = np.repeat(season0[:, :, None], len(grid), axis=2)  # tampon circulaire (m, séries, grille)
+    sse = np.zeros_like(level)
+    for t in range(n):
+        s_past = season[t % m]
+        fitted = level + trend + s_past
+        error = np.nan_to_num(values[t][:, None] - fitted)
+        observed = fitted + error
+        new_level = alpha * (observed - s_past) + (1 - alpha) * (level + trend)
+        season[t % m] = gamma * (observed - level - trend) + (1 - gamma) * s_past
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+        sse += error * error
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n_series)
+    ordered = np.roll(season[:, rows, best], -(n % m), axis=0)  # plus ancienne composante en tête
+    return [
+        HoltWintersState(
+            alpha=float(grid[best[i], 0]), beta=float(grid[best[i], 1]), gamma=float(grid[best[i], 2]),
+            level=float(level[i, best[i]]), trend=float(trend[i, best[i]]), season=ordered[:, i].copy(),
+            last_date=index[-1], fingerprint=_fingerprint(values[:, i]),
+        )
+        for i in range(n_series)
+    ]
+
+
+def _as_series(series: Union[Mapping[str, pd.DataFrame], pd.DataFrame]) -> Dict[str, pd.Series]:
+    if isinstance(series, pd.DataFrame):
+        # Matrice jours × localisations (index de dates, une colonne par localisation)
+        wide = series.sort_index()
+        wide.index = pd.to_datetime(wide.index)
+        out = {str(col): wide[col].rename_axis('date').dropna() for col in wide.columns}
+    else:
+        out = {key: _daily_series(df) for key, df in series.items() if df is not None and not df.empty}
+    # Séries vides ou sans aucune valeur : écartées du lot au lieu de le faire échouer
+    return {key: ts for key, ts in out.items() if ts.notna().any()}
+
+
+def _fit_vectorized(series: Dict[str, pd.Series], chunk_size: int) -> Dict[str, HoltWintersState]:
+    by_end: Dict[pd.Timestamp, List[str]] = defaultdict(list)
+    for key, ts in series.items():
+        by_end[ts.index[-1]].append(key)
+    states: Dict[str, HoltWintersState] = {}
+    for keys in by_end.values():
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            wide = pd.concat([series[key] for key in chunk], axis=1)
+            wide = wide.reindex(pd.date_range(wide.index[0], wide.index[-1], freq='D'))
+            states.update(zip(chunk, _fit_matrix(wide.to_numpy(dtype=np.float64), wide.index)))
+    return states
+
+
+def _fit_statsmodels(series: Dict[str, pd.Series], max_workers: Optional[int]) -> Dict[str, HoltWintersState]:
+    keys = list(series)
+    if max_workers == 1 or len(keys) <= 1:
+        return {key: fit_holt_winters(series[key]) for key in keys}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(keys, pool.map(fit_holt_winters, [series[key] for key in keys], chunksize=4)))
+
+
+def _harmonic_design(dates: pd.DatetimeIndex, origin: pd.Timestamp, n_harmonics: int) -> np.ndarray:
+    """Constante, tendance (en années) et termes de Fourier du jour de l'année."""
+    years = ((dates - origin) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64) / 365.25
+    phase = 2 * np.pi * (dates.dayofyear.to_numpy(dtype=np.float64) - 1) / 365.25
+    columns = [np.ones_like(years), years]
+    for k in range(1, n_harmonics + 1):
+        columns += [np.cos(k * phase), np.sin(k * phase)]
+    return np.column_stack(columns)
+
+
+def _forecast_harmonic(series: Dict[str, pd.Series], periods: int, n_harmonics: int,
+                       level: float) -> Dict[str, pd.DataFrame]:
+    """Régression harmonique par moindres carrés, résolue en une fois pour les séries de même axe."""
+    from scipy.stats import norm
+
+    z = norm.ppf(0.5 + level / 2)
+    series = {key: ts.dropna() for key, ts in series.items()}
+    # Séries regroupées par axe de dates identique (mêmes jours observés, trous compris) :
+    # tous les membres d'un groupe partagent la même matrice de régression
+    groups: Dict[bytes, List[str]] = defaultdict(list)
+    for key, ts in series.items():
+        groups[ts.index.as_unit('ns').asi8.tobytes()].append(key)
+    out: Dict[str, pd.DataFrame] = {}
+    for keys in groups.values():
+        index = series[keys[0]].index
+        x = _harmonic_design(index, index[0], n_harmonics)
+        if len(index) <= x.shape[1]:
+            raise ValueError("Historique trop court pour la régression harmonique.")
+        y = np.column_stack([series[key].to_numpy(dtype=np.float64) for key in keys])
+        coef, _, _, _ = np.linalg.lstsq(x, y, rcond=None)
+        residual_var = ((y - x @ coef) ** 2).sum(axis=0) / (len(index) - x.shape[1])
+
+        future = pd.date_range(index[-1] + pd.Timedelta(days=1), periods=periods, name='date')
+        x_future = _harmonic_design(future, index[0], n_harmonics)
+        leverage = np.einsum('ij,jk,ik->i', x_future, np.linalg.pinv(x.T @ x), x_future)
+        mean = x_future @ coef
+        half_width = z * np.sqrt(np.outer(1 + leverage, residual_var))
+        for j, key in enumerate(keys):
+            out[key] = pd.DataFrame({
+                'date': future,
+                'temperature_2m_mean_predite': mean[:, j],
+                'temperature_2m_mean_ic_bas': mean[:, j] - half_width[:, j],
+                'temperature_2m_mean_ic_haut': mean[:, j] + half_width[:, j],
+            })
+    return out
+
+
+def forecast_temperature_many(
+    series: Union[Mapping[str, pd.DataFrame], pd.DataFrame],
+    periods: int = 365,
+    engine: str = "vectorized",
+    cache: Optional[HoltWintersCache] = None,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256,
+    n_harmonics: int = 3,
+    interval_level: float = 0.95,
+) -> pd.DataFrame:
+    """Prévision de nombreuses séries, au format long.
+
+    ``series`` : dict localisation -> DataFrame multi-années (format de
+    ``forecast_temperature_next_year``), ou matrice jours × localisations.
+    ``engine`` :
+
+    - ``"vectorized"`` : Holt-Winters additif, récurrences NumPy sur toutes les séries,
+      paramètres choisis sur une grille ;
+    - ``"statsmodels"`` : Holt-Winters additif optimisé par série, réparti sur un pool de processus ;
+    - ``"harmonic"`` : tendance linéaire + ``n_harmonics`` termes de Fourier du jour de l'année,
+      moindres carrés ; accepte les historiques courts et ajoute les bornes de l'intervalle de
+      prévision au niveau ``interval_level`` (``temperature_2m_mean_ic_bas`` / ``_ic_haut``).
+      Ce moteur n'utilise pas ``cache`` : l'ajustement coûte quelques millisecondes.
+
+    Retourne les colonnes ``location``, ``date``, ``temperature_2m_mean_predite`` (+ bornes).
+    Les localisations sans aucune valeur (série vide ou entièrement NaN) sont absentes du résultat.
+    """
+    if engine not in FORECAST_ENGINES:
+        raise ValueError(f"Moteur inconnu : {engine}")
+    all_series = _as_series(series)
+    if engine == "harmonic":
+        frames = _forecast_harmonic(all_series, periods, n_harmonics, interval_level)
+        if not frames:
+            return pd.DataFrame(columns=['location', 'date', 'temperature_2m_mean_predite'])
+        return pd.concat(
+            [frames[key].assign(location=key) for key in all_series], ignore_index=True
+        )[['location', 'date', 'temperature_2m_mean_predite', 'temperature_2m_mean_ic_bas',
+           'temperature_2m_mean_ic_haut']]
+    states: Dict[str, HoltWintersState] = {}
+    to_fit: Dict[str, pd.Series] = {}
+    for key, ts in all_series.items():
+        state = cache.lookup(key, ts) if cache is not None else None
+        if state is None:
+            to_fit[key] = ts
+        else:
+            states[key] = state
+    if to_fit:
+        fitted = (_fit_vectorized(to_fit, chunk_size) if engine == "vectorized"
+                  else _fit_statsmodels(to_fit, max_workers))
+        for key, state in fitted.items():
+            if cache is not None:
+                cache.put(key, state)
+        states.update(fitted)
+
+    keys = list(all_series)
+    offsets = pd.to_timedelta(np.tile(np.arange(1, periods + 1), len(keys)), unit='D')
+    last_dates = np.repeat(np.array([states[key].last_date for key in keys], dtype='datetime64[ns]'), periods)
     return pd.DataFrame({
-        'date': forecast_dates,
-        'temperature_2m_mean_predite': forecast_values.values
+        'location': np.repeat(np.array(keys, dtype=object), periods),
+        'date': pd.DatetimeIndex(last_dates) + offsets,
+        'temperature_2m_mean_predite': np.concatenate([states[key].forecast(periods) for key in keys])
+        if keys else np.empty(0),
     })
 
 
+def forecast_temperature_next_year(df_multi_year: pd.DataFrame, periods: int = 365,
+                                   cache: Optional[HoltWintersCache] = None,
+                                   key: Optional[str] = None,
+                                   engine: str = "statsmodels") -> pd.DataFrame:
+    out = forecast_temperature_many(
+        {key or '': df_multi_year}, periods=periods, engine=engine,
+        cache=cache if key is not None else None, max_workers=1,
+    )
+    return out.drop(columns='location')
@@ -1,36 +1,303 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 
+PCA_VARIABLES = [
+    'apparent_temperature_mean',
+    'wind_speed_10m_max',
+    'sunshine_duration',
+    'precipitation_sum',
+    'shortwave_radiation_sum'
+]
+
+# Au-delà de ces tailles, le pipeline mis en cache calcule les seules composantes affichées
+# par SVD randomisée (graine fixe : résultats identiques d'une exécution à l'autre)
+RANDOMIZED_MIN_ROWS = 20_000
+RANDOMIZED_MIN_VARIABLES = 20
+
+
+def _digest(dates: np.ndarray, x: np.ndarray) -> str:
+    """Empreinte des dates et valeurs d'une fenêtre (même calcul côté pipeline et sommes préfixes)."""
+    dates = np.ascontiguousarray(dates, dtype='datetime64[ns]')
+    return hashlib.sha1(dates.tobytes() + np.ascontiguousarray(x, dtype=np.float64).tobytes()).hexdigest()
+
+
+def frame_digest(df: pd.DataFrame, variables=PCA_VARIABLES) -> str:
+    """Empreinte des dates et des variables de l'ACP d'un DataFrame (clé de cache des sommes préfixes)."""
+    dates = df.index if 'date' in df.index.names else df['date']
+    columns = [v for v in variables if v in df.columns]
+    return _digest(np.asarray(pd.to_datetime(dates)), df[columns].to_numpy(dtype=np.float64))
+
+
+def _flip_signs(components: np.ndarray) -> np.ndarray:
+    # Convention de scikit-learn : le coefficient de plus grande valeur absolue de chaque axe est positif
+    rows = np.arange(components.shape[0])
+    signs = np.sign(components[rows, np.argmax(np.abs(components), axis=1)])
+    signs[signs == 0] = 1
+    return components * signs[:, None]
+
+
+def _acp_frames(components: np.ndarray, explained_var: np.ndarray, scores: np.ndarray,
+                dates: np.ndarray, temperature: np.ndarray, variables):
+    columns = [f'PC{i+1}' for i in range(components.shape[0])]
+    df_pcs = pd.DataFrame(scores, columns=columns)
+    df_pcs['date'] = dates
+    df_pcs['temperature_2m_mean'] = temperature
+    loadings = pd.DataFrame(components.T, columns=columns, index=list(variables))
+    return df_pcs, loadings, explained_var
+
+
+@dataclass(frozen=True)
+class RollingAcp:
+    """ACP glissante : une décomposition par fenêtre.
+
+    ``loadings`` est de forme (fenêtres × variables × composantes) et ``explained_var`` de
+    forme (fenêtres × composantes). L'orientation de chaque axe est alignée d'une fenêtre valide
+    à la suivante (produit scalaire positif), par-dessus les fenêtres à NaN ; la première suit
+    la convention de scikit-learn.
+    """
+    window_start: pd.DatetimeIndex
+    window_end: pd.DatetimeIndex
+    variables: List[str]
+    loadings: np.ndarray
+    explained_var: np.ndarray
+
+    def loadings_frame(self, component: int = 1) -> pd.DataFrame:
+        """Coefficients d'une composante (1 = PC1) par fin de fenêtre, une colonne par variable."""
+        return pd.DataFrame(self.loadings[:, :, component - 1], index=self.window_end, columns=self.variables)
+
+
+class PcaPartials:
+    """Statistiques suffisantes cumulées jour par jour pour l'ACP de n'importe quelle fenêtre.
+
+    Les sommes préfixes de l'effectif, de X et de XᵀX donnent la covariance d'une fenêtre
+    [start, end] par deux lectures et une soustraction, en O(variables²) quel que soit le
+    nombre de jours ; seule la projection des scores reste proportionnelle à la fenêtre.
+    Les données sont centrées sur leur moyenne globale avant cumul pour limiter les erreurs
+    d'arrondi des grandes sommes.
+    """
+
+    def __init__(self, df_multi_year: pd.DataFrame, variables=PCA_VARIABLES):
+        df = df_multi_year.reset_index() if 'date' in df_multi_year.index.names else df_multi_year
+        missing = [v for v in variables if v not in df.columns]
+        if missing:
+            raise KeyError(f"La colonne '{missing[0]}' est absente du DataFrame.")
+        self.variables = list(variables)
+        order = np.argsort(pd.to_datetime(df['date']).to_numpy(), kind='stable')
+        self.dates = pd.to_datetime(df['date']).to_numpy()[order]
+        self.temperature = df['temperature_2m_mean'].to_numpy()[order]
+        x = df[self.variables].to_numpy(dtype=np.float64)[order]
+        self._raw = x  # valeurs d'origine, pour vérifier qu'une fenêtre correspond aux données de l'appelant
+        invalid = np.isnan(x).any(axis=1)
+        self._invalid = np.concatenate([[0], np.cumsum(invalid)])
+        self._offset = np.nanmean(x, axis=0) if (~invalid).any() else np.zeros(x.shape[1])
+        self._x = np.where(np.isnan(x), 0.0, x - self._offset)
+        n, p = self._x.shape
+        self._sums = np.zeros((n + 1, p))
+        np.cumsum(self._x, axis=0, out=self._sums[1:])
+        self._cross = np.zeros((n + 1, p, p))
+        np.cumsum(self._x[:, :, None] * self._x[:, None, :], axis=0, out=self._cross[1:])
+
+    def _bounds(self, start_date, end_date) -> Tuple[int, int]:
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date)), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date)), side='right')
+        return int(lo), int(hi)
+
+    def window_digest(self, start_date, end_date) -> str:
+        """Empreinte de la fenêtre, comparable à celle calculée par ``AcpPipeline`` sur un DataFrame."""
+        lo, hi = self._bounds(start_date, end_date)
+        return _digest(self.dates[lo:hi], self._raw[lo:hi])
 
-def acp_temperature(df_multi_year: pd.DataFrame, start_date: str, end_date: str):
+    def window_moments(self, start_date, end_date) -> Tuple[int, np.ndarray, np.ndarray]:
+        """Effectif, moyenne et covariance (ddof=0) de la fenêtre, depuis les sommes préfixes."""
+        lo, hi = self._bounds(start_date, end_date)
+        count = hi - lo
+        if count == 0:
+            raise ValueError("Aucune observation dans la fenêtre demandée.")
+        if self._invalid[hi] != self._invalid[lo]:
+            raise ValueError("La fenêtre contient des valeurs manquantes (NaN).")
+        mean = (self._sums[hi] - self._sums[lo]) / count
+        cov = (self._cross[hi] - self._cross[lo]) / count - np.outer(mean, mean)
+        return count, mean + self._offset, cov
+
+    def rolling(self, window_days: int = 90, step_days: int = 1) -> RollingAcp:
+        """ACP de toutes les fenêtres glissantes de ``window_days`` jours, en une passe vectorisée.
+
+        Les covariances de toutes les fenêtres sont lues dans les sommes préfixes, puis
+        décomposées par un ``eigh`` batché. Les fenêtres contenant des NaN valent NaN.
+        """
+        window = np.timedelta64(window_days - 1, 'D')
+        first_end = np.searchsorted(self.dates, self.dates[0] + window, side='left')
+        ends = np.arange(first_end, len(self.dates), step_days)
+        his = ends + 1
+        los = np.searchsorted(self.dates, self.dates[ends] - window, side='left')
+        counts = (his - los)[:, None]
+        mean = (self._sums[his] - self._sums[los]) / counts
+        cov = (self._cross[his] - self._cross[los]) / counts[:, :, None] - mean[:, :, None] * mean[:, None, :]
+        std = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None))
+        std[std == 0] = 1.0
+        corr = cov / (std[:, :, None] * std[:, None, :])
+        invalid = self._invalid[his] != self._invalid[los]
+        corr[invalid] = np.eye(len(self.variables))
+
+        eigvals, eigvecs = np.linalg.eigh(corr)  # (W, p), (W, p, p) ; valeurs croissantes
+        eigvals = np.clip(eigvals[:, ::-1], 0, None)
+        loadings = eigvecs[:, :, ::-1]
+        valid = np.flatnonzero(~invalid)
+        if len(valid):
+            # Les fenêtres avec NaN (base identité arbitraire) restent hors de l'alignement
+            aligned = loadings[valid]
+            aligned[0] = _flip_signs(aligned[0].T).T
+            # Alignement d'orientation : signe du produit scalaire avec la fenêtre valide précédente, cumulé
+            dots = np.einsum('wvk,wvk->wk', aligned[1:], aligned[:-1])
+            flips = np.cumprod(np.where(dots < 0, -1.0, 1.0), axis=0)
+            aligned[1:] *= flips[:, None, :]
+            loadings[valid] = aligned
+        explained_var = eigvals / eigvals.sum(axis=1, keepdims=True)
+        loadings[invalid] = np.nan
+        explained_var[invalid] = np.nan
+        return RollingAcp(
+            window_start=pd.DatetimeIndex(self.dates[los]), window_end=pd.DatetimeIndex(self.dates[ends]),
+            variables=self.variables, loadings=loadings, explained_var=explained_var,
+        )
+
+    def acp(self, start_date: str, end_date: str):
+        """Même contrat que ``acp_temperature`` : (df_pcs, loadings, explained_var)."""
+        lo, hi = self._bounds(start_date, end_date)
+        _, mean, cov = self.window_moments(start_date, end_date)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        std[std == 0] = 1.0  # colonne constante : même traitement que StandardScaler
+        corr = cov / np.outer(std, std)
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        order = np.argsort(eigvals)[::-1]
+        eigvals = np.clip(eigvals[order], 0, None)
+        components = _flip_signs(eigvecs[:, order].T)
+        explained_var = eigvals / eigvals.sum()
+        scaled = (self._x[lo:hi] + self._offset - mean) / std
+        return _acp_frames(components, explained_var, scaled @ components.T,
+                           self.dates[lo:hi], self.temperature[lo:hi], self.variables)
+
+
+def rolling_acp(df_multi_year: pd.DataFrame, window_days: int = 90, step_days: int = 1,
+                partials: Optional[PcaPartials] = None) -> RollingAcp:
+    """Évolution des loadings de ``acp_temperature`` sur des fenêtres glissantes de ``window_days`` jours."""
+    if partials is None:
+        partials = PcaPartials(df_multi_year)
+    return partials.rolling(window_days, step_days)
+
+
+def _truncate(result, n_components: Optional[int]):
+    df_pcs, loadings, explained_var = result
+    if n_components is None or n_components >= loadings.shape[1]:
+        return result
+    dropped = [f'PC{i+1}' for i in range(n_components, loadings.shape[1])]
+    return df_pcs.drop(columns=dropped), loadings.iloc[:, :n_components], explained_var[:n_components]
+
+
+def acp_temperature(df_multi_year: pd.DataFrame, start_date: str, end_date: str,
+                    partials: Optional[PcaPartials] = None, n_components: Optional[int] = None,
+                    svd_solver: str = "full", variables: Optional[Sequence[str]] = None):
+    if partials is not None:
+        return _truncate(partials.acp(start_date, end_date), n_components)
     df = df_multi_year.copy()
     if 'date' in df.index.names:
         df = df.reset_index(drop=False)
     df['date'] = pd.to_datetime(df['date'])
     df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-    vars_explicatives = [
-        'apparent_temperature_mean',
-        'wind_speed_10m_max',
-        'sunshine_duration',
-        'precipitation_sum',
-        'shortwave_radiation_sum'
-    ]
+    vars_explicatives = list(variables) if variables is not None else PCA_VARIABLES
     for v in vars_explicatives:
         if v not in df.columns:
             raise KeyError(f"La colonne '{v}' est absente du DataFrame.")
     X_scaled = StandardScaler().fit_transform(df[vars_explicatives])
-    pca = PCA()
+    pca = PCA(n_components=n_components, svd_solver=svd_solver, random_state=0)
     pcs = pca.fit_transform(X_scaled)
-    df_pcs = pd.DataFrame(pcs, columns=[f'PC{i+1}' for i in range(pcs.shape[1])])
-    df_pcs['date'] = df['date'].values
-    df_pcs['temperature_2m_mean'] = df['temperature_2m_mean'].values
-    loadings = pd.DataFrame(
-        pca.components_.T,
-        columns=[f'PC{i+1}' for i in range(pcs.shape[1])],
-        index=vars_explicatives
-    )
-    explained_var = pca.explained_variance_ratio_
-    return df_pcs, loadings, explained_var
+    return _acp_frames(pca.components_, pca.explained_variance_ratio_, pcs,
+                       df['date'].values, df['temperature_2m_mean'].values, vars_explicatives)
+
+
+@dataclass(frozen=True)
+class AcpResult:
+    """Résultat mémorisé : paramètres de standardisation, composantes et scores projetés."""
+    mean: np.ndarray
+    scale: np.ndarray
+    df_pcs: pd.DataFrame
+    loadings: pd.DataFrame
+    explained_var: np.ndarray
+
+    def as_tuple(self):
+        return self.df_pcs, self.loadings, self.explained_var
+
+
+class AcpPipeline:
+    """ACP mémorisée par localisation et empreinte des données de la fenêtre.
+
+    Un rerun Streamlit sur la même fenêtre relit le résultat sans recalcul ; si les données
+    de la fenêtre changent, l'empreinte change et l'ACP est recalculée. Les résultats sont
+    partagés entre appelants et ne doivent pas être modifiés.
+    """
+
+    def __init__(self, max_entries: int = 32, randomized_min_rows: int = RANDOMIZED_MIN_ROWS,
+                 randomized_min_variables: int = RANDOMIZED_MIN_VARIABLES):
+        self.max_entries = max_entries
+        self.randomized_min_rows = randomized_min_rows
+        self.randomized_min_variables = randomized_min_variables
+        self._entries: "OrderedDict[Hashable, AcpResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _window(df: pd.DataFrame, start_date: str, end_date: str, variables: Sequence[str]):
+        dates = df.index if 'date' in df.index.names else df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        mask = (dates >= np.datetime64(pd.Timestamp(start_date))) & (dates <= np.datetime64(pd.Timestamp(end_date)))
+        missing = [v for v in variables if v not in df.columns]
+        if missing:
+            raise KeyError(f"La colonne '{missing[0]}' est absente du DataFrame.")
+        return dates[mask], df[list(variables)].to_numpy(dtype=np.float64)[mask]
+
+    def solver_for(self, n_rows: int, n_variables: int, n_components: Optional[int]) -> str:
+        if n_components is not None and (n_rows >= self.randomized_min_rows
+                                         or n_variables >= self.randomized_min_variables):
+            return "randomized"
+        return "full"
+
+    def fit(self, location: str, df: pd.DataFrame, start_date: str, end_date: str,
+            n_components: Optional[int] = 2, partials: Optional[PcaPartials] = None,
+            variables: Optional[Sequence[str]] = None) -> AcpResult:
+        variables = list(variables) if variables is not None else PCA_VARIABLES
+        dates, x = self._window(df, start_date, end_date, variables)
+        digest = _digest(dates, x)
+        key = (location, start_date, end_date, n_components, tuple(variables), digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
 
+        solver = self.solver_for(len(x), len(variables), n_components)
+        # Sommes préfixes utilisées seulement si elles portent exactement les données de la fenêtre :
+        # des partials périmés (données revalidées depuis) sont ignorés
+        if (partials is not None and solver == "full" and partials.variables == variables
+                and partials.window_digest(start_date, end_date) == digest):
+            result = acp_temperature(df, start_date, end_date, partials=partials, n_components=n_components)
+        else:
+            result = acp_temperature(df, start_date, end_date, n_components=n_components,
+                                     svd_solver=solver, variables=variables)
+        entry = AcpResult(x.mean(axis=0), x.std(axis=0), *result)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
 
+    def acp(self, location: str, df: pd.DataFrame, start_date: str, end_date: str, **kwargs):
+        """Même contrat que ``acp_temperature`` : (df_pcs, loadings, explained_var)."""
+        return self.fit(location, df, start_date, end_date, **kwargs).as_tuple()
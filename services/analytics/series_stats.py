@@ -0,0 +1,251 @@
+"""Statistiques en masse sur séries journalières : agrégats périodiques, moyennes glissantes,
+anomalies et degrés-jours.
+
+Le moteur accepte un frame au format ``DataTransformer`` (index de dates, une colonne par
+variable), éventuellement en format long multi-villes (colonne ``city``, voir
+``WeatherService.get_weather_range_many``). Les lignes sont triées une fois par
+(localisation, date) ; les clés de groupe de chaque fréquence sont calculées une seule fois
+puis réutilisées par toutes les statistiques, toutes variables confondues.
+"""
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.analytics.climatology import N_SLOTS, day_slot
+from services.analytics.statistics import Aggregate, _series, compute_summary
+
+# Fréquences : semaine (lundi), mois, saison météorologique (DJF, MAM, JJA, SON ; décembre
+# compte dans l'hiver de l'année suivante), année
+FREQUENCIES = ("week", "month", "season", "year")
+
+DEFAULT_AGGREGATES: Dict[str, Tuple[str, ...]] = {
+    "temperature_2m_mean": ("mean",),
+    "temperature_2m_max": ("mean", "max"),
+    "temperature_2m_min": ("mean", "min"),
+    "precipitation_sum": ("sum",),
+    "sunshine_hours": ("sum",),
+}
+
+# Degrés-jours unifiés : base 18 °C sur la température moyenne journalière
+HEATING_BASE_C = 18.0
+COOLING_BASE_C = 18.0
+
+
+def _period_start(days: np.ndarray, freq: str) -> np.ndarray:
+    """Premier jour de la période de chaque jour (``days`` en datetime64[D])."""
+    if freq == "week":
+        d = days.astype(np.int64)
+        return (d - (d + 3) % 7).astype("datetime64[D]")  # 1970-01-01 était un jeudi
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if freq == "month":
+        return months.astype("datetime64[M]").astype("datetime64[D]")
+    if freq == "season":
+        return (months - (months % 12 + 1) % 3).astype("datetime64[M]").astype("datetime64[D]")
+    if freq == "year":
+        return days.astype("datetime64[Y]").astype("datetime64[D]")
+    raise ValueError(f"Fréquence inconnue : {freq!r} (attendu : {', '.join(FREQUENCIES)})")
+
+
+class SeriesStatsEngine:
+    """Agrégats périodiques, moyennes glissantes, anomalies et degrés-jours en une passe.
+
+    Les résultats multi-villes sont indexés par (localisation, période ou date) ; une seule
+    localisation donne un index de périodes ou de dates simple.
+    """
+
+    def __init__(self, df: pd.DataFrame, location_col: str = "city"):
+        if isinstance(df.index, pd.DatetimeIndex):
+            dates = df.index
+        else:
+            dates = pd.DatetimeIndex(pd.to_datetime(df["date"]))
+        days = np.asarray(dates, dtype="datetime64[D]")
+        if location_col in df.columns:
+            codes, self.locations = pd.factorize(df[location_col], sort=True)
+        else:
+            codes, self.locations = np.zeros(len(df), dtype=np.intp), None
+        order = np.lexsort((days, codes))
+        if (order != np.arange(len(order))).any():
+            df, days, codes = df.iloc[order], days[order], codes[order]
+        self.location_col = location_col
+        self._df = df
+        self.days = days
+        self.location_codes = codes
+        # Début de chaque localisation : les fenêtres glissantes ne la franchissent pas
+        self._segment_start = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else codes
+        self._keys: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self._columns: Dict[str, Optional[np.ndarray]] = {}
+        self._index: Optional[pd.Index] = None
+
+    @property
+    def multi_location(self) -> bool:
+        return self.locations is not None
+
+    def column(self, variable: str) -> Optional[np.ndarray]:
+        """Colonne en float64, extraite une fois (``sunshine_hours`` dérivé à la demande)."""
+        if variable not in self._columns:
+            series = _series(self._df, variable)
+            self._columns[variable] = (None if series is None
+                                       else series.to_numpy(dtype=np.float64, na_value=np.nan))
+        return self._columns[variable]
+
+    def _row_index(self) -> pd.Index:
+        if self._index is None:
+            dates = pd.DatetimeIndex(self.days.astype("datetime64[ns]"), name="date")
+            if not self.multi_location or not len(dates):
+                self._index = dates
+            else:
+                # Niveaux construits directement : calendrier continu, pas de refactorisation
+                first = self.days.min()
+                calendar = pd.date_range(first, self.days.max(), freq="D")
+                self._index = pd.MultiIndex(
+                    levels=[self.locations, calendar],
+                    codes=[self.location_codes, (self.days - first).astype(np.int64)],
+                    names=[self.location_col, "date"], verify_integrity=False,
+                )
+        return self._index
+
+    def group_keys(self, key: str) -> Tuple[np.ndarray, pd.Index]:
+        """Codes de groupe (localisation × période ou × jour de l'année) et index des groupes.
+
+        Calculés au premier appel puis partagés par toutes les statistiques de même clé.
+        """
+        if key not in self._keys:
+            if key == "day_of_year":
+                periods = day_slot(self.days)
+                combined = self.location_codes.astype(np.int64) * N_SLOTS + periods
+            else:
+                starts = _period_start(self.days, key).astype(np.int64)
+                offset = starts.min() if len(starts) else 0
+                width = (starts.max() - offset + 1) if len(starts) else 1
+                combined = self.location_codes.astype(np.int64) * width + (starts - offset)
+            if key == "day_of_year":
+                codes, uniques = pd.factorize(combined, sort=True)
+            else:
+                # Lignes triées par (localisation, date) : les clés de période sont croissantes
+                change = np.r_[True, combined[1:] != combined[:-1]] if len(combined) else np.zeros(0, bool)
+                codes = np.cumsum(change) - 1
+                uniques = combined[change]
+            if key == "day_of_year":
+                labels = [uniques % N_SLOTS]
+                names = ["jour_annee"]
+            else:
+                starts = (uniques % width + offset).astype("datetime64[D]").astype("datetime64[ns]")
+                labels = [pd.DatetimeIndex(starts)]
+                names = ["periode"]
+            if self.multi_location:
+                divisor = N_SLOTS if key == "day_of_year" else width
+                labels.insert(0, self.locations.take(uniques // divisor))
+                names.insert(0, self.location_col)
+                index = pd.MultiIndex.from_arrays(labels, names=names)
+            else:
+                index = pd.Index(labels[0], name=names[0])
+            self._keys[key] = (codes, index)
+        return self._keys[key]
+
+    def _summarize(self, key: str, columns: Mapping[str, np.ndarray], spec: Sequence[Aggregate]) -> pd.DataFrame:
+        codes, index = self.group_keys(key)
+        result = compute_summary(pd.DataFrame(dict(columns), copy=False), spec, by=codes)
+        return result.set_axis(index.take(result.index.to_numpy()), axis=0)
+
+    def resample(self, freq: str = "month",
+                 aggregates: Optional[Mapping[str, Sequence[str]]] = None) -> pd.DataFrame:
+        """Agrégats par période ; colonnes ``<variable>_<op>`` (ops de ``compute_summary``)."""
+        aggregates = DEFAULT_AGGREGATES if aggregates is None else aggregates
+        columns, spec = {}, []
+        for var, ops in aggregates.items():
+            values = self.column(var)
+            if values is None:
+                continue
+            columns[var] = values
+            spec.extend(Aggregate(f"{var}_{op}", var, op) for op in ops)
+        return self._summarize(freq, columns, spec)
+
+    def rolling_mean(self, window: int = 7, variables: Optional[Sequence[str]] = None,
+                     min_periods: Optional[int] = None) -> pd.DataFrame:
+        """Moyennes glissantes sur ``window`` lignes consécutives de chaque localisation.
+
+        Sommes cumulées : coût indépendant de ``window``. Les valeurs manquantes sont ignorées ;
+        moins de ``min_periods`` valeurs (par défaut ``window``) donnent NaN.
+        """
+        min_periods = window if min_periods is None else min_periods
+        variables = [v for v in (variables or DEFAULT_AGGREGATES) if self.column(v) is not None]
+        n = len(self.days)
+        # Une ligne par variable : sommes cumulées sur des lignes contiguës
+        block = np.array([self.column(v) for v in variables]).reshape(len(variables), n)
+        valid = ~np.isnan(block)
+        csum = np.zeros((len(variables), n + 1))
+        ccount = np.zeros((len(variables), n + 1))
+        np.cumsum(np.where(valid, block, 0.0), axis=1, out=csum[:, 1:])
+        np.cumsum(valid, axis=1, out=ccount[:, 1:])
+        # Fenêtres complètes : différences de sommes cumulées décalées (sans indexation)
+        sums = np.empty_like(block)
+        counts = np.empty_like(block)
+        if n >= window:
+            sums[:, window - 1:] = csum[:, window:] - csum[:, :n - window + 1]
+            counts[:, window - 1:] = ccount[:, window:] - ccount[:, :n - window + 1]
+        # Débuts de localisation : la fenêtre est tronquée au premier jour de la localisation
+        row = np.arange(n)
+        first = np.repeat(self._segment_start, np.diff(np.r_[self._segment_start, n]))
+        head = np.flatnonzero(row - first < window - 1)
+        sums[:, head] = csum[:, head + 1] - csum[:, first[head]]
+        counts[:, head] = ccount[:, head + 1] - ccount[:, first[head]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        means[counts < max(min_periods, 1)] = np.nan
+        return pd.DataFrame(means.T, index=self._row_index(), columns=variables)
+
+    def normals(self, variables: Optional[Sequence[str]] = None, smooth_days: int = 7) -> pd.DataFrame:
+        """Moyenne par (localisation, jour de l'année), lissée sur ±``smooth_days`` jours."""
+        variables = [v for v in (variables or DEFAULT_AGGREGATES) if self.column(v) is not None]
+        codes, index = self.group_keys("day_of_year")
+        slots = index.get_level_values("jour_annee").to_numpy()
+        n_loc = len(self.locations) if self.multi_location else 1
+        loc = np.empty(len(index), dtype=np.intp)
+        loc[codes] = self.location_codes
+        out = {}
+        for var in variables:
+            values = self.column(var)
+            ok = ~np.isnan(values)
+            # Sommes et effectifs par (localisation, case), puis lissage circulaire
+            cell = (loc[codes] * N_SLOTS + slots[codes])[ok]
+            sums = np.bincount(cell, weights=values[ok], minlength=n_loc * N_SLOTS).reshape(n_loc, N_SLOTS)
+            counts = np.bincount(cell, minlength=n_loc * N_SLOTS).reshape(n_loc, N_SLOTS).astype(np.float64)
+            if smooth_days:
+                shifts = range(-smooth_days, smooth_days + 1)
+                sums = sum(np.roll(sums, s, axis=1) for s in shifts)
+                counts = sum(np.roll(counts, s, axis=1) for s in shifts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[var] = (sums / counts)[loc, slots]
+        return pd.DataFrame(out, index=index)
+
+    def anomalies(self, variables: Optional[Sequence[str]] = None, smooth_days: int = 7) -> pd.DataFrame:
+        """Écart de chaque jour à la normale de son jour de l'année (voir ``normals``)."""
+        normals = self.normals(variables, smooth_days)
+        codes, _ = self.group_keys("day_of_year")
+        columns = {var: self.column(var) - normals[var].to_numpy()[codes] for var in normals.columns}
+        return pd.DataFrame(columns, index=self._row_index(), columns=list(normals.columns))
+
+    def degree_days(self, freq: str = "month", heating_base: float = HEATING_BASE_C,
+                    cooling_base: float = COOLING_BASE_C,
+                    temperature_col: str = "temperature_2m_mean") -> pd.DataFrame:
+        """Degrés-jours de chauffage et de climatisation cumulés par période."""
+        temperature = self.column(temperature_col)
+        if temperature is None:
+            raise KeyError(f"La colonne '{temperature_col}' est absente du DataFrame.")
+        with np.errstate(invalid="ignore"):
+            columns = {
+                "dju_chauffage": np.where(np.isnan(temperature), np.nan, np.maximum(heating_base - temperature, 0.0)),
+                "dju_climatisation": np.where(np.isnan(temperature), np.nan, np.maximum(temperature - cooling_base, 0.0)),
+            }
+        spec = [Aggregate(name, name, "sum") for name in columns]
+        return self._summarize(freq, columns, spec)
+
+    def compute_all(self, freq: str = "month", window: int = 30) -> Dict[str, pd.DataFrame]:
+        """Toutes les familles d'un coup, sur les mêmes colonnes et clés de groupe."""
+        return {
+            "resample": self.resample(freq),
+            "rolling": self.rolling_mean(window),
+            "anomalies": self.anomalies(),
+            "degree_days": self.degree_days(freq),
+        }
@@ -1,27 +1,176 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
+from data.transformer import sunshine_hours
+
+
+def _series(df: pd.DataFrame, col: str) -> Optional[pd.Series]:
+    """Colonne ``col`` ; ``sunshine_hours`` est dérivé à la demande s'il n'est pas matérialisé."""
+    if col in df.columns:
+        return df[col]
+    if col == "sunshine_hours":
+        return sunshine_hours(df)
+    return None
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Agrégat déclaratif évalué par ``compute_summary``.
+
+    ``op`` : ``mean``, ``sum``, ``min``, ``max``, ``quantile`` (``param`` = q dans [0, 1]) ou
+    pourcentage de jours ``pct_ge`` / ``pct_gt`` / ``pct_le`` / ``pct_lt`` (``param`` = seuil).
+    Les pourcentages sont rapportés au nombre total de jours, valeurs manquantes comprises.
+    """
+    name: str
+    column: str
+    op: str
+    param: Optional[float] = None
+
+
+_THRESHOLD_OPS = {
+    "pct_ge": np.greater_equal,
+    "pct_gt": np.greater,
+    "pct_le": np.less_equal,
+    "pct_lt": np.less,
+}
+_OPS = {"mean", "sum", "min", "max", "quantile", *_THRESHOLD_OPS}
+
+# Indicateurs de la page « Stat global », calculés en une passe
+STAT_GLOBAL_SPEC = (
+    Aggregate("temperature_mean", "temperature_2m_mean", "mean"),
+    Aggregate("temperature_max_mean", "temperature_2m_max", "mean"),
+    Aggregate("precipitation_total", "precipitation_sum", "sum"),
+    Aggregate("sunshine_total", "sunshine_hours", "sum"),
+    Aggregate("sunshine_mean", "sunshine_hours", "mean"),
+    Aggregate("rainy_days_pct", "precipitation_sum", "pct_ge", 1.0),
+    Aggregate("sunny_days_pct", "sunshine_hours", "pct_ge", 8.0),
+)
+
+
+def compute_summary(
+    df: pd.DataFrame,
+    spec: Sequence[Aggregate],
+    by: Union[None, str, Sequence[Hashable], np.ndarray, pd.Index, pd.Series] = None,
+) -> Union[Dict[str, Optional[float]], pd.DataFrame]:
+    """Évalue tous les agrégats de ``spec`` en une passe sur un bloc NumPy float64.
+
+    Les colonnes utilisées sont extraites une seule fois ; valeurs manquantes ignorées.
+    Sans ``by``, retourne ``{nom: valeur}`` (``None`` si la colonne est absente, le frame
+    vide ou la colonne sans valeur). Avec ``by`` (nom de colonne ou de niveau d'index, ou
+    clés alignées sur les lignes, p. ex. ``df.index.month``), retourne un DataFrame indexé
+    par clé de groupe, NaN pour les groupes sans valeur.
+    """
+    for agg in spec:
+        if agg.op not in _OPS:
+            raise ValueError(f"Agrégat inconnu : {agg.op!r}")
+        if agg.op in _THRESHOLD_OPS or agg.op == "quantile":
+            if agg.param is None:
+                raise ValueError(f"L'agrégat {agg.name!r} requiert un paramètre")
+
+    columns: List[str] = []
+    for agg in spec:
+        if agg.column not in columns and _series(df, agg.column) is not None:
+            columns.append(agg.column)
+    position = {col: j for j, col in enumerate(columns)}
+    n = len(df)
+    block = np.empty((n, len(columns)), dtype=np.float64, order="F")  # colonnes contiguës
+    for j, col in enumerate(columns):
+        block[:, j] = _series(df, col).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Segments contigus par groupe (un seul segment sans ``by``, aucun sur un frame vide)
+    starts = np.zeros(1 if n and by is None else 0, dtype=np.intp)
+    keys = None
+    if by is not None:
+        if isinstance(by, str):
+            by = df[by] if by in df.columns else df.index.get_level_values(by)
+        raw = by if isinstance(by, (pd.Series, pd.Index)) else np.asarray(by)
+        if isinstance(raw, np.ndarray) and raw.dtype.kind in "iu" and n and not (raw[1:] < raw[:-1]).any():
+            # Clés entières déjà triées (lignes ordonnées par groupe) : segments sans factorisation
+            starts = np.flatnonzero(np.r_[True, raw[1:] != raw[:-1]])
+            keys = raw[starts]
+        else:
+            codes, keys = pd.factorize(raw, sort=True)
+            if (codes < 0).any():
+                raise ValueError("Clés de groupe manquantes")
+            sorted_codes = codes
+            if n and (codes[1:] < codes[:-1]).any():
+                order = np.argsort(codes, kind="stable")
+                block = block[order]
+                sorted_codes = codes[order]
+            if n:
+                starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sizes = np.diff(np.r_[starts, n]).astype(np.float64)
+
+    valid = ~np.isnan(block)
+    if len(starts):
+        counts = np.add.reduceat(valid, starts, axis=0).astype(np.float64)
+        sums = np.add.reduceat(np.where(valid, block, 0.0), starts, axis=0)
+    else:
+        counts = sums = np.empty((0, len(columns)))
+    empty = counts == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    extrema = {}
+
+    results: Dict[str, np.ndarray] = {}
+    for agg in spec:
+        j = position.get(agg.column)
+        if j is None:
+            results[agg.name] = np.full(len(starts), np.nan)
+            continue
+        if agg.op == "mean":
+            values = means[:, j]
+        elif agg.op == "sum":
+            values = np.where(empty[:, j], np.nan, sums[:, j])
+        elif agg.op in ("min", "max"):
+            if (agg.op, j) not in extrema and len(starts):
+                ufunc = np.fmin if agg.op == "min" else np.fmax
+                extrema[agg.op, j] = ufunc.reduceat(block[:, j], starts)
+            values = extrema.get((agg.op, j), np.empty(0))
+        elif agg.op == "quantile":
+            bounds = np.r_[starts, n]
+            values = np.full(len(starts), np.nan)
+            for g in np.flatnonzero(~empty[:, j]):
+                values[g] = np.nanquantile(block[bounds[g]:bounds[g + 1], j], agg.param)
+        else:
+            hits = _THRESHOLD_OPS[agg.op](block[:, j], agg.param)
+            values = 100.0 * np.add.reduceat(hits, starts) / sizes if len(starts) else np.empty(0)
+        results[agg.name] = values
+
+    if keys is None:
+        return {name: (float(v[0]) if len(v) and not np.isnan(v[0]) else None) for name, v in results.items()}
+    index = pd.Index(keys, name=by.name if isinstance(by, (pd.Series, pd.Index)) else None)
+    return pd.DataFrame(results, index=index)
+
 
 class StatisticsService:
     """Service responsable des calculs statistiques sur les données météorologiques."""
     
+    @staticmethod
+    def summarize(
+        df: pd.DataFrame,
+        spec: Sequence[Aggregate] = STAT_GLOBAL_SPEC,
+        by=None,
+    ) -> Union[Dict[str, Optional[float]], pd.DataFrame]:
+        """Évalue ``spec`` en une passe (voir ``compute_summary``)."""
+        return compute_summary(df, spec, by=by)
+    
+    @staticmethod
+    def _single(df: pd.DataFrame, col: str, op: str, param: Optional[float] = None) -> Optional[float]:
+        return compute_summary(df, (Aggregate("value", col, op, param),))["value"]
+    
     @staticmethod
     def safe_mean(df: pd.DataFrame, col: str) -> Optional[float]:
         """Calcule la moyenne d'une colonne de manière sécurisée."""
-        if col not in df.columns:
-            return None
-        if df[col].empty or not pd.notnull(df[col]).any():
-            return None
-        return float(df[col].mean())
+        return StatisticsService._single(df, col, "mean")
     
     @staticmethod
     def safe_sum(df: pd.DataFrame, col: str) -> Optional[float]:
         """Calcule la somme d'une colonne de manière sécurisée."""
-        if col not in df.columns:
-            return None
-        if df[col].empty or not pd.notnull(df[col]).any():
-            return None
-        return float(df[col].sum())
+        return StatisticsService._single(df, col, "sum")
     
     @staticmethod
     def calculate_rainy_days_percentage(
@@ -30,13 +179,7 @@ class StatisticsService:
         threshold_mm: float = 1.0
     ) -> Optional[float]:
         """Calcule le pourcentage de jours de pluie."""
-        if precipitation_col not in df.columns or df.empty:
-            return None
-        total_days = len(df)
-        if total_days == 0:
-            return None
-        rainy_days = int((df[precipitation_col].astype(float) >= threshold_mm).sum())
-        return 100.0 * rainy_days / total_days
+        return StatisticsService._single(df, precipitation_col, "pct_ge", threshold_mm)
     
     @staticmethod
     def calculate_sunny_days_percentage(
@@ -45,13 +188,7 @@ class StatisticsService:
         threshold_h: float = 8.0
     ) -> Optional[float]:
         """Calcule le pourcentage de jours ensoleillés."""
-        if sunshine_col not in df.columns or df.empty:
-            return None
-        total_days = len(df)
-        if total_days == 0:
-            return None
-        sunny_days = int((df[sunshine_col].astype(float) >= threshold_h).sum())
-        return 100.0 * sunny_days / total_days
+        return StatisticsService._single(df, sunshine_col, "pct_ge", threshold_h)
     
     @staticmethod
     def calculate_average_sunshine_hours(
@@ -68,13 +205,14 @@ class StatisticsService:
         column: str
     ) -> Optional[tuple[float, float, float]]:
         """Prépare les données pour comparaison (valeur aujourd'hui, valeur N-1, différence)."""
-        if column not in df_today.columns or column not in df_last_year.columns:
+        today_values, last_year_values = _series(df_today, column), _series(df_last_year, column)
+        if today_values is None or last_year_values is None:
             return None
         if df_today.empty or df_last_year.empty:
             return None
         try:
-            value_today = float(df_today[column].iloc[0])
-            value_last_year = float(df_last_year[column].iloc[0])
+            value_today = float(today_values.iloc[0])
+            value_last_year = float(last_year_values.iloc[0])
             diff = value_today - value_last_year
             return (value_today, value_last_year, diff)
         except (IndexError, ValueError, TypeError):
@@ -1,6 +1,8 @@
 """Service de gestion des alertes météorologiques."""
 from dataclasses import dataclass
 from typing import List, Optional
+
+import numpy as np
 import pandas as pd
 
 
@@ -38,199 +40,100 @@ class WeatherAlertService:
     COLD_MODERATE = 0.0
     COLD_LOW = 5.0
     
+    # Règles par type d'alerte : colonnes candidates (la première présente est utilisée),
+    # facteur d'unité, comparaison et seuils (attributs de classe), du plus sévère au plus faible
+    _RULES = (
+        ("chaleur", ("temperature_2m_max",), 1.0, np.greater_equal,
+         ("TEMP_EXTREME", "TEMP_HIGH", "TEMP_MODERATE")),
+        ("pluie", ("rain_sum", "precipitation_sum"), 1.0, np.greater,
+         ("RAIN_EXTREME", "RAIN_HIGH", "RAIN_MODERATE")),
+        ("vent", ("wind_gusts_10m_mean", "wind_speed_10m_mean"), 3.6, np.greater,  # m/s vers km/h
+         ("WIND_EXTREME", "WIND_HIGH", "WIND_MODERATE")),
+        ("froid", ("temperature_2m_min",), 1.0, np.less,
+         ("COLD_EXTREME", "COLD_MODERATE", "COLD_LOW")),
+    )
+    ALERT_KINDS = tuple(rule[0] for rule in _RULES)
+    
+    # Contenu affiché par (type, sévérité) : emoji, titre, niveau, message, couleur
+    _TEMPLATES = {
+        ("chaleur", 3): ("🌡️", "Alerte chaleur extrême", "Extrême",
+                         "Alerte canicule : restez au frais, surveillez les personnes vulnérables.", "#ff4444"),
+        ("chaleur", 2): ("🌡️", "Alerte chaleur extrême", "Élevé",
+                         "Risque de coup de chaleur. Évitez les activités physiques.", "#ff9933"),
+        ("chaleur", 1): ("🌡️", "Alerte chaleur extrême", "Modéré",
+                         "Chaleur importante prévue aujourd'hui. Hydratez-vous.", "#ffdd44"),
+        ("pluie", 3): ("🌧️", "Alerte pluie intense / risque d'inondation locale", "Extrême",
+                       "Risque d'inondation localisée.", "#ff4444"),
+        ("pluie", 2): ("🌧️", "Alerte pluie intense / risque d'inondation locale", "Fort",
+                       "Fortes pluies : vigilance sur les routes.", "#ff9933"),
+        ("pluie", 1): ("🌧️", "Alerte pluie intense / risque d'inondation locale", "Risque modéré",
+                       "Pluies modérées attendues.", "#ffdd44"),
+        ("vent", 3): ("💨", "Alerte vent violent", "Violent",
+                      "Risque de dégâts : évitez les déplacements.", "#ff4444"),
+        ("vent", 2): ("💨", "Alerte vent violent", "Fort",
+                      "Rafales fortes : attention aux objets légers.", "#ff9933"),
+        ("vent", 1): ("💨", "Alerte vent violent", "Modéré", "Vent soutenu prévu.", "#ffdd44"),
+        ("froid", 3): ("❄️", "Alerte froid / gel", "Froid intense",
+                       "Grand froid : prudence à l'extérieur.", "#ff4444"),
+        ("froid", 2): ("❄️", "Alerte froid / gel", "Gel possible",
+                       "Risque de gel : protégez les plantes et canalisations.", "#ff9933"),
+        ("froid", 1): ("❄️", "Alerte froid / gel", "Frais", "Températures basses.", "#ffdd44"),
+    }
+    
     def evaluate_alerts(self, df_today: pd.DataFrame) -> List[WeatherAlert]:
-        """Évalue les alertes météorologiques pour les données du jour."""
-        alerts = []
-        
-        # Alerte chaleur
-        alerts.extend(self._check_temperature_alerts(df_today))
-        
-        # Alerte pluie
-        alerts.extend(self._check_rain_alerts(df_today))
-        
-        # Alerte vent
-        alerts.extend(self._check_wind_alerts(df_today))
-        
-        # Alerte froid
-        alerts.extend(self._check_cold_alerts(df_today))
-        
-        # Trier par sévérité (plus sévère en premier)
+        """Évalue les alertes météorologiques pour les données du jour (première ligne)."""
+        severities = self._severities(df_today.iloc[:1])
+        alerts = [
+            self._alert(kind, int(severity))
+            for kind, severity in zip(self.ALERT_KINDS, severities[0] if len(severities) else ())
+            if severity
+        ]
+        # Trier par sévérité (plus sévère en premier), à type égal dans l'ordre des règles
         alerts.sort(key=lambda x: x.severity, reverse=True)
         return alerts
     
-    def _check_temperature_alerts(self, df: pd.DataFrame) -> List[WeatherAlert]:
-        """Vérifie les alertes de température."""
-        alerts = []
-        if "temperature_2m_max" not in df.columns or df.empty:
-            return alerts
-        
-        try:
-            temp_max = float(df["temperature_2m_max"].iloc[0])
-        except (IndexError, ValueError, TypeError):
-            return alerts
-        
-        if temp_max >= self.TEMP_EXTREME:
-            alerts.append(WeatherAlert(
-                emoji="🌡️",
-                title="Alerte chaleur extrême",
-                level="Extrême",
-                message="Alerte canicule : restez au frais, surveillez les personnes vulnérables.",
-                color="#ff4444",
-                severity=3
-            ))
-        elif temp_max >= self.TEMP_HIGH:
-            alerts.append(WeatherAlert(
-                emoji="🌡️",
-                title="Alerte chaleur extrême",
-                level="Élevé",
-                message="Risque de coup de chaleur. Évitez les activités physiques.",
-                color="#ff9933",
-                severity=2
-            ))
-        elif temp_max >= self.TEMP_MODERATE:
-            alerts.append(WeatherAlert(
-                emoji="🌡️",
-                title="Alerte chaleur extrême",
-                level="Modéré",
-                message="Chaleur importante prévue aujourd'hui. Hydratez-vous.",
-                color="#ffdd44",
-                severity=1
-            ))
-        
-        return alerts
-    
-    def _check_rain_alerts(self, df: pd.DataFrame) -> List[WeatherAlert]:
-        """Vérifie les alertes de précipitations."""
-        alerts = []
-        rain_24h = 0.0
-        
-        if "rain_sum" in df.columns and not df.empty:
-            try:
-                rain_24h = float(df["rain_sum"].iloc[0])
-            except (IndexError, ValueError, TypeError):
-                pass
-        elif "precipitation_sum" in df.columns and not df.empty:
+    def _severities(self, df: pd.DataFrame) -> np.ndarray:
+        """Sévérité (0 à 3) de chaque règle pour chaque ligne : matrice (lignes, règles) int8."""
+        n = len(df)
+        severities = np.zeros((n, len(self._RULES)), dtype=np.int8)
+        for k, (kind, candidates, factor, compare, thresholds) in enumerate(self._RULES):
+            column = next((c for c in candidates if c in df.columns), None)
+            if column is None or n == 0:
+                continue
             try:
-                rain_24h = float(df["precipitation_sum"].iloc[0])
-            except (IndexError, ValueError, TypeError):
-                pass
-        
-        if rain_24h > self.RAIN_EXTREME:
-            alerts.append(WeatherAlert(
-                emoji="🌧️",
-                title="Alerte pluie intense / risque d'inondation locale",
-                level="Extrême",
-                message="Risque d'inondation localisée.",
-                color="#ff4444",
-                severity=3
-            ))
-        elif rain_24h > self.RAIN_HIGH:
-            alerts.append(WeatherAlert(
-                emoji="🌧️",
-                title="Alerte pluie intense / risque d'inondation locale",
-                level="Fort",
-                message="Fortes pluies : vigilance sur les routes.",
-                color="#ff9933",
-                severity=2
-            ))
-        elif rain_24h > self.RAIN_MODERATE:
-            alerts.append(WeatherAlert(
-                emoji="🌧️",
-                title="Alerte pluie intense / risque d'inondation locale",
-                level="Risque modéré",
-                message="Pluies modérées attendues.",
-                color="#ffdd44",
-                severity=1
-            ))
-        
-        return alerts
+                values = df[column].to_numpy(dtype=np.float64, na_value=np.nan) * factor
+            except (ValueError, TypeError):
+                continue
+            # Valeurs manquantes : toutes les comparaisons sont fausses, donc pas d'alerte
+            conditions = [compare(values, getattr(self, name)) for name in thresholds]
+            severities[:, k] = np.select(conditions, [3, 2, 1], default=0)
+        return severities
     
-    def _check_wind_alerts(self, df: pd.DataFrame) -> List[WeatherAlert]:
-        """Vérifie les alertes de vent."""
-        alerts = []
-        wind_speed_kmh = 0.0
-        
-        if "wind_gusts_10m_mean" in df.columns and not df.empty:
-            try:
-                wind_ms = float(df["wind_gusts_10m_mean"].iloc[0])
-                wind_speed_kmh = wind_ms * 3.6  # Conversion m/s vers km/h
-            except (IndexError, ValueError, TypeError):
-                pass
-        elif "wind_speed_10m_mean" in df.columns and not df.empty:
-            try:
-                wind_ms = float(df["wind_speed_10m_mean"].iloc[0])
-                wind_speed_kmh = wind_ms * 3.6
-            except (IndexError, ValueError, TypeError):
-                pass
-        
-        if wind_speed_kmh > self.WIND_EXTREME:
-            alerts.append(WeatherAlert(
-                emoji="💨",
-                title="Alerte vent violent",
-                level="Violent",
-                message="Risque de dégâts : évitez les déplacements.",
-                color="#ff4444",
-                severity=3
-            ))
-        elif wind_speed_kmh > self.WIND_HIGH:
-            alerts.append(WeatherAlert(
-                emoji="💨",
-                title="Alerte vent violent",
-                level="Fort",
-                message="Rafales fortes : attention aux objets légers.",
-                color="#ff9933",
-                severity=2
-            ))
-        elif wind_speed_kmh > self.WIND_MODERATE:
-            alerts.append(WeatherAlert(
-                emoji="💨",
-                title="Alerte vent violent",
-                level="Modéré",
-                message="Vent soutenu prévu.",
-                color="#ffdd44",
-                severity=1
-            ))
-        
-        return alerts
+    def evaluate_batch(self, df: pd.DataFrame, location_col: str = "city") -> pd.DataFrame:
+        """Évalue toutes les règles sur toutes les lignes (jours × localisations) à la fois.
+        
+        ``df`` : frame journalier (index de dates), éventuellement au format long multi-villes.
+        Retourne une table compacte d'alertes actives : ``location`` (si ``location_col`` est
+        présent), ``date``, ``kind`` (catégoriel) et ``severity`` (int8, 3 = la plus sévère),
+        dans l'ordre des lignes puis des règles.
+        """
+        severities = self._severities(df)
+        rows, rules = np.nonzero(severities)
+        table = {}
+        if location_col in df.columns:
+            table["location"] = df[location_col].to_numpy()[rows]
+        if isinstance(df.index, pd.DatetimeIndex):
+            table["date"] = df.index.to_numpy()[rows]
+        elif "date" in df.columns:
+            table["date"] = pd.to_datetime(df["date"]).to_numpy()[rows]
+        table["kind"] = pd.Categorical.from_codes(rules, categories=list(self.ALERT_KINDS))
+        table["severity"] = severities[rows, rules]
+        return pd.DataFrame(table)
     
-    def _check_cold_alerts(self, df: pd.DataFrame) -> List[WeatherAlert]:
-        """Vérifie les alertes de froid."""
-        alerts = []
-        if "temperature_2m_min" not in df.columns or df.empty:
-            return alerts
-        
-        try:
-            temp_min = float(df["temperature_2m_min"].iloc[0])
-        except (IndexError, ValueError, TypeError):
-            return alerts
-        
-        if temp_min < self.COLD_EXTREME:
-            alerts.append(WeatherAlert(
-                emoji="❄️",
-                title="Alerte froid / gel",
-                level="Froid intense",
-                message="Grand froid : prudence à l'extérieur.",
-                color="#ff4444",
-                severity=3
-            ))
-        elif temp_min < self.COLD_MODERATE:
-            alerts.append(WeatherAlert(
-                emoji="❄️",
-                title="Alerte froid / gel",
-                level="Gel possible",
-                message="Risque de gel : protégez les plantes et canalisations.",
-                color="#ff9933",
-                severity=2
-            ))
-        elif temp_min < self.COLD_LOW:
-            alerts.append(WeatherAlert(
-                emoji="❄️",
-                title="Alerte froid / gel",
-                level="Frais",
-                message="Températures basses.",
-                color="#ffdd44",
-                severity=1
-            ))
-        
-        return alerts
-
+    def _alert(self, kind: str, severity: int) -> WeatherAlert:
+        emoji, title, level, message, color = self._TEMPLATES[kind, severity]
+        return WeatherAlert(emoji=emoji, title=title, level=level, message=message, color=color, severity=severity)
+    
+    def materialize(self, table: pd.DataFrame) -> List[WeatherAlert]:
+        """Construit les ``WeatherAlert`` d'une table ``evaluate_batch`` (au moment de l'affichage)."""
+        return [self._alert(kind, int(severity)) for kind, severity in zip(table["kind"], table["severity"])]
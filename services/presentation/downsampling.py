@@ -0,0 +1,74 @@
+"""Réduction du nombre de points des séries affichées, en conservant leur forme visuelle.
+
+- LTTB (Largest-Triangle-Three-Buckets) pour les courbes ;
+- min/max par tranche pour les barres (les pics ne disparaissent pas).
+
+Les séries journalières sont régulièrement espacées : l'abscisse est la position du point.
+Les fonctions retournent des positions triées, à appliquer avec ``iloc``.
+"""
+from typing import Optional
+
+import numpy as np
+
+
+def _buckets(values: np.ndarray, n_buckets: int, fill: Optional[float] = None) -> np.ndarray:
+    """Découpe ``values`` en ``n_buckets`` tranches contiguës de même taille.
+
+    La dernière tranche est complétée par ``fill``, ou par répétition de la dernière valeur.
+    """
+    size = -(-len(values) // n_buckets)
+    pad = n_buckets * size - len(values)
+    if fill is None:
+        padded = np.pad(values.astype(np.float64), (0, pad), mode="edge")
+    else:
+        padded = np.pad(values.astype(np.float64), (0, pad), constant_values=fill)
+    return padded.reshape(n_buckets, size)
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions retenues par LTTB pour ``n_out`` points (premier et dernier toujours inclus)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    filled = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+    inner = filled[1:-1]
+    size = -(-len(inner) // (n_out - 2))
+    n_buckets = -(-len(inner) // size)  # pas de tranche entièrement vide
+    ys = _buckets(inner, n_buckets)
+    xs = _buckets(np.arange(1, n - 1), n_buckets)
+    counts = np.full(n_buckets, size)
+    counts[-1] = len(inner) - size * (n_buckets - 1)
+
+    # Point moyen de chaque tranche (bourrage exclu) ; la dernière voit le dernier point comme voisin
+    starts = np.arange(n_buckets) * size
+    mean_x = starts + 1 + (counts - 1) / 2.0
+    mean_y = np.add.reduceat(inner, starts) / counts
+    next_x = np.append(mean_x[1:], n - 1)
+    next_y = np.append(mean_y[1:], filled[-1])
+
+    selected = np.empty(n_buckets + 2, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a_x, a_y = 0.0, filled[0]
+    for i in range(n_buckets):
+        # Aire (au facteur 1/2 près) du triangle (point retenu, candidat, moyenne suivante) ;
+        # les positions de bourrage répètent le dernier point et ne gagnent donc jamais l'argmax
+        best = int(np.argmax(np.abs((a_x - next_x[i]) * (ys[i] - a_y) - (a_x - xs[i]) * (next_y[i] - a_y))))
+        a_x, a_y = xs[i, best], ys[i, best]
+        selected[i + 1] = int(a_x)
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions du minimum et du maximum de chaque tranche, pour au plus ``n_out`` points."""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    offsets = np.arange(n_buckets) * size
+    lows = np.argmin(_buckets(np.where(np.isnan(y), np.inf, y), n_buckets, np.inf), axis=1)
+    highs = np.argmax(_buckets(np.where(np.isnan(y), -np.inf, y), n_buckets, -np.inf), axis=1)
+    return np.unique(np.minimum(np.concatenate([offsets + lows, offsets + highs]), n - 1))
@@ -1,7 +1,13 @@
 """Service de présentation et formatage des données météorologiques pour l'UI."""
 from typing import Optional
+import numpy as np
 import pandas as pd
 
+from services.presentation.downsampling import lttb_indices, minmax_indices
+
+# Largeur par défaut d'un graphique Streamlit pleine largeur, en pixels
+DEFAULT_CHART_WIDTH_PX = 800
+
 
 class WeatherPresenter:
     """Service responsable du formatage et de la préparation des données pour l'interface utilisateur."""
@@ -43,7 +49,38 @@ class WeatherPresenter:
         return f"{sign}{value:.1f}{unit}"
     
     @staticmethod
-    def prepare_temperature_chart_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def point_budget(width_px: int = DEFAULT_CHART_WIDTH_PX, points_per_px: float = 1.0) -> int:
+        """Nombre de points utiles pour un graphique de ``width_px`` pixels de large."""
+        return max(3, int(width_px * points_per_px))
+
+    @staticmethod
+    def downsample(df: pd.DataFrame, max_points: Optional[int], kind: str = "line") -> pd.DataFrame:
+        """Réduit ``df`` à environ ``max_points`` lignes : LTTB (``line``) ou min/max (``bar``).
+
+        Les positions retenues pour chaque colonne sont réunies, de sorte que chaque courbe
+        garde sa forme ; le budget est partagé entre les colonnes.
+        """
+        if max_points is None or len(df) <= max_points or df.shape[1] == 0:
+            return df
+        select = lttb_indices if kind == "line" else minmax_indices
+        per_column = max(3, max_points // df.shape[1])
+        positions = np.unique(np.concatenate([select(df[col].to_numpy(), per_column) for col in df.columns]))
+        return df.iloc[positions]
+
+    @staticmethod
+    def time_indexed(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Vue indexée par le temps, sans copie des données.
+
+        Accepte le frame préparé (index temporel) ou l'ancien format à colonne ``time``.
+        """
+        if "time" in df.columns:
+            return df.set_index("time")
+        if isinstance(df.index, pd.DatetimeIndex):
+            return df
+        return None
+
+    @staticmethod
+    def prepare_temperature_chart_data(df: pd.DataFrame, max_points: Optional[int] = None) -> Optional[pd.DataFrame]:
         """Prépare les données de température pour les graphiques."""
         plot_cols = [
             "temperature_2m_mean",
@@ -51,38 +88,61 @@ class WeatherPresenter:
             "temperature_2m_min"
         ]
         available_cols = [c for c in plot_cols if c in df.columns]
-        if not available_cols:
+        view = WeatherPresenter.time_indexed(df)
+        if not available_cols or view is None:
             return None
-        if "time" not in df.columns:
-            return None
-        return df.set_index("time")[available_cols]
+        return WeatherPresenter.downsample(view[available_cols], max_points)
     
     @staticmethod
-    def prepare_precipitation_chart_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def prepare_precipitation_chart_data(df: pd.DataFrame, max_points: Optional[int] = None) -> Optional[pd.DataFrame]:
         """Prépare les données de précipitations pour les graphiques."""
-        if "precipitation_sum" not in df.columns or "time" not in df.columns:
+        view = WeatherPresenter.time_indexed(df)
+        if "precipitation_sum" not in df.columns or view is None:
             return None
-        return df.set_index("time")[["precipitation_sum"]]
+        return WeatherPresenter.downsample(view[["precipitation_sum"]], max_points, kind="bar")
     
     @staticmethod
-    def prepare_temperature_comparison_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def prepare_temperature_comparison_data(df: pd.DataFrame, max_points: Optional[int] = None) -> Optional[pd.DataFrame]:
         """Prépare les données pour comparer température réelle vs ressentie."""
-        required_cols = ["temperature_2m_mean", "apparent_temperature_mean", "time"]
-        if not all(col in df.columns for col in required_cols):
+        view = WeatherPresenter.time_indexed(df)
+        required_cols = ["temperature_2m_mean", "apparent_temperature_mean"]
+        if view is None or not all(col in df.columns for col in required_cols):
             return None
         
-        cmp_df = df.set_index("time")[
-            ["temperature_2m_mean", "apparent_temperature_mean"]
-        ].copy()
-        cmp_df["ecart_ressenti"] = (
-            cmp_df["apparent_temperature_mean"] - cmp_df["temperature_2m_mean"]
+        # Seul l'écart est alloué, les deux séries sources sont partagées avec le frame préparé
+        real, apparent = view["temperature_2m_mean"], view["apparent_temperature_mean"]
+        cmp_df = pd.DataFrame(
+            {
+                "temperature_2m_mean": real,
+                "apparent_temperature_mean": apparent,
+                "ecart_ressenti": apparent - real,
+            },
+            copy=False,
         )
-        return cmp_df
+        return WeatherPresenter.downsample(cmp_df, max_points)
+
+    @staticmethod
+    def prepare_forecast_chart_data(df_forecast: pd.DataFrame, max_points: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Prépare la courbe de prévision (indexée par date), avec ses bornes si le moteur en fournit."""
+        if df_forecast is None or "temperature_2m_mean_predite" not in df_forecast.columns:
+            return None
+        df_plot = df_forecast
+        if "date" in df_plot.columns:
+            df_plot = df_plot.set_index("date").sort_index()
+        columns = [c for c in ("temperature_2m_mean_predite", "temperature_2m_mean_ic_bas",
+                               "temperature_2m_mean_ic_haut") if c in df_plot.columns]
+        return WeatherPresenter.downsample(df_plot[columns], max_points)
     
     @staticmethod
-    def convert_sunshine_duration_to_hours(df: pd.DataFrame) -> pd.DataFrame:
-        """Convertit la durée d'ensoleillement de secondes en heures."""
-        df = df.copy()
+    def convert_sunshine_duration_to_hours(df: pd.DataFrame, lazy: bool = False) -> pd.DataFrame:
+        """Convertit la durée d'ensoleillement de secondes en heures.
+
+        Avec ``lazy=True`` (frames compacts), rien n'est matérialisé : les heures sont dérivées
+        à la demande par ``data.transformer.sunshine_hours`` et le DataFrame est rendu tel quel.
+        """
+        if lazy:
+            return df
+        df = df.copy(deep=False)  # copie paresseuse : seule la nouvelle colonne est allouée
         if "sunshine_duration" in df.columns and "sunshine_hours" not in df.columns:
             df["sunshine_hours"] = df["sunshine_duration"] / 3600.0
         return df
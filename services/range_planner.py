@@ -0,0 +1,111 @@
+"""Planification incrémentale des téléchargements de plages de dates.
+
+Le planificateur compare la plage demandée aux intervalles déjà détenus localement pour
+une localisation, ne télécharge que les sous-plages manquantes et fusionne le résultat
+en un DataFrame unique, trié et sans doublons.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from data.date_ranges import DateRange, merge_ranges, missing_ranges  # noqa: F401 (ré-export)
+
+
+def location_key(geoloc: Dict) -> str:
+    return f"{geoloc['latitude']:.4f},{geoloc['longitude']:.4f}"
+
+
+class MemoryCoverageStore:
+    """Données journalières détenues en mémoire par localisation, avec leurs intervalles couverts.
+
+    Chaque écriture ajoute son bloc comme segment séparé, sans recopier les données déjà
+    détenues ; les segments en attente sont fusionnés (tri, dernière écriture gagnante) à la
+    lecture suivante, une seule fois, comme les fichiers du stockage Parquet.
+    """
+
+    def __init__(self, max_locations: int = 64):
+        self.max_locations = max_locations
+        self._segments: "OrderedDict[str, List[pd.DataFrame]]" = OrderedDict()
+        self._coverage: Dict[str, List[DateRange]] = {}
+
+    def coverage(self, key: str) -> List[DateRange]:
+        return list(self._coverage.get(key, []))
+
+    def _merged(self, key: str) -> Optional[pd.DataFrame]:
+        segments = self._segments.get(key)
+        if not segments:
+            return None
+        if len(segments) > 1:
+            frame = pd.concat(segments)
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            segments[:] = [frame]
+        elif not segments[0].index.is_monotonic_increasing:
+            segments[0] = segments[0].sort_index()
+        return segments[0]
+
+    def read(self, key: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        frame = self._merged(key)
+        if frame is None:
+            return None
+        self._segments.move_to_end(key)
+        return frame.loc[pd.Timestamp(start):pd.Timestamp(end)].copy()
+
+    def write(self, key: str, df: pd.DataFrame, covered: List[DateRange]) -> None:
+        self._segments.setdefault(key, []).append(df)
+        self._segments.move_to_end(key)
+        self._coverage[key] = merge_ranges(self._coverage.get(key, []) + covered)
+        while len(self._segments) > self.max_locations:
+            evicted, _ = self._segments.popitem(last=False)
+            self._coverage.pop(evicted, None)
+
+
+class RangePlanner:
+    """Ne télécharge que les jours absents de la couverture locale d'une localisation.
+
+    Les ``volatile_days`` derniers jours ne sont jamais considérés comme couverts : l'archive
+    peut encore les compléter, ils sont donc redemandés à chaque interaction.
+    """
+
+    def __init__(self, store: Optional[MemoryCoverageStore] = None, volatile_days: int = 5,
+                 today: Callable[[], date] = date.today):
+        self.store = store if store is not None else MemoryCoverageStore()
+        self.volatile_days = volatile_days
+        self._today = today
+        self._lock = threading.Lock()
+
+    def plan(self, key: str, start: date, end: date) -> List[DateRange]:
+        with self._lock:
+            return missing_ranges(self.store.coverage(key), start, end)
+
+    def record(self, key: str, df: pd.DataFrame, start: date, end: date) -> None:
+        """Fusionne les données téléchargées pour [start, end] et met à jour la couverture."""
+        stable_until = self._today() - timedelta(days=self.volatile_days + 1)
+        covered = [(start, min(end, stable_until))] if start <= stable_until else []
+        with self._lock:
+            self.store.write(key, df, covered)
+
+    def read(self, key: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        with self._lock:
+            df = self.store.read(key, start, end)
+        if df is None or df.empty:
+            return None
+        return df
+
+    def fetch(
+        self,
+        key: str,
+        start_date: str,
+        end_date: str,
+        fetch_range: Callable[[str, str], Optional[pd.DataFrame]],
+    ) -> Optional[pd.DataFrame]:
+        """Complète la couverture locale via ``fetch_range(start, end)`` puis lit [start, end]."""
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        for gap_start, gap_end in self.plan(key, start, end):
+            df = fetch_range(gap_start.isoformat(), gap_end.isoformat())
+            if df is None or df.empty:
+                continue
+            self.record(key, df, gap_start, gap_end)
+        return self.read(key, start, end)
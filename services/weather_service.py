@@ -1,34 +1,82 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import pandas as pd
 
-from core.interfaces import GeocodingProvider, WeatherProvider
+from core.interfaces import (
+    AsyncGeocodingProvider,
+    AsyncWeatherProvider,
+    GeocodingProvider,
+    WeatherProvider,
+)
 from data.transformer import DataTransformer
+from services.range_planner import RangePlanner, location_key
+
+logger = logging.getLogger(__name__)
+
+# Erreurs attendues d'un appel par ville : réseau (requests.RequestException et
+# CircuitOpenError dérivent d'OSError) ou réponse inexploitable (JSON invalide, clé absente)
+_EXPECTED_ERRORS = (OSError, ValueError, KeyError)
+
+
+def _same_day_last_year() -> str:
+    one_year_ago = datetime.now() - timedelta(days=365)
+    return one_year_ago.strftime("%Y-%m-%d")
+
+
+def _multi_year_bounds(years: int, end_date: Optional[str]) -> Tuple[str, str]:
+    if end_date is None:
+        end = datetime.now()
+        end_date_str = end.strftime("%Y-%m-%d")
+    else:
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        end_date_str = end_date
+    start = end - timedelta(days=years * 365)
+    return start.strftime("%Y-%m-%d"), end_date_str
 
 
 class WeatherService:
-    def __init__(self, geocoder: GeocodingProvider, provider: WeatherProvider, transformer: DataTransformer):
+    def __init__(
+        self,
+        geocoder: GeocodingProvider,
+        provider: WeatherProvider,
+        transformer: DataTransformer,
+        planner: Optional[RangePlanner] = None,
+    ):
         self._geocoder = geocoder
         self._provider = provider
         self._transformer = transformer
+        self._planner = planner
 
-    def get_today_vs_last_year(self, city: str) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    def get_today(self, city: str) -> Optional[pd.DataFrame]:
+        """Prévision du jour seule (un appel réseau, sans archive)."""
         geoloc = self._geocoder.geocode(city)
         if not geoloc:
-            return None, None
+            return None
+        return self._today(geoloc)
 
+    def _today(self, geoloc) -> Optional[pd.DataFrame]:
         today_json = self._provider.daily_today(geoloc)
         if not today_json:
-            return None, None
+            return None
         df_today = self._transformer.create_daily_dataframe(today_json)
-        if df_today.empty:
+        return None if df_today.empty else df_today
+
+    def get_today_vs_last_year(self, city: str) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        geoloc = self._geocoder.geocode(city)
+        if not geoloc:
             return None, None
 
-        one_year_ago = datetime.now() - timedelta(days=365)
-        date_last_year = one_year_ago.strftime("%Y-%m-%d")
+        df_today = self._today(geoloc)
+        if df_today is None:
+            return None, None
+
+        date_last_year = _same_day_last_year()
         last_year_json = self._provider.daily_same_day_last_year(geoloc, date_last_year)
         if not last_year_json:
             return df_today, None
@@ -37,11 +85,31 @@ class WeatherService:
             return df_today, None
         return df_today, df_last_year
 
-    def get_weather_range(self, city: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+    def get_weather_range(
+        self,
+        city: str,
+        start_date: str,
+        end_date: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Optional[pd.DataFrame]:
         geoloc = self._geocoder.geocode(city)
         if not geoloc:
             return None
-        api_response = self._provider.daily_range(geoloc, start_date, end_date)
+        if self._planner is not None:
+            # Le stockage du planificateur a un schéma fixe : retour aux types du mode courant
+            return self._transformer.conform(self._planner.fetch(
+                location_key(geoloc), start_date, end_date,
+                lambda start, end: self._fetch_range(geoloc, start, end, progress),
+            ))
+        return self._fetch_range(geoloc, start_date, end_date, progress)
+
+    def _fetch_range(self, geoloc, start_date: str, end_date: str, progress=None) -> Optional[pd.DataFrame]:
+        # Le suivi de progression par blocs n'est transmis qu'aux providers qui le supportent
+        kwargs = {"progress": progress} if progress is not None else {}
+        api_response = self._provider.daily_range(geoloc, start_date, end_date, **kwargs)
+        return self._to_frame(api_response)
+
+    def _to_frame(self, api_response: Optional[Dict[str, Any]]) -> Optional[pd.DataFrame]:
         if not api_response:
             return None
         df = self._transformer.create_daily_dataframe(api_response)
@@ -49,15 +117,152 @@ class WeatherService:
             return None
         return df
 
-    def get_multi_year_data(self, city: str, years: int = 3, end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
-        if end_date is None:
-            end = datetime.now()
-            end_date_str = end.strftime("%Y-%m-%d")
-        else:
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            end_date_str = end_date
-        start = end - timedelta(days=years * 365)
-        start_date_str = start.strftime("%Y-%m-%d")
-        return self.get_weather_range(city, start_date_str, end_date_str)
+    def get_multi_year_data(
+        self,
+        city: str,
+        years: int = 3,
+        end_date: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Optional[pd.DataFrame]:
+        start_date_str, end_date_str = _multi_year_bounds(years, end_date)
+        return self.get_weather_range(city, start_date_str, end_date_str, progress)
+
+    def get_weather_range_many(
+        self,
+        cities: Sequence[str],
+        start_date: str,
+        end_date: str,
+        max_workers: int = 8,
+        long_format: bool = False,
+    ) -> Union[Dict[str, Optional[pd.DataFrame]], pd.DataFrame]:
+        """Données journalières de plusieurs villes.
+
+        Retourne {ville: DataFrame ou None} ou, avec ``long_format``, un DataFrame unique
+        indexé par date avec une colonne ``city``. Une ville en erreur donne None sans
+        interrompre le lot.
+        """
+        located = {city: geoloc for city, geoloc in self._geocode_many(cities, max_workers).items() if geoloc}
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+
+        # Regroupe les villes par sous-plage manquante pour mutualiser les requêtes
+        gaps: Dict[Tuple[date, date], List[str]] = {}
+        for city, geoloc in located.items():
+            city_gaps = self._planner.plan(location_key(geoloc), start, end) if self._planner else [(start, end)]
+            for gap in city_gaps:
+                gaps.setdefault(gap, []).append(city)
+
+        results: Dict[str, Optional[pd.DataFrame]] = {}
+        for (gap_start, gap_end), group in gaps.items():
+            frames = self._fetch_range_many(
+                [located[c] for c in group], gap_start.isoformat(), gap_end.isoformat(), max_workers
+            )
+            for city, df in zip(group, frames):
+                if df is None:
+                    continue
+                if self._planner is not None:
+                    self._planner.record(location_key(located[city]), df, gap_start, gap_end)
+                else:
+                    results[city] = df
+        if self._planner is not None:
+            for city, geoloc in located.items():
+                results[city] = self._transformer.conform(self._planner.read(location_key(geoloc), start, end))
+
+        by_city = {city: results.get(city) for city in cities}
+        return _to_long_format(by_city) if long_format else by_city
+
+    def get_multi_year_data_many(
+        self,
+        cities: Sequence[str],
+        years: int = 3,
+        end_date: Optional[str] = None,
+        max_workers: int = 8,
+        long_format: bool = False,
+    ) -> Union[Dict[str, Optional[pd.DataFrame]], pd.DataFrame]:
+        start_date_str, end_date_str = _multi_year_bounds(years, end_date)
+        return self.get_weather_range_many(cities, start_date_str, end_date_str, max_workers, long_format)
+
+    def _geocode_many(self, cities: Sequence[str], max_workers: int) -> Dict[str, Optional[Dict[str, Any]]]:
+        geocode_many = getattr(self._geocoder, "geocode_many", None)
+        if geocode_many is not None:
+            return geocode_many(cities, max_workers=max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(cities, executor.map(lambda c: _safe_call(self._geocoder.geocode, c), cities)))
+
+    def _fetch_range_many(
+        self, geolocs: List[Dict[str, Any]], start_date: str, end_date: str, max_workers: int
+    ) -> List[Optional[pd.DataFrame]]:
+        daily_range_many = getattr(self._provider, "daily_range_many", None)
+        responses = None
+        if daily_range_many is not None:
+            responses = _safe_call(daily_range_many, geolocs, start_date, end_date, max_workers=max_workers)
+        if responses is None:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                responses = list(executor.map(
+                    lambda g: _safe_call(self._provider.daily_range, g, start_date, end_date), geolocs
+                ))
+        return [_safe_call(self._to_frame, response) for response in responses]
+
+
+def _safe_call(fn, *args, **kwargs):
+    # Isolation des erreurs par ville dans les traitements par lot : les erreurs attendues sont
+    # journalisées et donnent None, les autres (bogues) remontent
+    try:
+        return fn(*args, **kwargs)
+    except _EXPECTED_ERRORS as exc:
+        logger.warning("%s en échec : %s", getattr(fn, "__name__", fn), exc)
+        return None
+
 
+def _to_long_format(by_city: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    frames = [df.assign(city=city) for city, df in by_city.items() if df is not None]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames)
+
+
+class AsyncWeatherService:
+    """Variante asyncio de WeatherService : les appels indépendants sont lancés en parallèle."""
+
+    def __init__(self, geocoder: AsyncGeocodingProvider, provider: AsyncWeatherProvider, transformer: DataTransformer):
+        self._geocoder = geocoder
+        self._provider = provider
+        self._transformer = transformer
+
+    async def get_today_vs_last_year(self, city: str) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        geoloc = await self._geocoder.geocode(city)
+        if not geoloc:
+            return None, None
+
+        # Prévision du jour et archive N-1 ne dépendent que de la géolocalisation
+        today_json, last_year_json = await asyncio.gather(
+            self._provider.daily_today(geoloc),
+            self._provider.daily_same_day_last_year(geoloc, _same_day_last_year()),
+        )
+        if not today_json:
+            return None, None
+        df_today = self._transformer.create_daily_dataframe(today_json)
+        if df_today.empty:
+            return None, None
+
+        if not last_year_json:
+            return df_today, None
+        df_last_year = self._transformer.create_daily_dataframe(last_year_json)
+        if df_last_year.empty:
+            return df_today, None
+        return df_today, df_last_year
+
+    async def get_weather_range(self, city: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        geoloc = await self._geocoder.geocode(city)
+        if not geoloc:
+            return None
+        api_response = await self._provider.daily_range(geoloc, start_date, end_date)
+        if not api_response:
+            return None
+        df = self._transformer.create_daily_dataframe(api_response)
+        if df.empty:
+            return None
+        return df
 
+    async def get_multi_year_data(self, city: str, years: int = 3, end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
+        start_date_str, end_date_str = _multi_year_bounds(years, end_date)
+        return await self.get_weather_range(city, start_date_str, end_date_str)
@@ -4,45 +4,77 @@ from datetime import date, timedelta
 import matplotlib.pyplot as plt
 
 # ==== SERVICES LAYER ====
+from adapters.archive_cache import ArchiveCache
+from adapters.cache_paths import default_cache_dir
+from adapters.geocoding_cache import GeocodingCache
 from adapters.open_meteo_client import OpenMeteoClient
+from adapters.resilience import ResilientSession
+from services.range_planner import RangePlanner, location_key
 from services.weather_service import WeatherService
-from services.analytics.forecasting import forecast_temperature_next_year
-from services.analytics.pca import acp_temperature
+from services.analytics.climatology import ClimatologyCache
+from services.analytics.forecasting import HoltWintersCache, forecast_temperature_next_year
+from services.analytics.pca import AcpPipeline, PcaPartials, frame_digest
 from services.analytics.statistics import StatisticsService
 from services.analytics.weather_alerts import WeatherAlertService
 from services.presentation.weather_presenter import WeatherPresenter
+from data.timeseries_store import WeatherHistoryStore
 from data.transformer import DataTransformer
 
 # ==== UI COMPONENTS ====
 from ui.components.metrics import (
     render_weather_metrics_grid,
     render_secondary_metrics_grid,
-    render_comparison_metrics
+    render_comparison_metrics,
+    render_climatology_metrics
 )
 from ui.components.alerts import render_alerts_section
 from ui.components.charts import (
     render_temperature_chart,
     render_precipitation_chart,
     render_temperature_comparison_chart,
-    render_forecast_chart
+    render_forecast_chart,
+    render_rolling_loadings_chart
 )
 
 # ============================================
 #              SERVICE INITIALIZATION
 # ============================================
+# Frames float32 (voir data.transformer.COMPACT_DTYPES) : deux fois moins de mémoire par ville en cache
+COMPACT_FRAMES = True
+
+# Profondeur d'historique des normales climatologiques (page « J vs N-1 »)
+CLIMATOLOGY_YEARS = 10
+
+
+@st.cache_resource
 def create_services():
     """Crée et retourne toutes les instances de services nécessaires."""
-    om = OpenMeteoClient()
-    transformer = DataTransformer()
-    weather_service = WeatherService(geocoder=om, provider=om, transformer=transformer)
+    # Archive et géocodage sont persistés sur disque et partagés entre les workers
+    om = OpenMeteoClient(
+        session=ResilientSession(),
+        hedge_after_s=1.5,
+        archive_cache=ArchiveCache(default_cache_dir() / "archive.sqlite"),
+        geocoding_cache=GeocodingCache(default_cache_dir() / "geocoding.sqlite"),
+    )
+    transformer = DataTransformer(compact=COMPACT_FRAMES)
+    weather_service = WeatherService(
+        geocoder=om, provider=om, transformer=transformer,
+        planner=RangePlanner(store=WeatherHistoryStore(default_cache_dir() / "history")),
+    )
     statistics_service = StatisticsService()
     alert_service = WeatherAlertService()
     presenter = WeatherPresenter()
-    return weather_service, statistics_service, alert_service, presenter
+    # Modèles Holt-Winters ajustés, persistés : une prévision se réduit à une mise à jour d'état
+    hw_cache = HoltWintersCache(default_cache_dir() / "holt_winters")
+    # Normales par jour de l'année, persistées : « aujourd'hui vs normale » sans appel d'archive
+    climatology_cache = ClimatologyCache(default_cache_dir() / "climatology_index")
+    return om, weather_service, statistics_service, alert_service, presenter, hw_cache, climatology_cache
 
 
-# Services globaux (instanciés une seule fois)
-_weather_service, _statistics_service, _alert_service, _presenter = create_services()
+# Services globaux : cache_resource les conserve d'un rerun Streamlit à l'autre
+# (un seul pool de connexions HTTP et une seule couverture locale par processus)
+(_open_meteo, _weather_service, _statistics_service, _alert_service, _presenter, _hw_cache,
+ _climatology_cache) = create_services()
 
 # ============================================
 #              CACHED DATA FETCHERS
@@ -50,8 +82,7 @@ _weather_service, _statistics_service, _alert_service, _presenter = create_servi
 @st.cache_data(ttl=900)
 def fetch_geocode(city: str):
     """Récupère les coordonnées géographiques d'une ville."""
-    om = OpenMeteoClient()
-    return om.geocode(city)
+    return _open_meteo.geocode(city)
 
 
 @st.cache_data(ttl=900)
@@ -60,6 +91,12 @@ def fetch_daily_df(city: str, start_str: str, end_str: str):
     return _weather_service.get_weather_range(city, start_str, end_str)
 
 
+@st.cache_data(ttl=600)
+def fetch_today(city: str):
+    """Récupère les données d'aujourd'hui (prévision du jour)."""
+    return _weather_service.get_today(city)
+
+
 @st.cache_data(ttl=600)
 def fetch_today_vs_last_year(city: str):
     """Récupère les données d'aujourd'hui et de l'année dernière."""
@@ -67,35 +104,68 @@ def fetch_today_vs_last_year(city: str):
 
 
 @st.cache_data(ttl=3600)
-def fetch_multi_year_df(city: str, years: int = 5):
-    """Récupère les données multi-années pour une ville."""
-    return _weather_service.get_multi_year_data(city, years=years)
+def fetch_multi_year_df(city: str, years: int = 5, _progress=None):
+    """Récupère les données multi-années pour une ville (progression par blocs via ``_progress``)."""
+    return _weather_service.get_multi_year_data(city, years=years, progress=_progress)
 
 
 @st.cache_data(ttl=3600)
-def compute_hw_forecast(city: str, years: int = 5, periods: int = 365):
-    """Calcule la prévision de température pour l'année à venir."""
-    df_multi = _weather_service.get_multi_year_data(city, years=years)
+def compute_hw_forecast(city: str, years: int = 5, periods: int = 365, engine: str = "statsmodels",
+                        _progress=None):
+    """Calcule la prévision de température pour l'année à venir avec le moteur ``engine``."""
+    df_multi = _weather_service.get_multi_year_data(city, years=years, progress=_progress)
     if df_multi is None or getattr(df_multi, "empty", True):
         return None
-    df_forecast = forecast_temperature_next_year(df_multi, periods=periods)
+    geoloc = fetch_geocode(city)
+    key = location_key(geoloc) if geoloc else city
+    df_forecast = forecast_temperature_next_year(df_multi, periods=periods, cache=_hw_cache, key=key, engine=engine)
     return df_forecast
 
 
+@st.cache_resource(max_entries=16, ttl=900)
+def pca_partials(city: str, data_digest: str, _df):
+    """Sommes préfixes de l'ACP sur la période chargée : chaque sous-fenêtre coûte O(variables²).
+
+    Construites depuis le frame affiché (``_df``) ; l'empreinte de ses données fait partie de la
+    clé, des données revalidées par ``fetch_daily_df`` donnent donc de nouvelles sommes préfixes.
+    """
+    if _df is None or _df.empty:
+        return None
+    return PcaPartials(_df)
+
+
+@st.cache_resource
+def acp_pipeline():
+    """ACP mémorisées par localisation et empreinte de fenêtre, partagées entre les reruns."""
+    return AcpPipeline()
+
+
+def climatology_index(city: str, years: int = CLIMATOLOGY_YEARS):
+    """Index climatologique de la ville : construit une fois, puis complété des seuls nouveaux jours."""
+    df_multi = fetch_multi_year_df(city, years=years)
+    if df_multi is None or df_multi.empty:
+        return None
+    geoloc = fetch_geocode(city)
+    key = location_key(geoloc) if geoloc else city
+    return _climatology_cache.index_for(key, df_multi)
+
+
 # ============================================
 #              HELPER FUNCTIONS
 # ============================================
 def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Prépare un DataFrame pour l'affichage (gestion des index et colonnes)."""
+    """Prépare la vue d'affichage : indexée par ``time``, sans copie des colonnes.
+
+    Tous les graphiques et métriques d'un rendu sélectionnent leurs colonnes dans cette vue.
+    """
     if df is None:
         return pd.DataFrame()
     
-    df = df.copy()
     if not df.empty and 'date' in df.index.names:
-        df = df.reset_index().rename(columns={'date': 'time'})
+        df = df.rename_axis('time')
     
     # Conversion de l'ensoleillement
-    df = _presenter.convert_sunshine_duration_to_hours(df)
+    df = _presenter.convert_sunshine_duration_to_hours(df, lazy=COMPACT_FRAMES)
     
     return df
 
@@ -203,13 +273,16 @@ df = prepare_dataframe(df)
 #              PAGE ROUTING
 # ============================================
 if page == "Stat global":
+    # Tous les indicateurs en une passe sur les colonnes, partagés par les deux grilles
+    summary = _statistics_service.summarize(df)
+    
     # Métriques principales
-    render_weather_metrics_grid(df, _statistics_service, _presenter)
+    render_weather_metrics_grid(df, _statistics_service, _presenter, summary=summary)
     
     st.divider()
     
     # Métriques secondaires
-    render_secondary_metrics_grid(df, _statistics_service, _presenter)
+    render_secondary_metrics_grid(df, _statistics_service, _presenter, summary=summary)
     
     # Graphiques
     st.subheader("Courbes principales")
@@ -217,12 +290,29 @@ if page == "Stat global":
     render_precipitation_chart(df, _presenter)
     render_temperature_comparison_chart(df, _presenter)
 
+    # Les graphiques sont sous-échantillonnés : les données journalières complètes restent consultables
+    with st.expander("Données journalières"):
+        st.dataframe(df, use_container_width=True)
+
 elif page == "Prévisions":
     st.subheader("Prévisions")
     st.markdown("**Prévision statistique de la température moyenne**")
+    forecast_models = {
+        "Holt-Winters": "statsmodels",
+        "Régression harmonique (rapide, intervalle à 95 %)": "harmonic",
+    }
+    model_label = st.radio("Modèle", list(forecast_models), horizontal=True)
     
     with st.spinner("Calcul de la prévision à partir de l'historique multi‑années..."):
-        df_pred = compute_hw_forecast(city, years=5, periods=365)
+        download_bar = st.progress(0.0)
+
+        def _on_chunk(done: int, total: int):
+            download_bar.progress(done / total, text=f"Historique téléchargé : {done}/{total} blocs")
+
+        df_pred = compute_hw_forecast(
+            city, years=5, periods=365, engine=forecast_models[model_label], _progress=_on_chunk
+        )
+        download_bar.empty()
     
     render_forecast_chart(df_pred)
     
@@ -231,44 +321,80 @@ elif page == "Prévisions":
             st.dataframe(df_pred, use_container_width=True)
 
 elif page == "J vs N-1":
-    st.subheader("Comparaison aujourd'hui vs année dernière")
+    st.subheader("Comparaison aujourd'hui vs référence")
+    reference = st.radio("Référence", ["Normale climatologique", "Année N-1"], horizontal=True)
     
-    with st.spinner(f"Chargement des données pour {city}..."):
-        df_today, df_last_year = fetch_today_vs_last_year(city)
-    
-    # Validation des données
-    if df_today is None or df_today.empty:
-        st.error("Impossible de récupérer les données d'aujourd'hui.")
-    elif df_last_year is None or df_last_year.empty:
-        st.warning("Données d'aujourd'hui disponibles, mais impossible de récupérer les données de l'année dernière.")
-        st.info("**Données d'aujourd'hui**")
-        st.dataframe(df_today, use_container_width=True)
-    else:
-        # Préparation des données
-        df_today = prepare_dataframe(df_today)
-        df_last_year = prepare_dataframe(df_last_year)
-        
-        # Métriques de comparaison
-        render_comparison_metrics(
-            df_today, df_last_year, _statistics_service, _presenter
-        )
+    if reference == "Normale climatologique":
+        # Prévision du jour seule ; la normale est lue dans l'index local, sans archive
+        with st.spinner(f"Chargement des données pour {city}..."):
+            df_today = fetch_today(city)
+            index = climatology_index(city)
         
-        st.divider()
+        if df_today is None or df_today.empty:
+            st.error("Impossible de récupérer les données d'aujourd'hui.")
+        elif index is None:
+            st.warning("Historique indisponible : impossible de calculer les normales.")
+            st.dataframe(df_today, use_container_width=True)
+        else:
+            df_today = prepare_dataframe(df_today)
+            render_climatology_metrics(index.compare(df_today), _presenter)
+            st.caption(f"Normales {CLIMATOLOGY_YEARS} ans, fenêtre de ±{index.window_days} jours autour du jour de l'année.")
+            
+            st.divider()
+            
+            # Alertes météorologiques
+            render_alerts_section(df_today, _alert_service)
+    else:
+        with st.spinner(f"Chargement des données pour {city}..."):
+            df_today, df_last_year = fetch_today_vs_last_year(city)
         
-        # Alertes météorologiques
-        render_alerts_section(df_today, _alert_service)
+        # Validation des données
+        if df_today is None or df_today.empty:
+            st.error("Impossible de récupérer les données d'aujourd'hui.")
+        elif df_last_year is None or df_last_year.empty:
+            st.warning("Données d'aujourd'hui disponibles, mais impossible de récupérer les données de l'année dernière.")
+            st.info("**Données d'aujourd'hui**")
+            st.dataframe(df_today, use_container_width=True)
+        else:
+            # Préparation des données
+            df_today = prepare_dataframe(df_today)
+            df_last_year = prepare_dataframe(df_last_year)
+            
+            # Métriques de comparaison
+            render_comparison_metrics(
+                df_today, df_last_year, _statistics_service, _presenter
+            )
+            
+            st.divider()
+            
+            # Alertes météorologiques
+            render_alerts_section(df_today, _alert_service)
 
 elif page == "ACP":
     st.subheader("ACP – analyse en composantes principales")
     
-    # Préparation du DataFrame pour l'ACP
-    df_acp = df.copy()
-    if "time" in df_acp.columns and "date" not in df_acp.columns:
-        df_acp["date"] = df_acp["time"]
+    # Préparation du DataFrame pour l'ACP (vue, l'index temporel reprend son nom d'origine)
+    df_acp = df.rename_axis("date")
+    # Sommes préfixes dérivées du même frame que l'ACP, clé = empreinte de ses données
+    try:
+        partials = pca_partials(city, frame_digest(df_acp), df_acp) if not df_acp.empty else None
+    except KeyError as e:
+        st.error(f"Données incomplètes pour l'ACP: {e}")
+        partials = None
     
-    # Calcul de l'ACP
+    # Sous-fenêtre d'analyse : recalculée depuis les sommes préfixes, sans reparcourir les données
+    window = (start_dt, end_dt)
+    if start_dt < end_dt:
+        window = st.slider(
+            "Fenêtre d'analyse", min_value=start_dt, max_value=end_dt, value=(start_dt, end_dt), format="DD/MM/YYYY"
+        )
+    
+    # Calcul de l'ACP : seules PC1/PC2 sont affichées, un rerun sur la même fenêtre relit le cache
     try:
-        df_pcs, loadings, explained_var = acp_temperature(df_acp, start_str, end_str)
+        df_pcs, loadings, explained_var = acp_pipeline().acp(
+            location_key(geoloc), df_acp, window[0].isoformat(), window[1].isoformat(),
+            n_components=2, partials=partials,
+        )
     except Exception as e:
         st.error(f"Erreur lors du calcul de l'ACP: {e}")
         df_pcs, loadings, explained_var = None, None, None
@@ -279,3 +405,14 @@ elif page == "ACP":
         render_pca_loadings_table(loadings)
     else:
         st.warning("Impossible d'afficher les résultats de l'ACP.")
+    
+    # ACP glissante : toutes les fenêtres en une passe sur les sommes préfixes
+    st.divider()
+    st.markdown("**Évolution des loadings dans le temps**")
+    window_days = st.slider("Largeur de la fenêtre glissante (jours)", 30, 365, 90, step=15)
+    try:
+        rolling = partials.rolling(window_days) if partials is not None else None
+    except Exception as e:
+        st.error(f"Erreur lors du calcul de l'ACP glissante: {e}")
+        rolling = None
+    render_rolling_loadings_chart(rolling, _presenter)
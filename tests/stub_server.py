@@ -0,0 +1,66 @@
+"""Serveur HTTP local (thread) pour les tests et benchmarks des adapters."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# handler(path, query) -> (status, headers, body) ; body dict/list sérialisé en JSON
+StubHandler = Callable[[str, Dict[str, str]], Tuple[int, Dict[str, str], Any]]
+
+
+class StubServer:
+    """Rejoue les réponses d'un handler Python et compte requêtes et connexions TCP."""
+
+    def __init__(self, handler: StubHandler):
+        self.handler = handler
+        self.requests = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # évite le délai Nagle/ACK retardé entre en-têtes et corps
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                with stub._lock:
+                    stub.requests.append((parts.path, query))
+                    stub.connections.add(self.client_address)
+                status, headers, body = stub.handler(parts.path, query)
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pandas as pd
+
+import adapters.api_client as api_client
+from adapters.api_client import ARCHIVE_DAILY_VARIABLES
+from adapters.archive_cache import ArchiveCache
+from adapters.open_meteo_client import OpenMeteoClient
+from tests.stub_server import StubServer
+
+GEOLOC = {"latitude": 45.76, "longitude": 4.84, "timezone": "Europe/Paris"}
+
+
+def _archive_handler(path, query):
+    days = pd.date_range(query["start_date"], query["end_date"], freq="D")
+    daily = {"time": days.strftime("%Y-%m-%d").tolist()}
+    for i, variable in enumerate(ARCHIVE_DAILY_VARIABLES):
+        daily[variable] = [float(i + d.day) for d in days]
+    return 200, {}, {"latitude": 45.76, "longitude": 4.84, "daily": daily}
+
+
+def _client(server, tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+    cache = ArchiveCache(tmp_path / "archive.sqlite", today=lambda: date(2024, 10, 10), **kwargs)
+    return OpenMeteoClient(archive_cache=cache)
+
+
+def test_past_days_are_served_from_disk(tmp_path, monkeypatch):
+    with StubServer(_archive_handler) as server:
+        first = _client(server, tmp_path, monkeypatch).daily_range(GEOLOC, "2024-09-01", "2024-09-10")
+        # nouveau client = nouveau processus : le cache disque suffit
+        second = _client(server, tmp_path, monkeypatch).daily_range(GEOLOC, "2024-09-03", "2024-09-05")
+    assert len(server.requests) == 1
+    assert second["daily"]["time"] == ["2024-09-03", "2024-09-04", "2024-09-05"]
+    assert second["daily"]["temperature_2m_mean"] == first["daily"]["temperature_2m_mean"][2:5]
+
+
+def test_only_missing_span_is_fetched(tmp_path, monkeypatch):
+    with StubServer(_archive_handler) as server:
+        client = _client(server, tmp_path, monkeypatch)
+        client.daily_range(GEOLOC, "2024-09-01", "2024-09-10")
+        out = client.daily_range(GEOLOC, "2024-09-05", "2024-09-15")
+    assert server.requests[-1][1]["start_date"] == "2024-09-11"
+    assert len(out["daily"]["time"]) == 11
+
+
+def test_recent_days_are_revalidated(tmp_path, monkeypatch):
+    with StubServer(_archive_handler) as server:
+        client = _client(server, tmp_path, monkeypatch, recent_ttl_s=0.0)
+        client.daily_range(GEOLOC, "2024-10-01", "2024-10-08")
+        client.daily_range(GEOLOC, "2024-10-01", "2024-10-08")
+    # 2024-10-01..04 sont immuables, 05..08 sont redemandés
+    assert server.requests[-1][1]["start_date"] == "2024-10-05"
+
+
+def test_eviction_bounds_size(tmp_path):
+    cache = ArchiveCache(tmp_path / "archive.sqlite", max_entries=100)
+    days = pd.date_range("2020-01-01", periods=60).strftime("%Y-%m-%d").tolist()
+    cache.store(1.0, 2.0, {"time": days, "a": list(range(60)), "b": list(range(60))})
+    assert len(cache) <= 100
+
+
+def test_row_count_is_tracked_without_counting_every_store(tmp_path):
+    cache = ArchiveCache(tmp_path / "archive.sqlite", max_entries=100)
+    statements = []
+    cache._connect().set_trace_callback(statements.append)
+    for start in ("2020-01-01", "2020-02-01", "2020-03-01"):
+        days = pd.date_range(start, periods=20).strftime("%Y-%m-%d").tolist()
+        cache.store(1.0, 2.0, {"time": days, "a": list(range(20))})
+    assert not any("COUNT(*)" in sql for sql in statements)
+
+    # Dépassement estimé : comptage exact puis éviction
+    days = pd.date_range("2020-04-01", periods=50).strftime("%Y-%m-%d").tolist()
+    cache.store(1.0, 2.0, {"time": days, "a": list(range(50))})
+    assert sum("COUNT(*)" in sql for sql in statements) == 1
+    assert len(cache) <= 100 and cache._row_estimate == len(cache)
+    # Une autre instance (autre processus) repart du nombre exact de lignes
+    assert ArchiveCache(tmp_path / "archive.sqlite", max_entries=100)._row_estimate == len(cache)
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pandas as pd
+
+import adapters.api_client as api_client
+from adapters.open_meteo_client import AsyncOpenMeteoClient
+from data.transformer import DataTransformer
+from services.weather_service import AsyncWeatherService
+from tests.stub_server import StubServer
+
+DELAY_S = 0.3
+
+
+def _handler(path, query):
+    if path == "/geo":
+        return 200, {}, {"results": [{"latitude": 45.76, "longitude": 4.84, "country_code": "FR", "timezone": "Europe/Paris"}]}
+    time.sleep(DELAY_S)
+    day = query.get("start_date", "2024-10-03")
+    return 200, {}, {"daily": {"time": [day], "temperature_2m_mean": [14.2], "precipitation_sum": [0.4]}}
+
+
+def test_async_today_vs_last_year_runs_fetches_concurrently(monkeypatch):
+    with StubServer(_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/geo")
+        monkeypatch.setattr(api_client, "FORECAST_API_URL", server.url + "/forecast")
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = AsyncOpenMeteoClient()
+        svc = AsyncWeatherService(geocoder=client, provider=client, transformer=DataTransformer())
+
+        t0 = time.perf_counter()
+        df_today, df_last_year = asyncio.run(svc.get_today_vs_last_year("Lyon"))
+        elapsed = time.perf_counter() - t0
+        client.close()
+
+    assert isinstance(df_today, pd.DataFrame) and isinstance(df_last_year, pd.DataFrame)
+    assert {p for p, _ in server.requests} == {"/geo", "/forecast", "/archive"}
+    # borné par l'appel le plus lent, pas par la somme des deux
+    assert elapsed < 2 * DELAY_S
+
+
+def test_async_weather_range(monkeypatch):
+    with StubServer(_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/geo")
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = AsyncOpenMeteoClient()
+        svc = AsyncWeatherService(geocoder=client, provider=client, transformer=DataTransformer())
+        df = asyncio.run(svc.get_weather_range("Lyon", "2024-10-01", "2024-10-01"))
+        client.close()
+    assert df.index.name == "date" and len(df) == 1
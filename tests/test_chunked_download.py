@@ -0,0 +1,73 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+import requests
+
+import adapters.api_client as api_client
+from adapters.api_client import ARCHIVE_DAILY_VARIABLES
+from adapters.archive_cache import ArchiveCache
+from adapters.open_meteo_client import OpenMeteoClient, split_range
+from tests.stub_server import StubServer
+
+GEOLOC = {"latitude": 45.76, "longitude": 4.84, "timezone": "Europe/Paris"}
+
+
+class _FlakyArchive:
+    """Répond aux requêtes d'archive ; le premier appel sur le bloc 2021 échoue en 503."""
+
+    def __init__(self):
+        self.failed = False
+
+    def __call__(self, path, query):
+        if query["start_date"].startswith("2021") and not self.failed:
+            self.failed = True
+            return 503, {}, {"error": True}
+        days = pd.date_range(query["start_date"], query["end_date"], freq="D")
+        daily = {"time": days.strftime("%Y-%m-%d").tolist()}
+        daily.update({v: [float(d.year) for d in days] for v in ARCHIVE_DAILY_VARIABLES})
+        return 200, {}, {"daily": daily}
+
+
+def test_split_range():
+    chunks = split_range(date(2020, 1, 1), date(2022, 6, 30), 365)
+    assert chunks[0] == (date(2020, 1, 1), date(2020, 12, 30))
+    assert chunks[-1][1] == date(2022, 6, 30) and len(chunks) == 3
+
+
+def test_long_range_is_chunked_retried_and_stitched(monkeypatch):
+    progress = []
+    with StubServer(_FlakyArchive()) as server:
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = OpenMeteoClient(chunk_days=366, chunk_backoff_s=0.0)
+        out = client.daily_range(GEOLOC, "2020-01-01", "2022-12-31", progress=lambda d, t: progress.append((d, t)))
+    times = out["daily"]["time"]
+    assert times == pd.date_range("2020-01-01", "2022-12-31").strftime("%Y-%m-%d").tolist()
+    assert len(server.requests) == 4  # 3 blocs + 1 nouvel essai
+    assert progress[-1] == (3, 3)
+
+
+def test_cached_chunks_are_skipped(tmp_path, monkeypatch):
+    with StubServer(_FlakyArchive()) as server:
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        cache = ArchiveCache(tmp_path / "archive.sqlite", today=lambda: date(2024, 1, 1))
+        client = OpenMeteoClient(archive_cache=cache, chunk_days=366, chunk_backoff_s=0.0)
+        client.daily_range(GEOLOC, "2020-01-01", "2020-12-31")
+        n_before = len(server.requests)
+        out = client.daily_range(GEOLOC, "2020-01-01", "2022-12-31")
+    fetched = [q["start_date"] for _, q in server.requests[n_before:]]
+    assert "2020-01-01" not in fetched
+    assert len(out["daily"]["time"]) == 366 + 365 + 365
+
+
+def test_chunks_are_not_retried_on_top_of_a_retrying_session(monkeypatch):
+    from adapters.resilience import ResilientSession, RetryPolicy
+
+    with StubServer(lambda path, query: (503, {}, {"error": True})) as server:
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        session = ResilientSession(retry_policy=RetryPolicy(max_attempts=4, base_delay_s=0.0))
+        client = OpenMeteoClient(session=session, chunk_days=366, chunk_backoff_s=0.0)
+        with pytest.raises(requests.exceptions.RequestException):
+            client.daily_range(GEOLOC, "2020-01-01", "2020-12-31")
+    # Les 4 essais de la session seulement, pas 4 × (1 + nouvelles tentatives par bloc)
+    assert len(server.requests) == 4
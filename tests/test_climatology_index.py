@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from services.analytics.climatology import ClimatologyCache, ClimatologyIndex, day_slot
+
+
+def test_day_slot_gives_feb_29_its_own_slot():
+    slots = day_slot(pd.to_datetime(["2023-02-28", "2024-02-29", "2023-03-01", "2024-03-01", "2023-12-31"]))
+    assert slots.tolist() == [58, 59, 60, 60, 365]
+
+
+def test_normals_and_percentiles_match_window_statistics(multi_year_df):
+    df = multi_year_df.set_index("date")
+    index = ClimatologyIndex.build(df, window_days=7)
+    day = pd.Timestamp("2024-07-15")
+    window = df[np.abs(day_slot(df.index) - day_slot([day])[0]) <= 7]["temperature_2m_mean"]
+
+    mean, std = index.normal(day, "temperature_2m_mean")
+    assert np.isclose(mean, window.mean()) and np.isclose(std, window.std())
+    # Esquisse à 128 classes : rang et quantile à une classe près
+    rank = index.percentile_rank(day, "temperature_2m_mean", window.median())
+    assert abs(rank - 50.0) < 100.0 / len(window) + 5.0
+    assert abs(index.quantile(day, "temperature_2m_mean", 0.5) - window.median()) < 1.0
+    assert index.percentile_rank(day, "temperature_2m_mean", 100.0) == 100.0
+    # Heures d'ensoleillement dérivées de ``sunshine_duration``
+    sun_mean, _ = index.normal(day, "sunshine_hours")
+    sun_window = df.loc[window.index, "sunshine_duration"] / 3600
+    assert np.isclose(sun_mean, sun_window.mean())
+
+    comparison = index.compare(df.loc[[day]])
+    row = comparison.loc["temperature_2m_mean"]
+    assert np.isclose(row["anomalie"], df.loc[day, "temperature_2m_mean"] - mean)
+    assert comparison.loc["temperature_2m_max"].isna().all()
+
+
+def test_incremental_refresh_matches_full_build(multi_year_df, tmp_path):
+    df = multi_year_df.set_index("date")
+    cache = ClimatologyCache(tmp_path)
+    first = cache.index_for("lyon", df.loc[:"2024-06-30"])
+    assert first.last_date == pd.Timestamp("2024-06-30")
+    # Derniers jours sans valeur (archive en retard) : intégrés au rafraîchissement suivant
+    lagging = df.copy()
+    lagging.loc["2024-12-20":] = np.nan
+    assert cache.index_for("lyon", lagging).last_date == pd.Timestamp("2024-12-19")
+    refreshed = cache.index_for("lyon", df)
+
+    full = ClimatologyIndex.build(df)
+    assert refreshed.last_date == full.last_date
+    assert np.array_equal(refreshed.count, full.count) and np.array_equal(refreshed.hist, full.hist)
+    assert np.allclose(refreshed.total, full.total)
+    assert cache.index_for("lyon", df) is refreshed
+
+    reloaded = ClimatologyCache(tmp_path).get("lyon")
+    assert reloaded.last_date == full.last_date and np.array_equal(reloaded.hist, full.hist)
+
+
+def test_per_variable_high_water_mark_and_backfill_rebuild(multi_year_df, tmp_path):
+    df = multi_year_df.set_index("date")
+    cache = ClimatologyCache(tmp_path)
+    # Dernier jour : température publiée, ensoleillement encore absent
+    partial = df.loc["2024-01-01":].copy()
+    partial.loc["2024-12-31", "sunshine_duration"] = np.nan
+    first = cache.index_for("lyon", partial)
+    assert first.last_date == pd.Timestamp("2024-12-31")
+    sunshine = first.variables.index("sunshine_hours")
+    assert first.last_dates[sunshine] == pd.Timestamp("2024-12-30")
+
+    # L'ensoleillement du 31 décembre arrive au rafraîchissement suivant
+    completed = cache.index_for("lyon", df.loc["2024-01-01":])
+    assert completed.last_dates[sunshine] == pd.Timestamp("2024-12-31")
+    full_year = ClimatologyIndex.build(df.loc["2024-01-01":])
+    assert np.array_equal(completed.hist, full_year.hist)
+
+    # Historique complété en amont : reconstruction depuis le frame reçu
+    backfilled = cache.index_for("lyon", df)
+    assert backfilled.first_date == pd.Timestamp("2023-01-01")
+    assert np.array_equal(backfilled.count, ClimatologyIndex.build(df).count)
+    reloaded = ClimatologyCache(tmp_path).get("lyon")
+    assert reloaded.last_dates == backfilled.last_dates and reloaded.first_date == backfilled.first_date
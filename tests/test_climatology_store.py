@@ -0,0 +1,62 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.climatology_store import ClimatologyStore
+from services.analytics.statistics import StatisticsService
+
+
+def _daily(start, end):
+    idx = pd.date_range(start, end, freq="D", name="date")
+    return pd.DataFrame({"temperature_2m_mean": np.arange(len(idx), dtype=float),
+                         "precipitation_sum": np.ones(len(idx))}, index=idx)
+
+
+def _mean_in_worker(store):
+    return float(np.nanmean(store.view("temperature_2m_mean", "lyon")))
+
+
+@pytest.fixture
+def store(tmp_path):
+    writer = ClimatologyStore.create(tmp_path, ["paris", "lyon"], date(2023, 1, 1), date(2023, 12, 31),
+                                     variables=["temperature_2m_mean", "precipitation_sum"])
+    writer.write("lyon", _daily("2022-12-01", "2023-01-10"))
+    writer.flush()
+    return ClimatologyStore(tmp_path)
+
+
+def test_frame_columns_are_views_on_the_mapped_arrays(store):
+    df = store.frame("lyon", "2023-01-01", "2023-01-10")
+    assert len(df) == 10 and df.index[0] == pd.Timestamp("2023-01-01")
+    assert df.dtypes.unique().tolist() == [np.float32]
+    assert np.shares_memory(df["temperature_2m_mean"].to_numpy(), store.array("temperature_2m_mean"))
+    # Jours hors calendrier ignorés : le 1er janvier était le 32e jour écrit
+    assert df["temperature_2m_mean"].iloc[0] == 31.0
+    assert StatisticsService.safe_sum(df, "precipitation_sum") == 10.0
+    assert np.isnan(store.view("temperature_2m_mean", "paris")).all()
+
+
+def test_ranges_outside_the_calendar_are_empty(store):
+    assert store.frame("lyon", "2022-01-01", "2022-06-30").empty
+    assert store.view("temperature_2m_mean", "lyon", "2022-01-01", "2022-06-30").size == 0
+    assert store.view("temperature_2m_mean", "lyon", "2024-01-01", "2024-02-01").size == 0
+    # Plages à cheval : bornées au calendrier
+    assert len(store.frame("lyon", "2022-12-25", "2023-01-03")) == 3
+    assert len(store.frame("lyon", "2023-12-30", "2024-01-05")) == 2
+
+
+def test_store_is_shared_with_workers_by_path(store):
+    assert len(pickle.dumps(store)) < 1024
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_mean_in_worker, store).result() == pytest.approx(35.5)
+
+
+def test_read_only_store_rejects_writes(store):
+    with pytest.raises(PermissionError):
+        store.write("paris", _daily("2023-01-01", "2023-01-02"))
+    with pytest.raises(KeyError):
+        store.frame("marseille")
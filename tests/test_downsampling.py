@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from services.presentation.downsampling import lttb_indices, minmax_indices
+from services.presentation.weather_presenter import WeatherPresenter
+
+
+def _spiky_series(n=5000):
+    y = np.sin(np.arange(n) / 60.0)
+    y[1234] = 25.0
+    y[4321] = -25.0
+    return y
+
+
+def test_lttb_keeps_endpoints_spikes_and_budget():
+    y = _spiky_series()
+    idx = lttb_indices(y, 500)
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert len(idx) <= 500 and np.all(np.diff(idx) > 0)
+    assert {1234, 4321} <= set(idx.tolist())
+    assert len(lttb_indices(y[:100], 500)) == 100
+
+
+def test_minmax_keeps_bucket_extremes_and_ignores_nan():
+    y = _spiky_series()
+    y[10:20] = np.nan
+    idx = minmax_indices(y, 200)
+    assert len(idx) <= 200
+    assert np.nanmax(y[idx]) == 25.0 and np.nanmin(y[idx]) == -25.0
+
+
+def test_presenter_downsamples_charts_to_point_budget():
+    index = pd.date_range("1995-01-01", periods=5000, freq="D", name="time")
+    y = _spiky_series()
+    df = pd.DataFrame({"temperature_2m_mean": y, "temperature_2m_max": y + 5,
+                       "temperature_2m_min": y - 5, "precipitation_sum": np.abs(y)}, index=index)
+
+    temps = WeatherPresenter.prepare_temperature_chart_data(df, max_points=300)
+    rain = WeatherPresenter.prepare_precipitation_chart_data(df, max_points=300)
+    assert len(temps) <= 300 and temps.index.is_monotonic_increasing
+    assert temps["temperature_2m_max"].max() == 30.0
+    assert len(rain) <= 300 and rain["precipitation_sum"].max() == 25.0
+    assert len(WeatherPresenter.prepare_temperature_chart_data(df)) == 5000
@@ -8,3 +8,136 @@ def test_forecast_next_year_length_and_start(multi_year_df):
     assert len(out) == 365
     last = pd.to_datetime(multi_year_df["date"]).max()
     assert pd.to_datetime(out["date"].iloc[0]) == last + pd.Timedelta(days=1)
+
+def test_hw_cache_updates_incrementally_and_persists(tmp_path, monkeypatch):
+    import numpy as np
+    import services.analytics.forecasting as forecasting
+    from services.analytics.forecasting import HoltWintersCache
+
+    fits = []
+    real_fit = forecasting.fit_holt_winters
+    monkeypatch.setattr(forecasting, "fit_holt_winters", lambda ts: fits.append(len(ts)) or real_fit(ts))
+
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    t = np.arange(len(dates))
+    temp = 12 + 8 * np.sin(2 * np.pi * t / 365.0) + np.random.RandomState(0).normal(0, 0.5, size=len(t))
+    df = pd.DataFrame({"date": dates, "temperature_2m_mean": temp})
+    cache = HoltWintersCache(tmp_path)
+    first = forecast_temperature_next_year(df.iloc[:-10], periods=30, cache=cache, key="paris")
+    again = forecast_temperature_next_year(df.iloc[:-10], periods=30, cache=cache, key="paris")
+    pd.testing.assert_frame_equal(first, again)
+
+    # Dix nouveaux jours : mise à jour d'état, identique aux récurrences d'un modèle ajusté sur tout
+    updated = forecast_temperature_next_year(df, periods=30, cache=HoltWintersCache(tmp_path), key="paris")
+    assert fits == [len(df) - 10]
+    state = cache.get("paris")
+    ts = forecasting._daily_series(df)
+    reference = state.update(ts.values[-10:], ts.values[-365:], ts.index[-1])
+    assert np.allclose(updated["temperature_2m_mean_predite"], reference.forecast(30))
+    assert updated["date"].iloc[0] == ts.index[-1] + pd.Timedelta(days=1)
+
+    # Données modifiées dans la saison connue : réajustement complet
+    changed = df.copy()
+    changed.loc[len(df) - 20, "temperature_2m_mean"] += 5
+    forecast_temperature_next_year(changed, periods=30, cache=cache, key="paris")
+    assert fits == [len(df) - 10, len(df)]
+
+def test_batch_forecast_long_format_matches_per_city_model():
+    import numpy as np
+    from services.analytics.forecasting import forecast_temperature_many
+
+    dates = pd.date_range("2021-01-01", "2024-12-31", freq="D", name="date")
+    t = np.arange(len(dates))[:, None]
+    rng = np.random.RandomState(0)
+    wide = pd.DataFrame(12 + np.array([8.0, 4.0, 10.0]) * np.sin(2 * np.pi * t / 365.0)
+                        + rng.normal(0, 0.5, (len(t), 3)), index=dates, columns=["paris", "nice", "lille"])
+    wide.iloc[100:110, 1] = np.nan
+
+    out = forecast_temperature_many(wide, periods=60)
+    assert list(out.columns) == ["location", "date", "temperature_2m_mean_predite"]
+    assert len(out) == 180 and out["location"].unique().tolist() == ["paris", "nice", "lille"]
+    assert (out.groupby("location")["date"].min() == dates[-1] + pd.Timedelta(days=1)).all()
+
+    frames = {"paris": wide["paris"].rename("temperature_2m_mean").reset_index()}
+    reference = forecast_temperature_many(frames, periods=60, engine="statsmodels", max_workers=1)
+    paris = out[out["location"] == "paris"]["temperature_2m_mean_predite"].to_numpy()
+    assert np.abs(paris - reference["temperature_2m_mean_predite"].to_numpy()).mean() < 0.5
+
+def test_gappy_series_hits_the_cache(tmp_path, monkeypatch):
+    import numpy as np
+    import services.analytics.forecasting as forecasting
+    from services.analytics.forecasting import HoltWintersCache, forecast_temperature_many
+
+    fits = []
+    real_fit = forecasting._fit_matrix
+    monkeypatch.setattr(forecasting, "_fit_matrix", lambda v, i: fits.append(v.shape[1]) or real_fit(v, i))
+
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="D", name="date")
+    t = np.arange(len(dates))
+    wide = pd.DataFrame({"lyon": 12 + 8 * np.sin(2 * np.pi * t / 365.0)}, index=dates)
+    wide.iloc[-40:-30, 0] = np.nan  # trou dans la dernière saison
+
+    cache = HoltWintersCache(tmp_path)
+    first = forecast_temperature_many(wide.iloc[:-5], periods=30, cache=cache)
+    again = forecast_temperature_many(wide.iloc[:-5], periods=30, cache=HoltWintersCache(tmp_path))
+    pd.testing.assert_frame_equal(first, again)
+    # Cinq nouveaux jours : mise à jour incrémentale, toujours sans réajustement
+    forecast_temperature_many(wide, periods=30, cache=cache)
+    assert fits == [1]
+
+def test_harmonic_engine_handles_short_history_with_intervals(multi_year_df):
+    import numpy as np
+    import pytest
+    from services.analytics.forecasting import forecast_temperature_many
+
+    short = multi_year_df.iloc[:200]
+    out = forecast_temperature_next_year(short, periods=30, engine="harmonic")
+    assert list(out.columns) == ["date", "temperature_2m_mean_predite",
+                                 "temperature_2m_mean_ic_bas", "temperature_2m_mean_ic_haut"]
+    assert out["date"].iloc[0] == pd.to_datetime(short["date"]).max() + pd.Timedelta(days=1)
+    assert (out["temperature_2m_mean_ic_bas"] < out["temperature_2m_mean_predite"]).all()
+    assert (out["temperature_2m_mean_predite"] < out["temperature_2m_mean_ic_haut"]).all()
+
+    # Deux ans de sinusoïde bruitée : la saison prévue suit la saison réelle
+    full = forecast_temperature_next_year(multi_year_df, periods=365, engine="harmonic")
+    t = np.arange(len(multi_year_df), len(multi_year_df) + 365)
+    expected = 12 + 8 * np.sin(2 * np.pi * t / 365.0)
+    assert np.abs(full["temperature_2m_mean_predite"].to_numpy() - expected).mean() < 0.5
+
+    with pytest.raises(ValueError):
+        forecast_temperature_many({"x": short}, engine="prophet")
+
+
+def test_harmonic_batch_members_with_gaps_on_different_dates():
+    import numpy as np
+    from services.analytics.forecasting import forecast_temperature_many
+
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="D", name="date")
+    t = np.arange(len(dates))[:, None]
+    wide = pd.DataFrame(12 + np.array([[8.0, 3.0]]) * np.sin(2 * np.pi * t / 365.0) + 0.002 * t,
+                        index=dates, columns=["a", "b"])
+    # Même début, même fin, même nombre de jours observés, trous à des dates différentes
+    wide.iloc[100:130, 0] = np.nan
+    wide.iloc[800:830, 1] = np.nan
+
+    batch = forecast_temperature_many(wide, periods=60, engine="harmonic")
+    for city in wide.columns:
+        solo = forecast_temperature_many(wide[[city]], periods=60, engine="harmonic")
+        got = batch[batch["location"] == city]["temperature_2m_mean_predite"].to_numpy()
+        assert np.allclose(got, solo["temperature_2m_mean_predite"].to_numpy())
+
+
+def test_batch_skips_empty_and_all_nan_series():
+    import numpy as np
+    from services.analytics.forecasting import forecast_temperature_many
+
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="D", name="date")
+    t = np.arange(len(dates))
+    wide = pd.DataFrame({"lyon": 12 + 8 * np.sin(2 * np.pi * t / 365.0), "vide": np.nan}, index=dates)
+    for engine in ("vectorized", "harmonic"):
+        out = forecast_temperature_many(wide, periods=10, engine=engine)
+        assert out["location"].unique().tolist() == ["lyon"] and len(out) == 10
+
+    frames = {"lyon": wide["lyon"].rename("temperature_2m_mean").reset_index(), "absente": pd.DataFrame()}
+    out = forecast_temperature_many(frames, periods=10, engine="harmonic")
+    assert out["location"].unique().tolist() == ["lyon"]
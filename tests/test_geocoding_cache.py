@@ -0,0 +1,38 @@
+import adapters.api_client as api_client
+from adapters.geocoding_cache import GeocodingCache, normalize_city_name
+from adapters.open_meteo_client import OpenMeteoClient
+from tests.stub_server import StubServer
+
+
+def _handler(path, query):
+    lat = float(len(query["name"]))
+    return 200, {}, {"results": [{"latitude": lat, "longitude": 2.0, "country_code": "FR", "timezone": "Europe/Paris"}]}
+
+
+def test_normalize_city_name():
+    assert normalize_city_name("  Saint-Étienne ") == "saint-etienne"
+    assert normalize_city_name("PARIS") == normalize_city_name("paris")
+    assert normalize_city_name("Aix  en   Provence") == "aix en provence"
+
+
+def test_geocode_hits_index_for_equivalent_names(tmp_path, monkeypatch):
+    with StubServer(_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/geo")
+        client = OpenMeteoClient(geocoding_cache=GeocodingCache(tmp_path / "geo.sqlite"))
+        first = client.geocode("Orléans")
+        assert client.geocode("  orleans ") == first
+        # l'index survit au processus
+        other = OpenMeteoClient(geocoding_cache=GeocodingCache(tmp_path / "geo.sqlite"))
+        assert other.geocode("ORLÉANS") == first
+    assert len(server.requests) == 1
+
+
+def test_geocode_many_resolves_only_misses(tmp_path, monkeypatch):
+    with StubServer(_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/geo")
+        client = OpenMeteoClient(geocoding_cache=GeocodingCache(tmp_path / "geo.sqlite"))
+        client.geocode("Lyon")
+        out = client.geocode_many(["Lyon", "Nice", "nice", "Brest"])
+    assert set(out) == {"Lyon", "Nice", "nice", "Brest"}
+    assert out["Nice"] == out["nice"]
+    assert sorted(q["name"] for _, q in server.requests) == ["Brest", "Lyon", "Nice"]
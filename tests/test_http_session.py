@@ -0,0 +1,26 @@
+import adapters.api_client as api_client
+from adapters.http_session import HttpSessionConfig, PooledSession
+from adapters.open_meteo_client import OpenMeteoClient
+from tests.stub_server import StubServer
+
+
+def _geocoding_handler(path, query):
+    return 200, {}, {"results": [{"latitude": 48.85, "longitude": 2.35, "country_code": "FR", "timezone": "Europe/Paris"}]}
+
+
+def test_pooled_session_reuses_one_connection(monkeypatch):
+    with StubServer(_geocoding_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/v1/search")
+        client = OpenMeteoClient()
+        for _ in range(5):
+            assert client.geocode("Paris")["timezone"] == "Europe/Paris"
+        client.close()
+    assert len(server.requests) == 5
+    assert len(server.connections) == 1
+
+
+def test_pooled_session_defaults():
+    session = PooledSession(HttpSessionConfig(connect_timeout=1.0, read_timeout=2.0, host_pool_maxsize={"example.org": 8}))
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.config.timeout == (1.0, 2.0)
+    assert session.get_adapter("https://example.org/x")._pool_maxsize == 8
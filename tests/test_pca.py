@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 from services.analytics.pca import acp_temperature
 
 def test_acp_shapes_and_explained(multi_year_df):
@@ -7,3 +8,99 @@ def test_acp_shapes_and_explained(multi_year_df):
     assert "temperature_2m_mean" in df_pcs.columns and "date" in df_pcs.columns
     assert loadings.shape[0] >= 4
     assert np.isclose(np.sum(explained), 1.0, atol=1e-6)
+
+def test_incremental_acp_matches_full_pca(multi_year_df):
+    import pytest
+    from services.analytics.pca import PcaPartials
+
+    partials = PcaPartials(multi_year_df.set_index("date"))
+    for start, end in [("2023-06-01", "2023-08-31"), ("2023-01-01", "2024-12-31"), ("2024-02-10", "2024-02-25")]:
+        ref_pcs, ref_loadings, ref_explained = acp_temperature(multi_year_df, start, end)
+        df_pcs, loadings, explained = acp_temperature(multi_year_df, start, end, partials=partials)
+        assert list(df_pcs.columns) == list(ref_pcs.columns)
+        assert (df_pcs["date"].to_numpy() == ref_pcs["date"].to_numpy()).all()
+        assert np.allclose(explained, ref_explained, atol=1e-12)
+        # Axes de variance nulle (variables colinéaires du jeu de test) : orientation arbitraire
+        kept = ref_explained > 1e-10
+        assert np.allclose(loadings.to_numpy()[:, kept], ref_loadings.to_numpy()[:, kept], atol=1e-9)
+        assert np.allclose(df_pcs.filter(like="PC").to_numpy()[:, kept],
+                           ref_pcs.filter(like="PC").to_numpy()[:, kept], atol=1e-8)
+    with pytest.raises(ValueError):
+        partials.acp("2030-01-01", "2030-02-01")
+
+def test_rolling_acp_windows_match_acp_and_keep_orientation(multi_year_df):
+    from services.analytics.pca import rolling_acp
+
+    rolling = rolling_acp(multi_year_df, window_days=90, step_days=7)
+    n_windows = len(rolling.window_end)
+    assert rolling.loadings.shape == (n_windows, 5, 5) and rolling.explained_var.shape == (n_windows, 5)
+    assert (rolling.window_end - rolling.window_start == pd.Timedelta(days=89)).all()
+    for k in (0, n_windows // 2, n_windows - 1):
+        start, end = rolling.window_start[k].date().isoformat(), rolling.window_end[k].date().isoformat()
+        _, loadings, explained = acp_temperature(multi_year_df, start, end)
+        assert np.allclose(rolling.explained_var[k], explained, atol=1e-10)
+        assert np.allclose(np.abs(rolling.loadings[k, :, :2]), np.abs(loadings.to_numpy()[:, :2]), atol=1e-8)
+    dots = np.einsum("wvk,wvk->wk", rolling.loadings[1:, :, :2], rolling.loadings[:-1, :, :2])
+    assert (dots > 0).all()
+    assert rolling.loadings_frame(1).shape == (n_windows, 5)
+
+def test_rolling_acp_alignment_skips_windows_with_nan(multi_year_df):
+    from services.analytics.pca import rolling_acp
+
+    gappy = multi_year_df.copy()
+    gappy.loc[300, "sunshine_duration"] = np.nan
+    clean = rolling_acp(multi_year_df, window_days=60, step_days=1)
+    rolling = rolling_acp(gappy, window_days=60, step_days=1)
+    invalid = np.isnan(rolling.explained_var).any(axis=1)
+    assert invalid.sum() == 60
+
+    valid = rolling.loadings[~invalid]
+    dots = np.einsum("wvk,wvk->wk", valid[1:], valid[:-1])
+    assert (dots > 0).all()
+    # Hors des fenêtres à NaN, mêmes axes et même orientation que sans valeur manquante
+    assert np.allclose(valid, clean.loadings[~invalid], atol=1e-6)
+
+def test_acp_pipeline_memoizes_and_truncates(multi_year_df):
+    from services.analytics.pca import AcpPipeline, PcaPartials
+
+    start, end = "2023-01-01", "2024-12-31"
+    pipeline = AcpPipeline(randomized_min_rows=100)
+    first = pipeline.fit("paris", multi_year_df, start, end)
+    assert pipeline.fit("paris", multi_year_df, start, end) is first
+    assert list(first.loadings.columns) == ["PC1", "PC2"] and first.explained_var.shape == (2,)
+
+    # SVD randomisée (graine fixe) : mêmes PC1/PC2 que l'ACP complète, au bit près d'une instance à l'autre
+    _, ref_loadings, ref_explained = acp_temperature(multi_year_df, start, end)
+    assert np.allclose(first.explained_var, ref_explained[:2], atol=1e-10)
+    assert np.allclose(first.loadings.to_numpy(), ref_loadings.to_numpy()[:, :2], atol=1e-8)
+    again = AcpPipeline(randomized_min_rows=100).fit("paris", multi_year_df, start, end)
+    assert np.array_equal(again.loadings.to_numpy(), first.loadings.to_numpy())
+    assert np.array_equal(again.df_pcs["PC1"].to_numpy(), first.df_pcs["PC1"].to_numpy())
+
+    # Chemin des sommes préfixes pour les fenêtres courtes ; nouvelles données -> nouvelle empreinte
+    partials = PcaPartials(multi_year_df.set_index("date"))
+    small = AcpPipeline().fit("paris", multi_year_df, start, end, partials=partials)
+    assert np.allclose(small.loadings.to_numpy(), first.loadings.to_numpy(), atol=1e-8)
+    changed = multi_year_df.copy()
+    changed.loc[changed.index[-1], "wind_speed_10m_max"] += 1.0
+    assert pipeline.fit("paris", changed, start, end) is not first
+
+def test_acp_pipeline_ignores_stale_partials(multi_year_df, monkeypatch):
+    from services.analytics.pca import AcpPipeline, PcaPartials
+
+    start, end = "2023-01-01", "2024-12-31"
+    partials = PcaPartials(multi_year_df.set_index("date"))
+    calls = []
+    real_acp = partials.acp
+    monkeypatch.setattr(partials, "acp", lambda *a: calls.append(a) or real_acp(*a))
+
+    AcpPipeline().fit("paris", multi_year_df, start, end, partials=partials)
+    assert len(calls) == 1
+
+    # Derniers jours revalidés depuis la construction des partials : calcul direct sur ``df``
+    revised = multi_year_df.copy()
+    revised.loc[revised.index[-5:], "precipitation_sum"] += 3.0
+    result = AcpPipeline().fit("paris", revised, start, end, partials=partials)
+    assert len(calls) == 1
+    _, ref_loadings, ref_explained = acp_temperature(revised, start, end)
+    assert np.allclose(result.explained_var, ref_explained[:2], atol=1e-10)
@@ -0,0 +1,71 @@
+from datetime import date
+
+import pandas as pd
+
+from data.transformer import DataTransformer
+from services.range_planner import RangePlanner, missing_ranges
+from services.weather_service import WeatherService
+
+
+class RecordingProvider:
+    def __init__(self):
+        self.calls = []
+
+    def daily_range(self, geoloc, start, end):
+        self.calls.append((start, end))
+        dates = pd.date_range(start, end, freq="D")
+        return {"daily": {"time": dates.strftime("%Y-%m-%d").tolist(),
+                          "temperature_2m_mean": [float(d.dayofyear) for d in dates]}}
+
+
+def test_missing_ranges():
+    covered = [(date(2024, 1, 5), date(2024, 1, 10)), (date(2024, 1, 11), date(2024, 1, 12))]
+    gaps = missing_ranges(covered, date(2024, 1, 1), date(2024, 1, 20))
+    assert gaps == [(date(2024, 1, 1), date(2024, 1, 4)), (date(2024, 1, 13), date(2024, 1, 20))]
+    assert missing_ranges(covered, date(2024, 1, 6), date(2024, 1, 12)) == []
+
+
+def test_shifted_range_fetches_only_new_days(fake_geocoder):
+    provider = RecordingProvider()
+    planner = RangePlanner(today=lambda: date(2025, 1, 1))
+    svc = WeatherService(geocoder=fake_geocoder, provider=provider, transformer=DataTransformer(), planner=planner)
+
+    first = svc.get_weather_range("Lyon", "2024-03-01", "2024-03-31")
+    shifted = svc.get_weather_range("Lyon", "2024-03-02", "2024-04-01")
+
+    assert provider.calls == [("2024-03-01", "2024-03-31"), ("2024-04-01", "2024-04-01")]
+    assert len(first) == 31 and len(shifted) == 31
+    assert shifted.index.is_unique and shifted.index.is_monotonic_increasing
+    assert shifted.index[0] == pd.Timestamp("2024-03-02")
+
+
+def test_volatile_days_are_refetched(fake_geocoder):
+    provider = RecordingProvider()
+    planner = RangePlanner(volatile_days=5, today=lambda: date(2024, 3, 31))
+    svc = WeatherService(geocoder=fake_geocoder, provider=provider, transformer=DataTransformer(), planner=planner)
+    svc.get_weather_range("Lyon", "2024-03-01", "2024-03-31")
+    df = svc.get_weather_range("Lyon", "2024-03-01", "2024-03-31")
+    assert provider.calls[-1] == ("2024-03-26", "2024-03-31")
+    assert len(df) == 31
+
+
+def test_memory_store_appends_segments_and_merges_on_read():
+    from services.range_planner import MemoryCoverageStore
+
+    def block(start, end, value):
+        idx = pd.date_range(start, end, freq="D", name="date")
+        return pd.DataFrame({"temperature_2m_mean": [value] * len(idx)}, index=idx)
+
+    store = MemoryCoverageStore()
+    store.write("k", block("2024-03-01", "2024-03-31", 1.0), [(date(2024, 3, 1), date(2024, 3, 31))])
+    store.write("k", block("2024-02-01", "2024-02-29", 2.0), [(date(2024, 2, 1), date(2024, 2, 29))])
+    store.write("k", block("2024-03-29", "2024-04-02", 3.0), [])
+    # Écritures sans recopie : un segment par bloc
+    assert len(store._segments["k"]) == 3
+
+    df = store.read("k", date(2024, 2, 1), date(2024, 4, 2))
+    assert len(store._segments["k"]) == 1
+    assert df.index.is_unique and df.index.is_monotonic_increasing and len(df) == 29 + 31 + 2
+    assert df.loc["2024-03-28", "temperature_2m_mean"] == 1.0
+    assert df.loc["2024-03-29", "temperature_2m_mean"] == 3.0
+    assert store.coverage("k") == [(date(2024, 2, 1), date(2024, 3, 31))]
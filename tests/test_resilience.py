@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import adapters.api_client as api_client
+from adapters.open_meteo_client import OpenMeteoClient
+from adapters.resilience import CircuitBreaker, CircuitOpenError, ResilientSession, RetryPolicy, hedged_call
+from tests.stub_server import StubServer
+
+FAST_RETRY = RetryPolicy(max_attempts=4, base_delay_s=0.0)
+TODAY = {"daily": {"time": ["2024-10-03"], "temperature_2m_max": [21.0]}}
+
+
+class FaultInjector:
+    """Rejoue une séquence de réponses (statut, en-têtes) puis répond 200."""
+
+    def __init__(self, faults, delays=()):
+        self.faults = list(faults)
+        self.delays = list(delays)
+        self.lock = threading.Lock()
+
+    def __call__(self, path, query):
+        with self.lock:
+            fault = self.faults.pop(0) if self.faults else None
+            delay = self.delays.pop(0) if self.delays else 0.0
+        time.sleep(delay)
+        if fault is not None:
+            status, headers = fault
+            return status, headers, {"error": True}
+        return 200, {}, TODAY
+
+
+def test_retries_5xx_and_429_with_retry_after():
+    injector = FaultInjector([(503, {}), (429, {"Retry-After": "0"}), (502, {})])
+    with StubServer(injector) as server:
+        session = ResilientSession(retry_policy=FAST_RETRY)
+        response = session.get(server.url + "/forecast")
+    assert response.status_code == 200
+    assert len(server.requests) == 4
+
+
+def test_retry_after_header_is_honoured():
+    response = requests.Response()
+    response.headers["Retry-After"] = "7"
+    assert RetryPolicy(max_delay_s=5.0).delay(0, response) == 5.0
+    assert 0.0 <= RetryPolicy(base_delay_s=1.0).delay(3) <= 8.0
+
+
+def test_circuit_breaker_fails_fast_while_upstream_down():
+    injector = FaultInjector([(500, {})] * 100)
+    with StubServer(injector) as server:
+        session = ResilientSession(
+            retry_policy=RetryPolicy(max_attempts=2, base_delay_s=0.0),
+            breaker_factory=lambda: CircuitBreaker(failure_threshold=3, reset_timeout_s=60.0),
+        )
+        assert session.get(server.url + "/x").status_code == 500
+        with pytest.raises(CircuitOpenError):
+            session.get(server.url + "/x")
+        n_requests = len(server.requests)
+        with pytest.raises(CircuitOpenError):
+            session.get(server.url + "/x")
+    assert n_requests == 3
+    assert len(server.requests) == n_requests
+
+
+def test_forecast_adapter_returns_none_when_circuit_open(monkeypatch):
+    injector = FaultInjector([(503, {})] * 100)
+    with StubServer(injector) as server:
+        monkeypatch.setattr(api_client, "FORECAST_API_URL", server.url + "/forecast")
+        session = ResilientSession(retry_policy=RetryPolicy(max_attempts=1),
+                                   breaker_factory=lambda: CircuitBreaker(failure_threshold=1))
+        client = OpenMeteoClient(session=session)
+        assert client.daily_today({"latitude": 1.0, "longitude": 2.0}) is None
+        assert client.daily_today({"latitude": 1.0, "longitude": 2.0}) is None
+    assert len(server.requests) == 1
+
+
+def test_half_open_trial_ends_on_non_retried_error(monkeypatch):
+    from adapters.http_session import PooledSession
+
+    errors = [requests.exceptions.ConnectionError("down"), requests.exceptions.TooManyRedirects("loop")]
+
+    def fake_request(self, method, url, **kwargs):
+        if errors:
+            raise errors.pop(0)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(PooledSession, "request", fake_request)
+    session = ResilientSession(retry_policy=RetryPolicy(max_attempts=1),
+                               breaker_factory=lambda: CircuitBreaker(failure_threshold=1, reset_timeout_s=0.0))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get("http://upstream.test/x")
+    # Essai semi-ouvert en échec sur une erreur non réessayée : l'essai se termine quand même
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        session.get("http://upstream.test/x")
+    assert session.get("http://upstream.test/x").status_code == 200
+    assert not session.breaker("upstream.test").is_open
+
+
+def test_hedged_daily_today_beats_slow_first_request(monkeypatch):
+    injector = FaultInjector([], delays=[1.5])
+    with StubServer(injector) as server:
+        monkeypatch.setattr(api_client, "FORECAST_API_URL", server.url + "/forecast")
+        client = OpenMeteoClient(hedge_after_s=0.1)
+        t0 = time.perf_counter()
+        out = client.daily_today({"latitude": 1.0, "longitude": 2.0})
+        elapsed = time.perf_counter() - t0
+        client.close()
+    assert out == TODAY
+    assert elapsed < 1.0
+
+
+def test_hedged_call_falls_back_to_unaccepted_result():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert hedged_call(lambda: None, 0.01, executor) is None
+        with pytest.raises(ValueError):
+            hedged_call(lambda: (_ for _ in ()).throw(ValueError("boom")), 0.01, executor)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from services.analytics.climatology import day_slot
+from services.analytics.series_stats import SeriesStatsEngine
+
+
+def _fleet(multi_year_df):
+    base = multi_year_df.set_index("date")
+    frames = [base.assign(city="lyon"), (base + 1.5).assign(city="brest")]
+    frames[0].iloc[::9, 0] = np.nan
+    # Ordre quelconque : le moteur trie une fois par (ville, date)
+    return pd.concat(frames).sample(frac=1.0, random_state=0)
+
+
+def test_resample_and_degree_days_match_pandas_groupby(multi_year_df):
+    fleet = _fleet(multi_year_df)
+    engine = SeriesStatsEngine(fleet)
+
+    monthly = engine.resample("month", {"temperature_2m_mean": ("mean", "min"), "sunshine_hours": ("sum",)})
+    grouped = fleet.groupby(["city", fleet.index.to_period("M").start_time])
+    assert np.allclose(monthly["temperature_2m_mean_mean"], grouped["temperature_2m_mean"].mean())
+    assert np.allclose(monthly["temperature_2m_mean_min"], grouped["temperature_2m_mean"].min())
+    assert np.allclose(monthly["sunshine_hours_sum"], grouped["sunshine_duration"].sum() / 3600)
+    assert monthly.index.names == ["city", "periode"]
+
+    seasons = engine.resample("season")
+    # Décembre 2023 ouvre l'hiver 2023-2024
+    assert pd.Timestamp("2023-12-01") in seasons.loc["lyon"].index
+    ref = fleet.groupby(["city", fleet.index.to_period("Q-NOV").start_time])["precipitation_sum"].sum()
+    assert np.allclose(seasons["precipitation_sum_sum"], ref)
+
+    weekly = engine.degree_days("week", heating_base=18.0, cooling_base=20.0)
+    monday = fleet.index - pd.to_timedelta(fleet.index.weekday, unit="D")
+    temperature = fleet["temperature_2m_mean"]
+    # Semaine sans aucune température : NaN plutôt que 0 degré-jour
+    hdd = (18.0 - temperature).clip(lower=0).groupby([fleet["city"], monday]).sum(min_count=1)
+    cdd = (temperature - 20.0).clip(lower=0).groupby([fleet["city"], monday]).sum(min_count=1)
+    assert np.allclose(weekly["dju_chauffage"], hdd, equal_nan=True)
+    assert np.allclose(weekly["dju_climatisation"], cdd, equal_nan=True)
+
+
+def test_rolling_means_and_anomalies_stay_within_each_city(multi_year_df):
+    fleet = _fleet(multi_year_df)
+    engine = SeriesStatsEngine(fleet)
+
+    rolling = engine.rolling_mean(14, ["temperature_2m_mean"], min_periods=7)
+    ref = fleet.groupby("city")["temperature_2m_mean"].apply(
+        lambda s: s.sort_index().rolling(14, min_periods=7).mean())
+    assert np.allclose(rolling["temperature_2m_mean"], ref, equal_nan=True)
+    assert rolling.loc[("brest", pd.Timestamp("2023-01-07")), "temperature_2m_mean"] == \
+        fleet[fleet["city"] == "brest"].sort_index()["temperature_2m_mean"].iloc[:7].mean()
+
+    anomalies = engine.anomalies(["temperature_2m_mean"], smooth_days=0)
+    slot = day_slot(fleet.index)
+    normal = fleet.groupby([fleet["city"], slot])["temperature_2m_mean"].transform("mean")
+    expected = (fleet["temperature_2m_mean"] - normal).set_axis(
+        pd.MultiIndex.from_arrays([fleet["city"], fleet.index])).sort_index()
+    assert np.allclose(anomalies["temperature_2m_mean"], expected, equal_nan=True)
+
+    single = SeriesStatsEngine(multi_year_df.set_index("date"))
+    assert single.resample("year").index.tolist() == [pd.Timestamp("2023-01-01"), pd.Timestamp("2024-01-01")]
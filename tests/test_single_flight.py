@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import adapters.api_client as api_client
+from adapters.open_meteo_client import AsyncOpenMeteoClient, OpenMeteoClient
+from adapters.single_flight import SingleFlight
+from tests.stub_server import StubServer
+
+GEOLOC = {"latitude": 48.85, "longitude": 2.35, "timezone": "Europe/Paris"}
+
+
+def _slow_archive(path, query):
+    time.sleep(0.3)
+    days = pd.date_range(query["start_date"], query["end_date"], freq="D")
+    return 200, {}, {"daily": {"time": days.strftime("%Y-%m-%d").tolist(),
+                               "temperature_2m_mean": [12.0] * len(days)}}
+
+
+def test_concurrent_threads_share_one_request(monkeypatch):
+    with StubServer(_slow_archive) as server:
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = OpenMeteoClient()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.daily_range(GEOLOC, "2024-01-01", "2024-01-31"), range(8)))
+            other = client.daily_range(GEOLOC, "2024-02-01", "2024-02-02")
+    assert len(server.requests) == 2
+    assert all(r is results[0] for r in results)
+    assert len(other["daily"]["time"]) == 2
+
+
+def test_concurrent_tasks_share_one_request(monkeypatch):
+    with StubServer(_slow_archive) as server:
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = AsyncOpenMeteoClient(max_workers=2)
+
+        async def fan_out():
+            return await asyncio.gather(*[client.daily_range(GEOLOC, "2024-01-01", "2024-01-31") for _ in range(20)])
+
+        results = asyncio.run(fan_out())
+        client.close()
+    assert len(server.requests) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("upstream")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", boom)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and flight.in_flight() == 0
+    assert flight.do("k", lambda: 42) == 42
+
+
+def test_coalesced_followers_receive_progress_in_their_own_thread():
+    client = OpenMeteoClient()
+    release = [threading.Event(), threading.Event()]
+
+    def fake_daily_range(geoloc, start, end, progress=None):
+        for done, event in enumerate(release, start=1):
+            progress(done, 3)
+            event.wait(5)
+        progress(3, 3)
+        return {"daily": {"time": []}}
+
+    client._daily_range = fake_daily_range
+    seen = []
+
+    def follower():
+        out = client.daily_range(GEOLOC, "2020-01-01", "2022-12-31",
+                                 progress=lambda d, t: seen.append((d, t, threading.get_ident())))
+        return out, threading.get_ident()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(client.daily_range, GEOLOC, "2020-01-01", "2022-12-31")  # sans progression
+        while client._single_flight.in_flight() == 0:
+            time.sleep(0.01)
+        follow = executor.submit(follower)
+        time.sleep(0.3)
+        release[0].set()
+        time.sleep(0.3)
+        release[1].set()
+        (out, follower_thread), shared = follow.result(), leader.result()
+    assert out is shared
+    assert [(d, t) for d, t, _ in seen][:2] == [(1, 3), (2, 3)] and seen[-1][:2] == (3, 3)
+    assert {ident for _, _, ident in seen} == {follower_thread}
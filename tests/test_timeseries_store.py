@@ -0,0 +1,126 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data.timeseries_store import STORE_DTYPES, WeatherHistoryStore
+from data.transformer import COMPACT_DTYPES, DAILY_DTYPES, DataTransformer
+from services.range_planner import RangePlanner
+
+KEY = "48.8500,2.3500"
+
+
+def _frame(start, end, value=None):
+    idx = pd.date_range(start, end, freq="D", name="date")
+    temps = np.arange(len(idx), dtype=float) if value is None else np.full(len(idx), value)
+    return pd.DataFrame({"temperature_2m_mean": temps, "precipitation_sum": temps / 10}, index=idx)
+
+
+def test_partitions_by_year_and_reads_requested_columns(tmp_path):
+    store = WeatherHistoryStore(tmp_path)
+    store.append(KEY, _frame("2022-06-01", "2024-03-31"))
+
+    years = sorted(p.name for p in (tmp_path / "48.8500_2.3500").glob("year=*"))
+    assert years == ["year=2022", "year=2023", "year=2024"]
+
+    df = store.read(KEY, date(2023, 1, 1), date(2023, 1, 10), columns=["precipitation_sum"])
+    assert list(df.columns) == ["precipitation_sum"]
+    assert len(df) == 10 and df.index[0] == pd.Timestamp("2023-01-01")
+    assert store.read("0.0000,0.0000") is None
+
+
+def test_last_append_wins_and_compaction_merges_parts(tmp_path):
+    store = WeatherHistoryStore(tmp_path)
+    store.append(KEY, _frame("2024-01-01", "2024-01-31"))
+    store.append(KEY, _frame("2024-01-25", "2024-02-10", value=-1.0))
+
+    df = store.read(KEY)
+    assert len(df) == 41 and df.index.is_unique
+    assert df.loc["2024-01-24", "temperature_2m_mean"] == 23.0
+    assert df.loc["2024-01-25", "temperature_2m_mean"] == -1.0
+
+    store.compact(KEY)
+    assert len(list((tmp_path / "48.8500_2.3500" / "year=2024").glob("part-*.parquet"))) == 1
+    pd.testing.assert_frame_equal(store.read(KEY), df)
+
+
+def _payload(start, codes):
+    days = pd.date_range(start, periods=len(codes), freq="D").strftime("%Y-%m-%d").tolist()
+    temps = [None if code is None else 10.0 + i for i, code in enumerate(codes)]
+    return {"daily": {"time": days, "weathercode": codes, "temperature_2m_mean": temps}}
+
+
+def test_frames_with_and_without_nulls_in_both_modes_share_one_schema(tmp_path):
+    store = WeatherHistoryStore(tmp_path, max_parts_per_year=2)
+    batches = [
+        (False, _payload("2024-01-01", [1, 3, 61])),
+        (True, _payload("2024-01-04", [2, None, 45])),
+        (False, _payload("2024-01-07", [None, 0, 0])),
+        (True, _payload("2024-01-10", [80, 81, 82])),
+    ]
+    for compact, payload in batches:
+        store.append(KEY, DataTransformer(compact=compact).create_daily_dataframe(payload))
+        # Lecture après chaque ajout, y compris après la compaction automatique (> 2 fichiers)
+        df = store.read(KEY)
+
+    assert len(df) == 12
+    assert df.dtypes.to_dict() == {c: STORE_DTYPES[c] for c in df.columns}
+    assert df["weathercode"].isna().sum() == 2
+    assert df.loc["2024-01-12", "weathercode"] == 82
+    assert df.loc["2024-01-06", "temperature_2m_mean"] == 12.0
+
+
+def test_reads_parts_written_with_legacy_dtypes(tmp_path):
+    store = WeatherHistoryStore(tmp_path)
+    legacy = _frame("2024-01-01", "2024-01-05").astype(np.float32).assign(weathercode=np.int8(3))
+    year_dir = tmp_path / "48.8500_2.3500" / "year=2024"
+    year_dir.mkdir(parents=True)
+    store._write_part(year_dir, legacy.reset_index().assign(_batch=0))
+    store.append(KEY, _frame("2024-01-06", "2024-01-08").assign(weathercode=np.nan))
+
+    df = store.read(KEY)
+    assert len(df) == 8 and df["weathercode"].isna().sum() == 3
+    store.compact(KEY)
+    pd.testing.assert_frame_equal(store.read(KEY), df)
+
+
+def test_store_persists_planner_coverage(tmp_path):
+    calls = []
+
+    def fetch_range(start, end):
+        calls.append((start, end))
+        return _frame(start, end)
+
+    today = lambda: date(2024, 6, 1)
+    RangePlanner(store=WeatherHistoryStore(tmp_path), today=today).fetch(KEY, "2024-01-01", "2024-01-31", fetch_range)
+    # Nouveau processus : la couverture est relue depuis le disque
+    df = RangePlanner(store=WeatherHistoryStore(tmp_path), today=today).fetch(
+        KEY, "2024-01-10", "2024-02-05", fetch_range
+    )
+    assert calls == [("2024-01-01", "2024-01-31"), ("2024-02-01", "2024-02-05")]
+    assert len(df) == 27
+
+
+def test_compact_and_full_modes_write_the_same_disk_schema(tmp_path, fake_geocoder):
+    from services.weather_service import WeatherService
+
+    class Provider:
+        def daily_range(self, geoloc, start, end):
+            days = pd.date_range(start, end, freq="D")
+            return {"daily": {"time": days.strftime("%Y-%m-%d").tolist(),
+                              "weathercode": [3] * len(days),
+                              "temperature_2m_mean": [float(d.day) for d in days]}}
+
+    schemas = {}
+    for compact in (False, True):
+        root = tmp_path / ("compact" if compact else "full")
+        svc = WeatherService(geocoder=fake_geocoder, provider=Provider(), transformer=DataTransformer(compact=compact),
+                             planner=RangePlanner(store=WeatherHistoryStore(root), today=lambda: date(2025, 1, 1)))
+        df = svc.get_weather_range("Lyon", "2024-03-01", "2024-03-31")
+        # Le mode compact garde ses types en mémoire, le disque reste au schéma fixe
+        expected = COMPACT_DTYPES if compact else DAILY_DTYPES
+        assert df.dtypes.to_dict() == {c: expected[c] for c in df.columns}
+        (part,) = root.glob("*/year=2024/part-*.parquet")
+        schemas[compact] = pq.read_schema(part).remove_metadata()
+    assert schemas[True].equals(schemas[False])
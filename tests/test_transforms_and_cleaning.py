@@ -22,3 +22,96 @@ def test_transformer_class(sample_daily_json):
     tr = DataTransformer()
     df = tr.create_daily_dataframe(sample_daily_json)
     assert {"weathercode","precipitation_sum"}.issubset(df.columns)
+
+def test_transformer_explicit_dtypes_and_date_index(sample_daily_json):
+    df = DataTransformer().create_daily_dataframe(sample_daily_json)
+    assert df["weathercode"].dtype == "float32"
+    assert df["sunshine_duration"].dtype == "float64"
+    expected = pd.to_datetime(sample_daily_json["daily"]["time"])
+    assert (df.index == expected).all()
+
+def test_transformer_from_bytes_with_nulls_and_gaps():
+    import json
+    payload = json.dumps({"daily": {
+        "time": ["2024-10-01", "2024-10-02", "2024-10-05"],
+        "weathercode": [1, None, 3],
+        "temperature_2m_mean": [14.2, None, 13.0],
+    }}).encode()
+    df = DataTransformer().create_daily_dataframe_from_bytes(payload)
+    # Même type avec ou sans valeurs manquantes
+    assert df["weathercode"].dtype == "float32"
+    assert df["weathercode"].isna().sum() == 1
+    assert df["temperature_2m_mean"].isna().sum() == 1
+    assert df.index[-1] == pd.Timestamp("2024-10-05")
+
+def test_compact_mode_dtypes_and_lazy_sunshine_hours(sample_daily_json):
+    from services.analytics.statistics import StatisticsService
+    from services.presentation.weather_presenter import WeatherPresenter
+
+    df = data.data_cleaning.create_daily_dataframe(sample_daily_json, compact=True)
+    assert (df.dtypes == "float32").all()
+
+    prepared = WeatherPresenter.convert_sunshine_duration_to_hours(df, lazy=True)
+    assert "sunshine_hours" not in prepared.columns
+    expected = DataTransformer().create_daily_dataframe(sample_daily_json)["sunshine_duration"].mean() / 3600
+    assert abs(StatisticsService.calculate_average_sunshine_hours(prepared) - expected) < 1e-4
+    assert StatisticsService.calculate_sunny_days_percentage(prepared, threshold_h=5.0) == 100.0 * 2 / 3
+
+def test_presenter_charts_select_from_time_indexed_view(sample_daily_json):
+    import numpy as np
+    from services.presentation.weather_presenter import WeatherPresenter
+
+    df = DataTransformer().create_daily_dataframe(sample_daily_json).rename_axis("time")
+    prepared = WeatherPresenter.convert_sunshine_duration_to_hours(df)
+    assert "sunshine_hours" in prepared.columns and "sunshine_hours" not in df.columns
+
+    temps = WeatherPresenter.prepare_temperature_chart_data(prepared)
+    cmp_df = WeatherPresenter.prepare_temperature_comparison_data(prepared)
+    assert temps.index.equals(df.index)
+    assert np.shares_memory(temps["temperature_2m_mean"].to_numpy(), df["temperature_2m_mean"].to_numpy())
+    assert list(cmp_df.columns) == ["temperature_2m_mean", "apparent_temperature_mean", "ecart_ressenti"]
+    # Ancien format à colonne ``time`` toujours accepté
+    legacy = WeatherPresenter.prepare_precipitation_chart_data(df.reset_index())
+    assert legacy.index.name == "time"
+
+def test_compute_summary_matches_pandas_and_groups(multi_year_df):
+    import numpy as np
+    from services.analytics.statistics import Aggregate, StatisticsService, compute_summary
+
+    df = multi_year_df.set_index("date")
+    df.loc[df.index[::7], "precipitation_sum"] = np.nan
+    spec = [
+        Aggregate("t_mean", "temperature_2m_mean", "mean"),
+        Aggregate("p_sum", "precipitation_sum", "sum"),
+        Aggregate("t_min", "temperature_2m_mean", "min"),
+        Aggregate("p_max", "precipitation_sum", "max"),
+        Aggregate("t_q90", "temperature_2m_mean", "quantile", 0.9),
+        Aggregate("rainy", "precipitation_sum", "pct_ge", 1.0),
+        Aggregate("absent", "snowfall_sum", "mean"),
+    ]
+    summary = compute_summary(df, spec)
+    assert np.isclose(summary["t_mean"], df["temperature_2m_mean"].mean())
+    assert np.isclose(summary["p_sum"], df["precipitation_sum"].sum())
+    assert summary["t_min"] == df["temperature_2m_mean"].min() and summary["p_max"] == df["precipitation_sum"].max()
+    assert np.isclose(summary["t_q90"], df["temperature_2m_mean"].quantile(0.9))
+    assert summary["rainy"] == StatisticsService.calculate_rainy_days_percentage(df) == \
+        100.0 * (df["precipitation_sum"] >= 1.0).sum() / len(df)
+    assert summary["absent"] is None
+    assert StatisticsService.safe_mean(df.iloc[:0], "temperature_2m_mean") is None
+
+    by_month = compute_summary(df, spec, by=df.index.month)
+    grouped = df.groupby(df.index.month)
+    assert np.allclose(by_month["t_mean"], grouped["temperature_2m_mean"].mean())
+    assert np.allclose(by_month["p_sum"], grouped["precipitation_sum"].sum())
+    assert np.allclose(by_month["t_q90"], grouped["temperature_2m_mean"].quantile(0.9))
+    assert np.allclose(by_month["rainy"], grouped["precipitation_sum"].apply(lambda s: 100.0 * (s >= 1.0).mean()))
+    assert by_month["absent"].isna().all()
+
+def test_compute_summary_grouped_on_empty_frame(multi_year_df):
+    from services.analytics.statistics import STAT_GLOBAL_SPEC, compute_summary
+
+    df = multi_year_df.set_index("date").assign(city="Lyon")
+    for by in ("city", df.index.month[:0], []):
+        summary = compute_summary(df.iloc[:0], STAT_GLOBAL_SPEC, by=by)
+        assert summary.empty
+        assert list(summary.columns) == [agg.name for agg in STAT_GLOBAL_SPEC]
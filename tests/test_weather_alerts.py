@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from services.analytics.weather_alerts import WeatherAlertService
+
+
+def _horizon():
+    dates = pd.date_range("2024-07-01", periods=3, freq="D", name="date")
+    lyon = pd.DataFrame({
+        "temperature_2m_max": [38.0, 31.0, np.nan],
+        "temperature_2m_min": [18.0, -5.0, 2.0],
+        "precipitation_sum": [0.0, 45.0, 20.0],
+        "wind_speed_10m_mean": [5.0, 30.0, 12.0],  # m/s : 108 et 43,2 km/h
+    }, index=dates).assign(city="lyon")
+    brest = lyon.assign(city="brest", temperature_2m_max=20.0, temperature_2m_min=10.0,
+                        precipitation_sum=0.0, wind_speed_10m_mean=1.0)
+    return pd.concat([lyon, brest])
+
+
+def test_batch_table_matches_scalar_evaluation_per_day():
+    svc = WeatherAlertService()
+    fleet = _horizon()
+    table = svc.evaluate_batch(fleet)
+
+    assert list(table.columns) == ["location", "date", "kind", "severity"]
+    assert table["severity"].dtype == np.int8 and isinstance(table["kind"].dtype, pd.CategoricalDtype)
+    assert (table["location"] == "lyon").all()
+    # Seuils : chaleur >=, pluie >, vent > après conversion en km/h, froid < (strict)
+    assert table[["kind", "severity"]].astype({"kind": str}).values.tolist() == [
+        ["chaleur", 3], ["chaleur", 1], ["pluie", 2], ["vent", 3], ["froid", 2], ["vent", 1], ["froid", 1],
+    ]
+    for (location, day), rows in fleet.groupby(["city", fleet.index]):
+        expected = [(a.title, a.level, a.severity) for a in svc.evaluate_alerts(rows)]
+        batch = table[(table["location"] == location) & (table["date"] == day)]
+        actual = sorted(((a.title, a.level, a.severity) for a in svc.materialize(batch)),
+                        key=lambda a: a[2], reverse=True)
+        assert actual == expected
+
+
+def test_rain_sum_takes_precedence_and_empty_frames_yield_no_alert():
+    svc = WeatherAlertService()
+    df = pd.DataFrame({"rain_sum": [5.0], "precipitation_sum": [90.0]},
+                      index=pd.DatetimeIndex(["2024-07-01"], name="date"))
+    assert svc.evaluate_alerts(df) == []
+    assert svc.evaluate_batch(pd.DataFrame()).empty
+    assert svc.evaluate_alerts(pd.DataFrame()) == []
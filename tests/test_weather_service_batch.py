@@ -0,0 +1,100 @@
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+import adapters.api_client as api_client
+from adapters.http_session import HostRateLimiter
+from adapters.open_meteo_client import OpenMeteoClient
+from data.transformer import DataTransformer
+from services.weather_service import WeatherService
+from tests.stub_server import StubServer
+
+CITIES = {"Lyon": 45.76, "Nice": 43.7, "Brest": 48.39}
+
+
+def _daily(start, end, offset):
+    dates = pd.date_range(start, end, freq="D")
+    return {"daily": {"time": dates.strftime("%Y-%m-%d").tolist(),
+                      "temperature_2m_mean": [offset + i for i in range(len(dates))]}}
+
+
+def _handler(path, query):
+    if path == "/geo":
+        lat = CITIES.get(query["name"])
+        if lat is None:
+            return 200, {}, {}
+        return 200, {}, {"results": [{"latitude": lat, "longitude": 1.0, "country_code": "FR", "timezone": "Europe/Paris"}]}
+    lats = [float(x) for x in query["latitude"].split(",")]
+    body = [_daily(query["start_date"], query["end_date"], lat) for lat in lats]
+    return 200, {}, body if len(body) > 1 else body[0]
+
+
+def test_batch_packs_locations_and_isolates_failures(monkeypatch):
+    with StubServer(_handler) as server:
+        monkeypatch.setattr(api_client, "GEOCODING_API_URL", server.url + "/geo")
+        monkeypatch.setattr(api_client, "HISTORICAL_API_URL", server.url + "/archive")
+        client = OpenMeteoClient()
+        svc = WeatherService(geocoder=client, provider=client, transformer=DataTransformer())
+        out = svc.get_weather_range_many(["Lyon", "Atlantis", "Nice", "Brest"], "2024-10-01", "2024-10-03")
+    archive_calls = [q for p, q in server.requests if p == "/archive"]
+    assert len(archive_calls) == 1 and archive_calls[0]["latitude"].count(",") == 2
+    assert out["Atlantis"] is None
+    assert out["Nice"]["temperature_2m_mean"].iloc[0] == CITIES["Nice"]
+    assert len(out["Brest"]) == 3
+
+
+class _FlakyProvider:
+    def daily_range(self, geoloc, start, end):
+        if geoloc["latitude"] < 0:
+            raise requests.exceptions.ConnectionError("upstream down")
+        return _daily(start, end, geoloc["latitude"])
+
+
+class _Geocoder:
+    def geocode(self, city):
+        return {"latitude": -1.0 if city == "Bad" else 10.0, "longitude": 0.0, "timezone": "UTC"}
+
+
+def test_batch_long_format_without_batch_provider():
+    svc = WeatherService(geocoder=_Geocoder(), provider=_FlakyProvider(), transformer=DataTransformer())
+    long_df = svc.get_weather_range_many(["A", "Bad", "B"], "2024-10-01", "2024-10-02", long_format=True)
+    assert sorted(long_df["city"].unique()) == ["A", "B"]
+    assert long_df.index.name == "date" and len(long_df) == 4
+
+
+def test_batch_logs_expected_errors_and_raises_bugs(caplog):
+    svc = WeatherService(geocoder=_Geocoder(), provider=_FlakyProvider(), transformer=DataTransformer())
+    with caplog.at_level("WARNING", logger="services.weather_service"):
+        out = svc.get_weather_range_many(["A", "Bad"], "2024-10-01", "2024-10-02")
+    assert out["Bad"] is None and "upstream down" in caplog.text
+
+    class _BuggyProvider:
+        def daily_range(self, geoloc, start, end):
+            raise RuntimeError("bogue")
+
+    svc = WeatherService(geocoder=_Geocoder(), provider=_BuggyProvider(), transformer=DataTransformer())
+    with pytest.raises(RuntimeError):
+        svc.get_weather_range_many(["A"], "2024-10-01", "2024-10-02")
+
+
+def test_batch_forwards_max_workers_to_batch_provider():
+    class _BatchProvider(_FlakyProvider):
+        def daily_range_many(self, geolocs, start, end, max_workers=4):
+            self.max_workers = max_workers
+            return [self.daily_range(g, start, end) for g in geolocs]
+
+    provider = _BatchProvider()
+    svc = WeatherService(geocoder=_Geocoder(), provider=provider, transformer=DataTransformer())
+    out = svc.get_weather_range_many(["A", "B"], "2024-10-01", "2024-10-02", max_workers=2)
+    assert provider.max_workers == 2 and len(out["B"]) == 2
+
+
+def test_host_rate_limiter_spaces_requests():
+    limiter = HostRateLimiter(rate=50.0, burst=1)
+    t0 = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire("archive-api.open-meteo.com")
+    limiter.acquire("other-host")
+    assert time.perf_counter() - t0 >= 5 / 50.0 * 0.9
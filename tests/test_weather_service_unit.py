@@ -30,3 +30,11 @@ def test_get_multi_year_data(fake_geocoder, fake_provider):
     svc = WeatherService(geocoder=fake_geocoder, provider=fake_provider, transformer=DataTransformer())
     df = svc.get_multi_year_data("Lyon", years=1, end_date="2024-10-03")
     assert df is None or isinstance(df, pd.DataFrame)
+
+def test_get_today_skips_archive(fake_geocoder, fake_provider):
+    svc = WeatherService(geocoder=fake_geocoder, provider=fake_provider, transformer=DataTransformer())
+    calls = []
+    fake_provider.daily_same_day_last_year = lambda *args: calls.append(args)
+    today_df = svc.get_today("Lyon")
+    assert isinstance(today_df, pd.DataFrame) and not today_df.empty
+    assert calls == []
@@ -1,49 +1,64 @@
 """Composants Streamlit réutilisables pour l'affichage des graphiques météorologiques."""
 import streamlit as st
 import pandas as pd
-from services.presentation.weather_presenter import WeatherPresenter
+from services.presentation.weather_presenter import DEFAULT_CHART_WIDTH_PX, WeatherPresenter
 
 
-def render_temperature_chart(df, presenter: WeatherPresenter):
+def render_temperature_chart(df, presenter: WeatherPresenter, width_px: int = DEFAULT_CHART_WIDTH_PX):
     """Affiche le graphique des températures."""
     st.markdown("**Température (moy/max/min)**")
-    chart_data = presenter.prepare_temperature_chart_data(df)
+    chart_data = presenter.prepare_temperature_chart_data(df, max_points=presenter.point_budget(width_px))
     if chart_data is not None:
         st.line_chart(chart_data)
     else:
         st.info("Pas de colonnes température disponibles.")
 
 
-def render_precipitation_chart(df, presenter: WeatherPresenter):
+def render_precipitation_chart(df, presenter: WeatherPresenter, width_px: int = DEFAULT_CHART_WIDTH_PX):
     """Affiche le graphique des précipitations."""
     st.markdown("**Cumul précipitations**")
-    chart_data = presenter.prepare_precipitation_chart_data(df)
+    chart_data = presenter.prepare_precipitation_chart_data(df, max_points=presenter.point_budget(width_px))
     if chart_data is not None:
         st.bar_chart(chart_data)
     else:
         st.info("Pas de données de précipitations.")
 
 
-def render_temperature_comparison_chart(df, presenter: WeatherPresenter):
+def render_temperature_comparison_chart(df, presenter: WeatherPresenter, width_px: int = DEFAULT_CHART_WIDTH_PX):
     """Affiche le graphique de comparaison température réelle vs ressentie."""
     st.markdown("**Température réelle vs ressentie**")
-    chart_data = presenter.prepare_temperature_comparison_data(df)
+    chart_data = presenter.prepare_temperature_comparison_data(df, max_points=presenter.point_budget(width_px))
     if chart_data is not None:
         st.line_chart(chart_data)
     else:
         st.info("Colonnes manquantes pour comparer la température ressentie.")
 
 
-def render_forecast_chart(df_forecast):
+def render_forecast_chart(df_forecast, width_px: int = DEFAULT_CHART_WIDTH_PX):
     """Affiche le graphique de prévision."""
     if df_forecast is None or df_forecast.empty:
         st.info("Prévision indisponible (historique insuffisant ou données manquantes).")
         return
     
-    df_plot = df_forecast.copy()
-    if "date" in df_plot.columns:
-        df_plot = df_plot.set_index("date").sort_index()
-    
-    if "temperature_2m_mean_predite" in df_plot.columns:
-        st.line_chart(df_plot[["temperature_2m_mean_predite"]])
+    chart_data = WeatherPresenter.prepare_forecast_chart_data(
+        df_forecast, max_points=WeatherPresenter.point_budget(width_px)
+    )
+    if chart_data is not None:
+        st.line_chart(chart_data)
 
+
+
+def render_rolling_loadings_chart(rolling, presenter: WeatherPresenter, component: int = 1,
+                                  width_px: int = DEFAULT_CHART_WIDTH_PX):
+    """Affiche l'évolution des loadings d'une composante et de sa part de variance expliquée."""
+    if rolling is None or len(rolling.window_end) == 0:
+        st.info("Période trop courte pour la fenêtre glissante choisie.")
+        return
+    budget = presenter.point_budget(width_px)
+    st.markdown(f"**Loadings de PC{component} par fenêtre glissante**")
+    st.line_chart(presenter.downsample(rolling.loadings_frame(component), budget))
+    st.markdown(f"**Variance expliquée par PC{component}**")
+    explained = pd.DataFrame(
+        {f"PC{component}": rolling.explained_var[:, component - 1]}, index=rolling.window_end
+    )
+    st.line_chart(presenter.downsample(explained, budget))
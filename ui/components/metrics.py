@@ -1,4 +1,5 @@
 """Composants Streamlit réutilisables pour l'affichage des métriques météorologiques."""
+import pandas as pd
 import streamlit as st
 from typing import Optional
 from services.presentation.weather_presenter import WeatherPresenter
@@ -16,12 +17,17 @@ def render_metric_card(
     st.metric(label, formatted_value, delta=delta, help=help_text)
 
 
-def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresenter):
-    """Affiche une grille de métriques météorologiques principales."""
+def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresenter, summary: Optional[dict] = None):
+    """Affiche une grille de métriques météorologiques principales.
+
+    ``summary`` : résultat de ``statistics_service.summarize(df)``, partagé entre les grilles.
+    """
+    if summary is None:
+        summary = statistics_service.summarize(df)
     c1, c2, c3, c4 = st.columns(4)
     
     with c1:
-        t_mean = statistics_service.safe_mean(df, "temperature_2m_mean")
+        t_mean = summary["temperature_mean"]
         render_metric_card(
             "Temp. moyenne (°C)",
             t_mean,
@@ -29,7 +35,7 @@ def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresen
         )
     
     with c2:
-        t_max = statistics_service.safe_mean(df, "temperature_2m_max")
+        t_max = summary["temperature_max_mean"]
         render_metric_card(
             "Temp. max moy. (°C)",
             t_max,
@@ -37,7 +43,7 @@ def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresen
         )
     
     with c3:
-        p_sum = statistics_service.safe_sum(df, "precipitation_sum")
+        p_sum = summary["precipitation_total"]
         render_metric_card(
             "Précipitations totales (mm)",
             p_sum,
@@ -45,7 +51,7 @@ def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresen
         )
     
     with c4:
-        sun_h = statistics_service.safe_sum(df, "sunshine_hours")
+        sun_h = summary["sunshine_total"]
         render_metric_card(
             "Ensoleillement total (h)",
             sun_h,
@@ -53,15 +59,15 @@ def render_weather_metrics_grid(df, statistics_service, presenter: WeatherPresen
         )
 
 
-def render_secondary_metrics_grid(df, statistics_service, presenter: WeatherPresenter):
+def render_secondary_metrics_grid(df, statistics_service, presenter: WeatherPresenter, summary: Optional[dict] = None):
     """Affiche une grille de métriques secondaires (pourcentages, moyennes)."""
+    if summary is None:
+        summary = statistics_service.summarize(df)
     k1, k2, k3 = st.columns(3)
     
     # Pourcentage de jours de pluie
     with k1:
-        pct_rain = statistics_service.calculate_rainy_days_percentage(
-            df, "precipitation_sum", threshold_mm=1.0
-        )
+        pct_rain = summary["rainy_days_pct"]
         render_metric_card(
             "% jours de pluie",
             pct_rain,
@@ -71,7 +77,7 @@ def render_secondary_metrics_grid(df, statistics_service, presenter: WeatherPres
     
     # Ensoleillement moyen
     with k2:
-        avg_sun = statistics_service.calculate_average_sunshine_hours(df)
+        avg_sun = summary["sunshine_mean"]
         render_metric_card(
             "Ens. moyen (h/j)",
             avg_sun,
@@ -80,9 +86,7 @@ def render_secondary_metrics_grid(df, statistics_service, presenter: WeatherPres
     
     # Pourcentage de jours ensoleillés
     with k3:
-        pct_sunny = statistics_service.calculate_sunny_days_percentage(
-            df, "sunshine_hours", threshold_h=8.0
-        )
+        pct_sunny = summary["sunny_days_pct"]
         render_metric_card(
             "% jours ≥ 8 h ens.",
             pct_sunny,
@@ -156,3 +160,28 @@ def render_comparison_metrics(
                 delta=f"{presenter.format_delta(diff_sun, 'h')} vs N-1"
             )
 
+
+
+def render_climatology_metrics(comparison, presenter: WeatherPresenter):
+    """Affiche les valeurs du jour face aux normales (``ClimatologyIndex.compare``)."""
+    cards = [
+        ("Temp. moyenne (°C)", "temperature_2m_mean", presenter.format_temperature, "°C"),
+        ("Temp. max (°C)", "temperature_2m_max", presenter.format_temperature, "°C"),
+        ("Précipitations (mm)", "precipitation_sum", presenter.format_precipitation, " mm"),
+        ("Ensoleillement (h)", "sunshine_hours", presenter.format_sunshine, "h"),
+    ]
+    for column, (label, variable, formatter, unit) in zip(st.columns(len(cards)), cards):
+        if variable not in comparison.index:
+            continue
+        row = comparison.loc[variable]
+        if pd.isna(row["valeur"]):
+            continue
+        delta = None
+        if pd.notna(row["anomalie"]):
+            delta = f"{presenter.format_delta(row['anomalie'], unit)} vs normale"
+        help_text = None
+        if pd.notna(row["rang_centile"]):
+            help_text = (f"Normale : {formatter(row['normale'])} ; "
+                         f"rang centile du jour : {row['rang_centile']:.0f}")
+        with column:
+            render_metric_card(label, row["valeur"], formatter, delta=delta, help_text=help_text)